@@ -0,0 +1 @@
+"""Benchmarks for the Restaurant Booking Assistant"""
@@ -0,0 +1,195 @@
+"""Booking Load - Reservation throughput under contention.
+Runs booking threads against the availability engine: each operation
+holds a table, then confirms it (80%) or cancels it; every thread keeps
+its latest 50 bookings and cancels older ones, so inventory stays in a
+steady state instead of filling up. Restaurants are drawn uniformly or
+from a hot set that takes most of the traffic, with one lock stripe
+(a global lock) or many. A failed hold (no table) still counts as an
+operation.
+
+While the bookers run, the bulk availability query used by the
+availability_filter node is timed over N candidates. After every run the
+grid is checked against the reservations: no slot over capacity, and
+counts recomputed from the live reservations equal the grid.
+
+Usage:
+    python -m benchmarks.booking_load [--restaurants 1000] [--threads 1,2,4,8,16] [--stripes 1,64]
+                                      [--ops 20000] [--candidates 100,1000] [--output FILE]
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+import numpy as np
+from benchmarks.suite import summarize
+from src.booking.availability import AvailabilityEngine, BookingError, BLOCK_ROWS
+
+DAYS = 7
+# Requested times: 17:00 to 21:30
+TIMES = list(range(17 * 60, 21 * 60 + 31, 15))
+KEEP_BOOKINGS = 50
+
+
+def pick_restaurant(rng: random.Random, names: list, hot: int, hot_share: float) -> str:
+    if hot and rng.random() < hot_share:
+        return names[rng.randrange(hot)]
+    return names[rng.randrange(len(names))]
+
+
+def booker(engine: AvailabilityEngine, names: list, days: list, ops: int, seed: int,
+           hot: int, hot_share: float, results: list, start: threading.Barrier) -> None:
+    """Runs `ops` booking operations and records (operations, failed holds)"""
+    rng = random.Random(seed)
+    kept, done, failed = [], 0, 0
+    start.wait()
+    while done < ops:
+        restaurant = pick_restaurant(rng, names, hot, hot_share)
+        try:
+            reservation = engine.hold(restaurant, rng.choice(days), rng.choice(TIMES), rng.randint(1, 8))
+        except BookingError:
+            failed += 1
+            done += 1
+            continue
+        if rng.random() < 0.8:
+            kept.append(engine.confirm(reservation.id).id)
+        else:
+            engine.cancel(reservation.id)
+        done += 2
+        if len(kept) > KEEP_BOOKINGS:
+            engine.cancel(kept.pop(0))
+            done += 1
+    results.append((done, failed))
+
+
+def time_bulk_queries(engine: AvailabilityEngine, rows: np.ndarray, days: list, sizes: list,
+                      stop: threading.Event, seed: int) -> dict:
+    """Times bulk queries over random candidate sets until stop is set"""
+    rng = np.random.default_rng(seed)
+    durations = {size: [] for size in sizes}
+    while not stop.is_set():
+        for size in sizes:
+            candidates = rng.choice(rows, size=min(size, len(rows)), replace=False)
+            started = time.perf_counter()
+            engine.available(candidates, days[rng.integers(len(days))], int(rng.choice(TIMES)), int(rng.integers(1, 9)))
+            durations[size].append(time.perf_counter() - started)
+    return {size: summarize(values) for size, values in durations.items() if values}
+
+
+def check_invariants(engine: AvailabilityEngine) -> list:
+    """Problems found in the grid (empty when consistent)"""
+    problems = []
+    expected = {}
+    for reservations in engine._reservations:
+        for reservation in reservations.values():
+            row = engine._rows[reservation.restaurant]
+            start = (reservation.start - engine.opening) // engine.slot_minutes
+            size = int(np.searchsorted(engine.sizes, reservation.table_size))
+            grid = expected.setdefault(reservation.day, {}).setdefault(
+                row, np.zeros((len(engine.sizes), engine.slots), dtype=np.int64))
+            grid[size, start:start + engine.sitting] += 1
+    for day, blocks in engine._days.items():
+        for block_index, block in enumerate(blocks):
+            capacity = engine._capacity[block_index]
+            if (block > capacity[:, :, None]).any():
+                problems.append(f"{day}: slot over capacity in block {block_index}")
+            for offset in np.flatnonzero(block.reshape(BLOCK_ROWS, -1).any(axis=1)):
+                row = block_index * BLOCK_ROWS + int(offset)
+                recounted = expected.get(day, {}).pop(row, None)
+                if recounted is None or not np.array_equal(block[offset], recounted):
+                    problems.append(f"{day}: counts of row {row} differ from its reservations")
+    problems += [f"{day}: reservations of row {row} missing from the grid"
+                 for day, rows in expected.items() for row in rows]
+    return problems
+
+
+def run(args, threads: int, stripes: int, hot: int) -> dict:
+    """One load run; returns throughput, bulk query latency and invariant check"""
+    engine = AvailabilityEngine(stripes=stripes)
+    names = [f"Restaurant {i:05d}" for i in range(args.restaurants)]
+    rows = engine.rows(names)
+    # From tomorrow, so no requested time has already passed
+    days = [date.today() + timedelta(days=d) for d in range(1, DAYS + 1)]
+    ops = args.ops // threads
+
+    results, start, stop = [], threading.Barrier(threads + 1), threading.Event()
+    workers = [
+        threading.Thread(target=booker, args=(engine, names, days, ops, args.seed + i, hot, args.hot_share, results, start))
+        for i in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    bulk = {}
+    querier = threading.Thread(target=lambda: bulk.update(
+        time_bulk_queries(engine, rows, days, args.candidates, stop, args.seed)))
+    querier.start()
+    start.wait()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    querier.join()
+
+    operations = sum(done for done, _ in results)
+    problems = check_invariants(engine)
+    return {
+        "threads": threads,
+        "stripes": stripes,
+        "traffic": f"hot {hot}" if hot else "uniform",
+        "ops_per_s": round(operations / elapsed),
+        "failed_holds": sum(failed for _, failed in results),
+        "bulk_query": {str(size): stats for size, stats in bulk.items()},
+        "consistent": not problems,
+        "problems": problems[:5],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reservation throughput under contention")
+    parser.add_argument("--restaurants", type=int, default=1000)
+    parser.add_argument("--threads", default="1,2,4,8,16", help="Comma-separated booking thread counts")
+    parser.add_argument("--stripes", default="1,64", help="Comma-separated lock stripe counts")
+    parser.add_argument("--ops", type=int, default=20000, help="Booking operations per run (split across threads)")
+    parser.add_argument("--hot", type=int, default=10, help="Restaurants in the hot set (0: uniform traffic only)")
+    parser.add_argument("--hot-share", type=float, default=0.8, help="Share of traffic going to the hot set")
+    parser.add_argument("--candidates", default="100,1000", help="Comma-separated bulk query sizes")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, help="Optional JSON report")
+    args = parser.parse_args()
+    args.candidates = [int(c) for c in args.candidates.split(",")]
+
+    rows = []
+    for hot in ([0, args.hot] if args.hot else [0]):
+        for stripes in [int(s) for s in args.stripes.split(",")]:
+            for threads in [int(t) for t in args.threads.split(",")]:
+                rows.append(run(args, threads, stripes, hot))
+
+    print(f"\nBooking load ({args.restaurants} restaurants, {DAYS} days, {args.ops} operations per run)")
+    print("-"*90)
+    header = "".join(f"{f'bulk {size} p50/p95 ms':>24}" for size in args.candidates)
+    print(f"{'traffic':>9} {'stripes':>8} {'threads':>8} {'ops/s':>9} {'failed':>7}{header} {'ok':>4}")
+    for row in rows:
+        bulk = "".join(
+            f"{row['bulk_query'][str(size)]['p50_ms']:>15.3f}/{row['bulk_query'][str(size)]['p95_ms']:<8.3f}"
+            if str(size) in row["bulk_query"] else f"{'-':>24}"
+            for size in args.candidates
+        )
+        print(f"{row['traffic']:>9} {row['stripes']:>8} {row['threads']:>8} {row['ops_per_s']:>9} "
+              f"{row['failed_holds']:>7}{bulk} {'yes' if row['consistent'] else 'NO':>4}")
+    inconsistent = [row for row in rows if not row["consistent"]]
+    for row in inconsistent:
+        print(f"\n{row['traffic']}, {row['stripes']} stripes, {row['threads']} threads: {row['problems']}")
+
+    if args.output:
+        args.output.write_text(json.dumps({"restaurants": args.restaurants, "ops": args.ops, "results": rows}, indent=2) + "\n")
+        print(f"\nSaved to {args.output}")
+    if inconsistent:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
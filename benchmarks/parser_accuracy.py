@@ -0,0 +1,105 @@
+"""Parser Accuracy Benchmark - Compares the rule parser with recorded LLM parses.
+Reports how much traffic the fast path would take, how often it agrees
+with the LLM on the queries it accepts, and the latency of each path.
+
+Usage:
+    python -m benchmarks.parser_accuracy [--cases FILE] [--threshold X]
+    python -m benchmarks.parser_accuracy --record   # re-record parses with the live LLM
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from src.agents.input_parser_agent import PARSED_FIELDS, build_prompt, get_llm, parse_llm_response
+from src.agents.rule_parser import parse_query_rules
+from src.config.settings import RULE_PARSER_MIN_CONFIDENCE
+from src.utils.metrics import percentile
+
+DEFAULT_CASES = Path(__file__).resolve().parent / "data" / "parser_cases.jsonl"
+
+
+def load_cases(path: Path) -> list:
+    """Loads {"query", "parsed", optional "latency_ms"} records."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def record_cases(path: Path) -> None:
+    """Re-parses every case query with the live LLM and saves the results."""
+    cases = load_cases(path)
+    for case in cases:
+        started = time.perf_counter()
+        response = get_llm().invoke(build_prompt(case["query"]))
+        case["latency_ms"] = (time.perf_counter() - started) * 1000
+        case["parsed"] = parse_llm_response(response.content)
+        print(f"{case['latency_ms']:7.0f} ms  {case['query']}")
+    with open(path, "w") as f:
+        for case in cases:
+            f.write(json.dumps(case) + "\n")
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return value
+
+
+def evaluate(cases: list, threshold: float) -> None:
+    """Runs the rule parser over every case and prints the comparison."""
+    accepted = agreed = 0
+    field_correct = dict.fromkeys(PARSED_FIELDS, 0)
+    rule_latencies = []
+    disagreements = []
+
+    for case in cases:
+        started = time.perf_counter()
+        parsed, confidence = parse_query_rules(case["query"])
+        rule_latencies.append((time.perf_counter() - started) * 1000)
+
+        expected = case["parsed"] or {}
+        matches = {f: _normalize(parsed.get(f)) == _normalize(expected.get(f)) for f in PARSED_FIELDS}
+        for field, ok in matches.items():
+            field_correct[field] += ok
+
+        if confidence >= threshold:
+            accepted += 1
+            if all(matches.values()):
+                agreed += 1
+            else:
+                disagreements.append((case["query"], {f: (parsed.get(f), expected.get(f)) for f, ok in matches.items() if not ok}))
+
+    total = len(cases)
+    print(f"Parser accuracy ({total} cases, threshold {threshold})")
+    print("-"*60)
+    print(f"Fast-path coverage:    {accepted}/{total} ({accepted / total:.0%})")
+    print(f"Agreement when taken:  {agreed}/{accepted}" + (f" ({agreed / accepted:.0%})" if accepted else ""))
+    print("Per-field agreement (all cases):")
+    for field, correct in field_correct.items():
+        print(f"   {field:>22}: {correct / total:.0%}")
+    print(f"Rule parser latency:   p50 {percentile(rule_latencies, 50):.3f} ms  p95 {percentile(rule_latencies, 95):.3f} ms")
+    llm_latencies = [c["latency_ms"] for c in cases if "latency_ms" in c]
+    if llm_latencies:
+        print(f"LLM latency (recorded): p50 {percentile(llm_latencies, 50):.0f} ms  p95 {percentile(llm_latencies, 95):.0f} ms")
+    for query, diff in disagreements:
+        print(f"\n Fast path disagreed on: '{query}'")
+        for field, (got, want) in diff.items():
+            print(f"   {field}: rule={got!r} llm={want!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the rule parser with recorded LLM parses")
+    parser.add_argument("--cases", type=Path, default=DEFAULT_CASES)
+    parser.add_argument("--threshold", type=float, default=RULE_PARSER_MIN_CONFIDENCE)
+    parser.add_argument("--record", action="store_true", help="Re-record parses with the live LLM first")
+    args = parser.parse_args()
+
+    if args.record:
+        record_cases(args.cases)
+    evaluate(load_cases(args.cases), args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Quantization Report - Recall and latency of quantized NumPy vector indexes.
+Builds float32, float16 and int8 copies of the menu index from the same
+dish store and runs the same queries against each, with and without
+float32 rescoring of the shortlist. Recall@k is measured against the
+float32 index: a hit counts if its exact score reaches the k-th best
+exact score, so ties in the reference ranking are not held against the
+quantized ones.
+
+Usage:
+    python -m benchmarks.quantization [--restaurants 1000] [--queries 200] [--k 10]
+                                      [--rescore 0,2,4] [--embedding-backend fake|huggingface]
+                                      [--workdir DIR] [--output FILE]
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+from benchmarks.suite import configure_environment, ensure_ingested, summarize, quiet
+from benchmarks.synthetic import generate_menus, DIETARY_RATES, INGREDIENTS, STYLES
+
+QUANTIZATIONS = ["float32", "float16", "int8"]
+
+
+def make_search_queries(count: int, seed: int) -> list:
+    """(query text, where-clause or None) pairs; about half are filtered"""
+    from src.rag.schema import dietary_flag_key
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        tag = rng.choice([None, None, None, *DIETARY_RATES])
+        text = f"{rng.choice(INGREDIENTS)} {rng.choice(STYLES)}"
+        queries.append((f"{tag} {text}" if tag else text, {dietary_flag_key(tag): True} if tag else None))
+    return queries
+
+
+def index_bytes(store) -> dict:
+    """Bytes scanned per query vs. bytes of the float32 copy read only for rescoring"""
+    index = store._index
+    scanned = index.vectors.nbytes + (index.scales.nbytes if index.scales is not None else 0)
+    return {"scanned_mb": round(scanned / 2**20, 2),
+            "rescore_mb": round(index.full.nbytes / 2**20, 2) if index.full is not None else 0.0}
+
+
+def recall(reference, vector: np.ndarray, hits: list, k: int, where: dict) -> float:
+    """Share of hits whose exact score reaches the k-th best exact score"""
+    exact = reference.query([vector], n_results=k, where=where)["distances"][0]
+    if not exact:
+        return None
+    cutoff = 1.0 - max(exact) - 1e-6
+    index = reference._index
+    rows = np.asarray(index.rows_for(hits), dtype=np.int64)
+    scores = index.scores(vector / np.linalg.norm(vector), rows)
+    return float(np.sum(scores >= cutoff)) / len(exact)
+
+
+def run_config(store, reference, embedded: list, k: int) -> dict:
+    """Times every query against store and scores its recall against reference"""
+    durations, recalls = [], []
+    for vector, where in embedded:
+        started = time.perf_counter()
+        result = store.query([vector], n_results=k, where=where)
+        durations.append(time.perf_counter() - started)
+        value = recall(reference, vector, result["ids"][0], k, where)
+        if value is not None:
+            recalls.append(value)
+    stats = summarize(durations)
+    stats["recall_at_k"] = round(sum(recalls) / len(recalls), 4) if recalls else None
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall and latency of quantized vector indexes")
+    parser.add_argument("--restaurants", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rescore", default="0,2,4", help="Comma-separated rescore multipliers to try")
+    parser.add_argument("--embedding-backend", choices=["fake", "huggingface"], default="fake")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workdir", type=Path, help="Reuse menus and stores from this directory")
+    parser.add_argument("--output", type=Path, help="Optional JSON report")
+    args = parser.parse_args()
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="booking-quant-"))
+    if not any((workdir / "menus").glob("*.json")):
+        generate_menus(workdir / "menus", args.restaurants, args.seed)
+    configure_environment(workdir, 0.0, "numpy", args.embedding_backend)
+    ensure_ingested()
+
+    from src.rag.menu_vectorstore import get_embeddings
+    from src.rag.numpy_store import NumpyVectorStore
+    embeddings = get_embeddings()
+    embedded = [
+        (np.asarray(embeddings.embed_query(text), dtype=np.float32), where)
+        for text, where in make_search_queries(args.queries, args.seed)
+    ]
+
+    stores = {}
+    for quantization in QUANTIZATIONS:
+        print(f"Building {quantization} index ...", file=sys.stderr)
+        # Any multiplier above 0 keeps the float32 copy needed for rescoring
+        store = NumpyVectorStore(embeddings, workdir / "quantization" / quantization, rescore_multiplier=1)
+        with quiet():
+            store.rebuild(quantization=quantization)
+        stores[quantization] = store
+    reference = stores["float32"]
+
+    rows = []
+    for quantization, store in stores.items():
+        multipliers = [0] if quantization == "float32" else [int(m) for m in args.rescore.split(",")]
+        for multiplier in multipliers:
+            store.rescore_multiplier = multiplier
+            stats = run_config(store, reference, embedded, args.k)
+            rows.append({"quantization": quantization, "rescore": multiplier, **index_bytes(store), **stats})
+
+    dishes = reference.count()
+    print(f"\nQuantization report ({dishes} dishes, {len(embedded)} queries, k={args.k}, "
+          f"{args.embedding_backend} embeddings)")
+    print("-"*88)
+    print(f"{'storage':>8} {'rescore':>8} {'scanned MB':>11} {'rescore MB':>11} "
+          f"{'recall@k':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for row in rows:
+        rescore = f"x{row['rescore']}" if row["rescore"] else "-"
+        print(f"{row['quantization']:>8} {rescore:>8} {row['scanned_mb']:>11.2f} {row['rescore_mb']:>11.2f} "
+              f"{row['recall_at_k']:>9.4f} {row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f}")
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            "dishes": dishes, "queries": len(embedded), "k": args.k,
+            "embedding_backend": args.embedding_backend, "results": rows,
+        }, indent=2) + "\n")
+        print(f"\nSaved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
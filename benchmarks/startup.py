@@ -0,0 +1,68 @@
+"""Startup Benchmark - Measures cold-start cost of the main entry point.
+Each run happens in a fresh interpreter so module caches, the embedding
+model and the LLM client are all cold.
+
+Usage:
+    python -m benchmarks.startup [--runs N] [--no-answer]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from src.config.settings import BASE_DIR
+
+# Executed in a child interpreter; prints one JSON line of timings
+CHILD_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+import src.main
+t1 = time.perf_counter()
+app = src.main.build_workflow()
+t2 = time.perf_counter()
+timings = {"import_s": t1 - t0, "build_workflow_s": t2 - t1}
+if sys.argv[1] == "answer":
+    state = src.main.create_initial_state(src.main.DEFAULT_QUERY)
+    app.invoke(state)
+    timings["first_answer_s"] = time.perf_counter() - t2
+    timings["total_s"] = time.perf_counter() - t0
+print("BENCH " + json.dumps(timings))
+"""
+
+
+def run_once(answer: bool = True) -> dict:
+    """Runs one cold start in a child process.
+    Args:
+        answer: Whether to also time the first end-to-end answer
+    Returns:
+        Dict of timings in seconds
+    """
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, "answer" if answer else "import"],
+        cwd=BASE_DIR, capture_output=True, text=True, check=True
+    )
+    for line in proc.stdout.splitlines():
+        if line.startswith("BENCH "):
+            return json.loads(line[len("BENCH "):])
+    raise RuntimeError(f"Benchmark child produced no timings:\n{proc.stderr}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start latency of src.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-answer", action="store_true", help="Only time import and graph build")
+    args = parser.parse_args()
+
+    runs = [run_once(answer=not args.no_answer) for _ in range(args.runs)]
+
+    print(f"Startup benchmark ({args.runs} cold runs)")
+    print("-"*60)
+    for key in runs[0]:
+        values = [r[key] for r in runs]
+        print(f"{key:>18}: median {statistics.median(values)*1000:8.1f} ms   "
+              f"min {min(values)*1000:8.1f} ms   max {max(values)*1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+"""Benchmark Suite - Reproducible offline performance scenarios.
+Generates synthetic menus, ingests them with the fake embedding model and
+runs every scenario against the stub LLM, so no Groq key or model download
+is needed. Results are written as JSON named after the current commit and
+can be compared with an earlier run.
+
+Scenarios:
+    ingest        ingest_menus (full rebuild, then an unchanged incremental run)
+    search        search_menus, hybrid and vector-only
+    dishes        get_restaurant_dishes
+    agents        each agent node on its own
+    end_to_end    build_workflow().invoke
+
+Usage:
+    python -m benchmarks.suite [--restaurants 1000] [--queries 200] [--scenarios agents,end_to_end]
+                               [--llm-latency-ms 0] [--vector-backend chroma|numpy]
+                               [--workdir DIR] [--output FILE]
+                               [--compare OLD.json] [--fail-on-regression]
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from benchmarks.synthetic import generate_menus, make_queries, DIETARY_RATES, ALLERGEN_RATES, INGREDIENTS, STYLES
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+REPO_DIR = Path(__file__).resolve().parents[1]
+
+# Settings that would otherwise point outside the benchmark work directory
+PATH_SETTINGS = [
+    "DISH_STORE_PATH", "MANIFEST_PATH", "EMBEDDING_CACHE_PATH", "CATALOG_PATH", "PARSE_CACHE_PATH",
+    "VECTOR_INDEX_DIR",
+]
+
+
+def configure_environment(workdir: Path, llm_latency_ms: float, vector_backend: str,
+                          embedding_backend: str = "fake") -> None:
+    """Points every setting at the work directory and the offline backends.
+    Must run before anything under src is imported, since settings are
+    read once at import time.
+    """
+    for name in PATH_SETTINGS:
+        os.environ.pop(name, None)
+    os.environ.update({
+        "MENUS_DIR": str(workdir / "menus"),
+        "PERSIST_DIR": str(workdir / "store"),
+        "LLM_BACKEND": "stub",
+        "STUB_LLM_LATENCY_MS": str(llm_latency_ms),
+        "EMBEDDING_BACKEND": embedding_backend,
+        "VECTOR_BACKEND": vector_backend,
+        "DEBUG_OUTPUT": "0",
+    })
+
+
+def summarize(durations: list) -> dict:
+    """Summary statistics in milliseconds"""
+    # Imported here: settings must not load before configure_environment()
+    from src.utils.metrics import percentile
+    ordered = sorted(d * 1000 for d in durations)
+    return {
+        "runs": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 4),
+        "p50_ms": round(percentile(ordered, 50), 4),
+        "p95_ms": round(percentile(ordered, 95), 4),
+        "min_ms": round(ordered[0], 4),
+        "max_ms": round(ordered[-1], 4),
+    }
+
+
+def measure(fn, inputs: list, prepare=None) -> dict:
+    """Times fn(item) for every input; prepare(item) runs outside the timer"""
+    durations = []
+    for item in inputs:
+        arg = prepare(item) if prepare else item
+        started = time.perf_counter()
+        fn(arg)
+        durations.append(time.perf_counter() - started)
+    return summarize(durations)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silences progress printing from CLI-style functions"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+class BenchContext:
+    """Shared inputs for the scenarios"""
+
+    def __init__(self, restaurants: list, queries: list, repeat: int, seed: int):
+        self.restaurants = restaurants
+        self.queries = queries
+        self.repeat = repeat
+        self.rng = random.Random(seed)
+
+    def repeated(self, items: list) -> list:
+        return items * self.repeat
+
+
+def ensure_ingested() -> None:
+    """Ingests the synthetic menus once if the store is empty.
+    A reused work directory ingested with the other vector backend gets an
+    incremental run, which builds the missing NumPy index without re-embedding.
+    """
+    from src.config.settings import VECTOR_BACKEND, VECTOR_INDEX_DIR
+    from src.rag.dish_store import dish_store_exists
+    from src.rag.ingest_data import ingest_menus
+    if not dish_store_exists():
+        with quiet():
+            ingest_menus(full=True)
+    elif VECTOR_BACKEND == "numpy" and not (VECTOR_INDEX_DIR / "CURRENT").exists():
+        with quiet():
+            ingest_menus()
+
+
+def bench_ingest(ctx: BenchContext) -> dict:
+    from src.rag.ingest_data import ingest_menus
+    results = {}
+    for name, full in [("ingest_menus.full", True), ("ingest_menus.unchanged", False)]:
+        with quiet():
+            results[name] = measure(lambda _: ingest_menus(full=full), [None])
+    return results
+
+
+def bench_search(ctx: BenchContext) -> dict:
+    from src.rag import search_menus
+    queries = [
+        (
+            f"{ctx.rng.choice(INGREDIENTS)} {ctx.rng.choice(STYLES)}",
+            ctx.rng.choice([None, *DIETARY_RATES]),
+            ctx.rng.choice([None, [ctx.rng.choice(list(ALLERGEN_RATES))]]),
+        )
+        for _ in range(len(ctx.queries))
+    ]
+    return {
+        f"search_menus.{mode}": measure(
+            lambda q: search_menus(q[0], k=5, dietary_filter=q[1], exclude_allergens=q[2], mode=mode),
+            ctx.repeated(queries),
+        )
+        for mode in ("hybrid", "vector")
+    }
+
+
+def bench_dishes(ctx: BenchContext) -> dict:
+    from src.rag import get_restaurant_dishes
+    lookups = [
+        (ctx.rng.choice(ctx.restaurants)[0], ctx.rng.choice([None, *DIETARY_RATES]))
+        for _ in range(len(ctx.queries))
+    ]
+    return {"get_restaurant_dishes": measure(
+        lambda q: get_restaurant_dishes(q[0], dietary_filter=q[1]), ctx.repeated(lookups)
+    )}
+
+
+def apply_update(state: dict, update: dict) -> dict:
+    """Merges a node's update into the state the way the graph does"""
+    merged = {**state, **update}
+    merged["messages"] = state["messages"] + update.get("messages", [])
+    return merged
+
+
+def bench_agents(ctx: BenchContext) -> dict:
+    from src.agents import (
+        input_parser_agent, restaurant_search_agent, budget_filter_agent,
+        dietary_analyzer_agent, ranking_agent
+    )
+    from src.agents.rule_parser import parse_query_rules
+    from src.config.settings import RULE_PARSER_MIN_CONFIDENCE
+    from src.graph.planner import query_planner
+    from src.main import create_initial_state
+
+    results = {}
+    rule_queries = [q for q in ctx.queries if parse_query_rules(q)[1] >= RULE_PARSER_MIN_CONFIDENCE]
+    llm_queries = [q for q in ctx.queries if q not in rule_queries]
+    if rule_queries:
+        results["agent.input_parser.rules"] = measure(
+            input_parser_agent, ctx.repeated(rule_queries), create_initial_state
+        )
+    if llm_queries:
+        # A fresh suffix per run keeps the parse cache from answering
+        unique = [f"{q}, ref {i}" for i, q in enumerate(ctx.repeated(llm_queries))]
+        results["agent.input_parser.llm"] = measure(input_parser_agent, unique, create_initial_state)
+
+    # Snapshot the state in front of each stage, then time the stages alone
+    stages = [
+        ("restaurant_search", restaurant_search_agent),
+        ("budget_filter", budget_filter_agent),
+        ("dietary_analyzer", dietary_analyzer_agent),
+        ("ranking", ranking_agent),
+    ]
+    snapshots = {name: [] for name, _ in stages}
+    for query in ctx.queries:
+        state = create_initial_state(query)
+        for stage in (input_parser_agent, query_planner):
+            state = apply_update(state, stage(state))
+        for name, agent in stages:
+            snapshots[name].append(copy.deepcopy(state))
+            state = apply_update(state, agent(state))
+
+    for name, agent in stages:
+        results[f"agent.{name}"] = measure(agent, ctx.repeated(snapshots[name]), copy.deepcopy)
+    return results
+
+
+def bench_end_to_end(ctx: BenchContext) -> dict:
+    from src.graph import build_workflow
+    from src.main import create_initial_state
+    from src.graph.stage_cache import get_stage_cache
+    app = build_workflow()
+    cache = get_stage_cache()
+
+    def uncached(query):
+        cache.clear()
+        return create_initial_state(query)
+
+    results = {"end_to_end.invoke": measure(app.invoke, ctx.repeated(ctx.queries), uncached)}
+    # Every query once to fill the stage cache, then the same runs served from it
+    for query in ctx.queries:
+        app.invoke(create_initial_state(query))
+    results["end_to_end.invoke.stage_cached"] = measure(
+        app.invoke, ctx.repeated(ctx.queries), create_initial_state
+    )
+    return results
+
+
+def bench_sessions(ctx: BenchContext) -> dict:
+    from src.graph import build_workflow
+    from src.graph.sessions import get_checkpointer, run_turn
+    from src.graph.stage_cache import get_stage_cache
+    app = build_workflow(get_checkpointer())
+    cache = get_stage_cache()
+    sessions = iter(range(10**9))
+
+    def first_turn(query):
+        # Earlier turns come from the session alone, not the stage cache
+        session_id = f"bench-{next(sessions)}"
+        run_turn(app, session_id, query)
+        cache.clear()
+        return session_id
+
+    results = {}
+    for name, follow_up in [("budget", "actually make it under $25"), ("cuisine", "what about indian?")]:
+        results[f"session.follow_up.{name}"] = measure(
+            lambda session_id: run_turn(app, session_id, follow_up), ctx.repeated(ctx.queries), first_turn
+        )
+    return results
+
+
+SCENARIOS = {
+    "ingest": bench_ingest,
+    "search": bench_search,
+    "dishes": bench_dishes,
+    "agents": bench_agents,
+    "end_to_end": bench_end_to_end,
+    "sessions": bench_sessions,
+}
+
+
+def git_revision() -> dict:
+    """Current commit and whether the tree has uncommitted changes"""
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=REPO_DIR, capture_output=True, text=True)
+    commit = git("rev-parse", "--short", "HEAD").stdout.strip() or "unknown"
+    dirty = git("diff", "--quiet", "HEAD").returncode != 0
+    return {"commit": commit, "dirty": dirty}
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Prints p50 changes against a baseline run.
+    Returns:
+        Names of scenarios slower than baseline by more than `threshold`
+    """
+    print(f"\nComparison with {baseline['revision']['commit']} (p50, ms)")
+    print("-"*72)
+    if baseline.get("config") != current["config"]:
+        print(f"Note: configurations differ ({baseline.get('config')} vs {current['config']})")
+    regressions = []
+    for name, stats in current["results"].items():
+        old = baseline["results"].get(name)
+        if not old:
+            print(f"{name:>32}: {stats['p50_ms']:10.3f}   (new)")
+            continue
+        ratio = stats["p50_ms"] / old["p50_ms"] if old["p50_ms"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:>32}: {old['p50_ms']:10.3f} -> {stats['p50_ms']:10.3f}   x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument("--restaurants", type=int, default=1000, help="Synthetic restaurants (10 to 100000)")
+    parser.add_argument("--queries", type=int, default=200, help="Distinct queries per scenario")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the query set")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Artificial stub LLM latency")
+    parser.add_argument("--vector-backend", choices=["chroma", "numpy"], default="chroma")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workdir", type=Path, help="Reuse menus and stores from this directory")
+    parser.add_argument("--output", type=Path, help="Result JSON (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier result JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown ratio reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="booking-bench-"))
+    menus_dir = workdir / "menus"
+    if args.workdir is None or not any(menus_dir.glob("*.json")):
+        restaurants = generate_menus(menus_dir, args.restaurants, args.seed)
+    else:
+        restaurants = [
+            (menu["restaurant_name"], menu["location"], menu["cuisine"])
+            for menu in (json.loads(p.read_text()) for p in sorted(menus_dir.glob("*.json")))
+        ]
+    configure_environment(workdir, args.llm_latency_ms, args.vector_backend)
+    if "ingest" not in scenarios:
+        ensure_ingested()
+
+    ctx = BenchContext(restaurants, make_queries(args.queries, args.seed), args.repeat, args.seed)
+    results = {}
+    for name in scenarios:
+        print(f"Running {name} ...", file=sys.stderr)
+        results.update(SCENARIOS[name](ctx))
+
+    revision = git_revision()
+    report = {
+        "revision": revision,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": {
+            "restaurants": len(restaurants),
+            "queries": args.queries,
+            "repeat": args.repeat,
+            "llm_latency_ms": args.llm_latency_ms,
+            "vector_backend": args.vector_backend,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    output = args.output or RESULTS_DIR / f"{revision['commit']}{'-dirty' if revision['dirty'] else ''}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+
+    print(f"\nBenchmark results ({len(restaurants)} restaurants, commit {revision['commit']})")
+    print("-"*72)
+    for name, stats in results.items():
+        print(f"{name:>32}: p50 {stats['p50_ms']:10.3f} ms   p95 {stats['p95_ms']:10.3f} ms   "
+              f"mean {stats['mean_ms']:10.3f} ms   ({stats['runs']} runs)")
+    print(f"\nSaved to {output}")
+
+    if args.compare:
+        regressions = compare(report, json.loads(args.compare.read_text()), args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
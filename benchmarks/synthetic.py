@@ -0,0 +1,141 @@
+"""Synthetic Menus - Generates restaurant menu files at benchmark scale.
+Writes one JSON file per restaurant in the same format as data/menus,
+with dietary tags and allergens drawn from fixed distributions. The same
+seed always produces the same files.
+
+Usage:
+    python -m benchmarks.synthetic OUT_DIR [--restaurants 1000] [--seed 7]
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+
+LOCATIONS = [
+    "downtown Seattle", "Capitol Hill Seattle", "Waterfront Seattle", "Ballard", "Fremont",
+    "Queen Anne", "South Lake Union", "Belltown", "Pioneer Square", "University District",
+]
+CUISINES = [
+    "American", "Mediterranean", "Italian", "Indian", "Seafood", "Mexican", "Chinese",
+    "Japanese", "Thai", "French", "Greek", "Korean", "Vietnamese", "Spanish", "Middle Eastern",
+]
+CATEGORIES = {"appetizers": (2, 6), "mains": (4, 12), "desserts": (1, 4)}
+
+# Share of dishes carrying each tag / allergen
+DIETARY_RATES = {"vegetarian": 0.35, "vegan": 0.15, "gluten-free": 0.20, "dairy-free": 0.15, "nut-free": 0.10}
+ALLERGEN_RATES = {"gluten": 0.35, "dairy": 0.30, "eggs": 0.15, "soy": 0.12, "nuts": 0.10, "shellfish": 0.05}
+
+INGREDIENTS = [
+    "tofu", "chickpea", "lentil", "mushroom", "eggplant", "spinach", "paneer", "chicken", "lamb",
+    "salmon", "shrimp", "beef", "quinoa", "rice", "noodle", "cashew", "avocado", "tomato", "pepper",
+]
+STYLES = ["curry", "bowl", "salad", "pasta", "tacos", "stew", "skewers", "risotto", "soup", "wrap", "burger"]
+ADJECTIVES = ["creamy", "spicy", "smoky", "roasted", "crispy", "fresh", "tangy", "herbed", "grilled"]
+
+
+def make_dish(rng: random.Random, used_names: set) -> dict:
+    """Builds one dish whose tags and allergens are mutually consistent"""
+    name = f"{rng.choice(ADJECTIVES).title()} {rng.choice(INGREDIENTS).title()} {rng.choice(STYLES).title()}"
+    while name in used_names:
+        name += " II"
+    used_names.add(name)
+
+    dietary = [tag for tag, rate in DIETARY_RATES.items() if rng.random() < rate]
+    if "vegan" in dietary and "vegetarian" not in dietary:
+        dietary.append("vegetarian")
+    allergens = [a for a, rate in ALLERGEN_RATES.items() if rng.random() < rate]
+    # Drop allergens that contradict the dish's tags
+    blocked = set()
+    if "vegan" in dietary:
+        blocked |= {"dairy", "eggs", "shellfish"}
+    if "vegetarian" in dietary:
+        blocked.add("shellfish")
+    if "gluten-free" in dietary:
+        blocked.add("gluten")
+    if "dairy-free" in dietary:
+        blocked.add("dairy")
+    if "nut-free" in dietary:
+        blocked.add("nuts")
+
+    return {
+        "name": name,
+        "price": round(rng.uniform(6, 45), 2),
+        "description": f"{rng.choice(ADJECTIVES)} {rng.choice(INGREDIENTS)} with {rng.choice(INGREDIENTS)}",
+        "dietary": dietary,
+        "allergens": [a for a in allergens if a not in blocked],
+    }
+
+
+def make_menu(rng: random.Random, index: int) -> dict:
+    """Builds one restaurant with its full menu"""
+    used_names = set()
+    return {
+        "restaurant_name": f"Synthetic {rng.choice(CUISINES)} Kitchen {index:06d}",
+        "location": rng.choice(LOCATIONS),
+        "cuisine": rng.choice(CUISINES),
+        "price_range": rng.choice([12, 18, 25, 30, 40, 55, 75]),
+        "rating": round(rng.uniform(3.0, 5.0), 1),
+        "menu": {
+            category: [make_dish(rng, used_names) for _ in range(rng.randint(low, high))]
+            for category, (low, high) in CATEGORIES.items()
+        },
+    }
+
+
+def generate_menus(out_dir: Path, restaurants: int, seed: int = 7) -> list:
+    """Writes `restaurants` menu files into out_dir.
+    Args:
+        out_dir: Directory to write into (created if missing)
+        restaurants: Number of restaurants
+        seed: Random seed
+    Returns:
+        List of (restaurant_name, location, cuisine) for query generation
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    written = []
+    for index in range(restaurants):
+        menu = make_menu(rng, index)
+        with open(out_dir / f"synthetic_{index:06d}.json", "w") as f:
+            json.dump(menu, f)
+        written.append((menu["restaurant_name"], menu["location"], menu["cuisine"]))
+    return written
+
+
+def make_queries(count: int, seed: int = 7) -> list:
+    """Builds booking queries over the synthetic locations and cuisines.
+    About a third of them contain words the rule parser cannot explain,
+    so they take the LLM path.
+    """
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        parts = [f"Table for {rng.randint(1, 8)}"]
+        if rng.random() < 0.7:
+            parts.append(f"{rng.choice(list(DIETARY_RATES))} options")
+        if rng.random() < 0.5:
+            parts.append(f"{rng.choice(CUISINES)} food")
+        parts.append(rng.choice(LOCATIONS))
+        if rng.random() < 0.6:
+            parts.append(f"under ${rng.choice([20, 30, 40, 60])} per person")
+        if i % 3 == 2:
+            parts.append("somewhere cozy for an anniversary dinner")
+        queries.append(", ".join(parts))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic restaurant menus")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--restaurants", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    generate_menus(args.out_dir, args.restaurants, args.seed)
+    print(f"Wrote {args.restaurants} menus to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
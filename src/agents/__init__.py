@@ -1,8 +1,10 @@
 """Agent modules for the Restaurant Booking Assistant"""
 
-from .input_parser_agent import input_parser_agent
+from .input_parser_agent import input_parser_agent, ainput_parser_agent
 from .restaurant_search_agent import restaurant_search_agent
 from .budget_filter_agent import budget_filter_agent
-from .dietary_analyzer_agent import dietary_analyzer_agent
+from .availability_agent import availability_filter_agent
+from .dietary_analyzer_agent import dietary_analyzer_agent, adietary_analyzer_agent
+from .ranking_agent import ranking_agent
 
-__all__ = ["input_parser_agent", "restaurant_search_agent", "budget_filter_agent", "dietary_analyzer_agent"]
\ No newline at end of file
+__all__ = ["input_parser_agent", "ainput_parser_agent", "restaurant_search_agent", "budget_filter_agent", "availability_filter_agent", "dietary_analyzer_agent", "adietary_analyzer_agent", "ranking_agent"]
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""Availability Filter Agent - Keeps restaurants with a free table.
+Runs when the request names a time: drops candidates that cannot seat
+the party within BOOKING_WINDOW_MINUTES of it, before the dietary
+analyzer spends lookups on them. The check is one bulk query over the
+availability engine; the booking itself re-checks under its lock. A party
+larger than any table, or a time that cannot be booked (passed, or beyond
+BOOKING_HORIZON_DAYS), is not checked: candidates are kept and the
+messages say so.
+"""
+
+from datetime import date
+import numpy as np
+from src.utils.state import AgentState
+from src.utils.metrics import debug
+from src.config.settings import BOOKING_DEFAULT_PARTY, BOOKING_WINDOW_MINUTES
+from src.booking import BookingError, get_availability_engine, parse_time, resolve_date, format_minutes
+from src.rag.restaurant_catalog import get_catalog
+
+
+def availability_filter_agent(state: AgentState) -> dict:
+    """Filters restaurants that can seat the party near the requested time.
+    Args:
+        state: current agent state with restaurant_candidates, date, time and persons_count
+    Returns:
+        State update with available restaurant_candidates and their
+        nearest free start times in available_times
+    """
+    restaurants = state["restaurant_candidates"]
+    minutes = parse_time(state["time"])
+    if minutes is None:
+        debug(f"\n [Availability Filter Agent] No usable time ({state['time']!r}), keeping all restaurants")
+        return {"messages": [f"Availability Filter: Could not read time {state['time']!r}, availability not checked"]}
+
+    day = resolve_date(state["date"]) or date.today()
+    party = state["persons_count"] or BOOKING_DEFAULT_PARTY
+    engine = get_availability_engine()
+    if party > engine.max_party:
+        # Large groups are arranged with the restaurant; dropping every
+        # candidate here would leave the user with no results and no reason
+        debug(f"\n [Availability Filter Agent] No table seats {party}, keeping all restaurants")
+        return {"messages": [
+            f"Availability Filter: No table size seats {party} (largest is {engine.max_party}), "
+            f"availability not checked; contact the restaurant for large groups"
+        ]}
+
+    try:
+        engine.check_bookable(day, minutes)
+    except BookingError as error:
+        debug(f"\n [Availability Filter Agent] {error}, keeping all restaurants")
+        return {"messages": [f"Availability Filter: {error}, availability not checked"]}
+
+    debug(f"\n[Availability Filter Agent] Tables for {party} on {day} around {format_minutes(minutes)}")
+    ids = np.asarray(restaurants, dtype=np.int64)
+    rows = engine.catalog_rows(get_catalog())[ids]
+    starts = engine.available(rows, day, minutes, party, BOOKING_WINDOW_MINUTES)
+    found = starts >= 0
+    available = ids[found].tolist()
+
+    return {
+        "restaurant_candidates": available,
+        "available_times": {int(i): format_minutes(int(s)) for i, s in zip(ids[found], starts[found])},
+        "messages": [
+            f"Availability Filter: {len(available)} of {len(restaurants)} restaurants can seat {party} "
+            f"on {day} within {BOOKING_WINDOW_MINUTES} min of {format_minutes(minutes)}"
+        ],
+    }
@@ -1,48 +1,54 @@
-"""Budget Filter Agent - Filters restaurant by budget per person."""
+"""Budget Filter Agent - Filters restaurant by budget per person.
+Runs before the dietary analyzer so RAG lookups are only done for
+restaurants the user can afford.
+"""
 
+import numpy as np
 from src.utils.state import AgentState
+from src.utils.metrics import debug
+from src.rag.restaurant_catalog import get_catalog
 
-def budget_filter_agent(state: AgentState) -> AgentState:
+def budget_filter_agent(state: AgentState) -> dict:
     """Filters restaurants that fit within the user's budget.
     Args: 
-        state: current agent state with dietary_matches and budget_per_person
+        state: current agent state with restaurant_candidates and budget_per_person
     Returns: 
-        Updated state with budget-filtered restaurants in dietary_matches
+        State update with budget-filtered restaurant_candidates
     """
 
     budget = state["budget_per_person"]
-    restaurants = state["dietary_matches"]
+    restaurants = state["restaurant_candidates"]
 
     if not budget:
-        print(f"\n [Budget Filter Agent] No budget specified, keeping all restaurants")
-        state["messages"].append("Budget Filter: No budget contraint")
-        return state
-
-    print(f"\n[Budget Filter Agent] Filtering by budget: ${budget}/person")
-
-    # Filter restaurants within budget
-    within_budget = []
-    over_budget = []
-    for restaurant in restaurants:
-        price = restaurant.get("price_range", 0)
-
-        if price <= budget:
-            within_budget.append(restaurant)
-            print(f"{restaurant['name']}: ${price}/person (within budget)")
-        else:
-            over_budget.append(restaurant)
-            print(f"{restaurant['name']}: ${price}/person (over budget) by ${price - budget}")
-
-    # Update state with filtered results
-    state["dietary_matches"] = within_budget
-    state["messages"].append(
-        f"Budget Filter: {len(within_budget)} of {len(restaurants)} restaurants within ${budget} budget"
-    )
-
-    if not within_budget:
-        print(f"\n No restaurants within ${budget}/person budget")
-        if over_budget:
-            cheapest = min(over_budget, key=lambda r: r.get("price_range", float('inf')))
-            print(f"Cheapest option: {cheapest['name']} at ${cheapest.get('price_range')}/person")
-
-    return state
\ No newline at end of file
+        debug(f"\n [Budget Filter Agent] No budget specified, keeping all restaurants")
+        return {"messages": ["Budget Filter: No budget contraint"]}
+
+    debug(f"\n[Budget Filter Agent] Filtering by budget: ${budget}/person")
+
+    # Filter restaurants within budget using the catalog's price column
+    catalog = get_catalog()
+    ids = np.asarray(restaurants, dtype=np.int64)
+    prices = catalog.prices[ids]
+    within_budget = ids[prices <= budget].tolist()
+
+    def listing() -> str:
+        lines = []
+        for restaurant_id, price in zip(restaurants, prices):
+            name = catalog.restaurant(restaurant_id).name
+            if price <= budget:
+                lines.append(f"{name}: ${price}/person (within budget)")
+            else:
+                lines.append(f"{name}: ${price}/person (over budget) by ${price - budget}")
+        if not within_budget:
+            lines.append(f"\n No restaurants within ${budget}/person budget")
+            if len(ids):
+                cheapest = catalog.restaurant(int(ids[np.argmin(prices)]))
+                lines.append(f"Cheapest option: {cheapest.name} at ${cheapest.price_range}/person")
+        return "\n".join(lines)
+
+    debug(listing)
+
+    return {
+        "restaurant_candidates": within_budget,
+        "messages": [f"Budget Filter: {len(within_budget)} of {len(restaurants)} restaurants within ${budget} budget"],
+    }
@@ -3,72 +3,153 @@ This is the key intelligent agent using semantic search over menus
 """
 
 from src.utils.state import AgentState
-from src.rag.menu_vectorstore import search_menus, get_restaurant_dishes
+from src.utils.executor import run_blocking
+from src.rag.menu_vectorstore import get_dishes_for_restaurants
+from src.rag.records import get_dish_registry
+from src.rag.restaurant_catalog import get_catalog
+from src.utils.metrics import debug
+from src.config.settings import DIETARY_FETCH_CHUNK_SIZE
 
-def dietary_analyzer_agent(state: AgentState) -> AgentState:
+# Matching dishes kept per restaurant
+TOP_DISHES = 5
+
+def dietary_analyzer_agent(state: AgentState) -> dict:
     """Analyzes restaurant menus using RAG to find dietary-compatible dishes.
     Uses semantic search to find dishes that match dietary requirements, 
     not just keyword matching. For example, "creamy vegan pasta" will find 
     "cashew alfredo pasta" even without the word "creamy".
+    Candidates are looked up a chunk at a time so streamed runs see each
+    restaurant's match as soon as its chunk is done.
 
     Args: 
         state: Current agent state with restaurant_candidates and dietary_requirements
 
     Returns: 
-        Updated state with dietary_matches
+        State update with dietary_matches and dish_matches
     """
 
-    dietary_requirements = state["dietary_requirements"]
-    restaurant_candidates = state["restaurant_candidates"]
+    if not state["dietary_requirements"]:
+        return _skip_unrestricted(state)
+    debug(f"\n[Dietary Analyzer Agent] Analyzing menus for: {state['dietary_requirements']}")
 
-    if not dietary_requirements:
-        print("\n[Dietary Analyzer Agent] No dietary requirements specified, skipping")
-        state["dietary_matches"] = restaurant_candidates
-        state["messages"].append("Dietary Analyzer: No dietary restrictions")
-        return state
-    print(f"\n[Dietary Analyzer Agent] Analyzing menus for: {dietary_requirements}")
+    write = _stream_writer()
+    dish_matches = {}
+    for chunk, names in _candidate_chunks(state):
+        # Fetch matching dishes for the whole chunk in one metadata query
+        dishes_by_restaurant = get_dishes_for_restaurants(
+            restaurant_names=names,
+            dietary_filter=state["dietary_requirements"]
+        )
+        _match_restaurants(state, chunk, names, dishes_by_restaurant, dish_matches, write)
+    return _finish(state, dish_matches)
 
-    # For each restaurant candidate, check if they have suitable dishes
-    matching_restaurants = []
-    for restaurant in restaurant_candidates:
-        restaurant_name = restaurant["name"]
-
-        # Use RAG to find dishes at this restaurant matching dietary needs
-        dishes = get_restaurant_dishes(
-            restaurant_name=restaurant_name,
-            dietary_filter=dietary_requirements
+
+async def adietary_analyzer_agent(state: AgentState) -> dict:
+    """Async variant of dietary_analyzer_agent.
+    The blocking dish lookups run on the bounded blocking pool.
+    """
+    if not state["dietary_requirements"]:
+        return _skip_unrestricted(state)
+    debug(f"\n[Dietary Analyzer Agent] Analyzing menus for: {state['dietary_requirements']}")
+
+    write = _stream_writer()
+    dish_matches = {}
+    for chunk, names in _candidate_chunks(state):
+        dishes_by_restaurant = await run_blocking(
+            get_dishes_for_restaurants,
+            restaurant_names=names,
+            dietary_filter=state["dietary_requirements"]
         )
+        _match_restaurants(state, chunk, names, dishes_by_restaurant, dish_matches, write)
+    return _finish(state, dish_matches)
+
+
+def _stream_writer():
+    """Returns the graph's custom stream writer, or a no-op outside a graph run"""
+    try:
+        from langgraph.config import get_stream_writer
+        return get_stream_writer()
+    except (ImportError, RuntimeError, KeyError):
+        return lambda chunk: None
+
+
+def replay_matches(update: dict) -> None:
+    """Streams a reused result's dietary_match events in their original order"""
+    write = _stream_writer()
+    for restaurant_id, dish_match in update["dish_matches"].items():
+        write({"dietary_match": (restaurant_id, dish_match)})
 
-        if dishes:
-            # Add dish information to restaurant data
-            restaurant_with_dishes = restaurant.copy()
-            restaurant_with_dishes["matching_dishes"] = [
-                {
-                    "name": d.metadata["dish_name"],
-                    "price": d.metadata["price"],
-                    "category": d.metadata["category"],
-                    "description": d.page_content.split("Description: ")[1].split("\n")[0] if "Description: " in d.page_content else ""
-                }
-                for d in dishes[:5]
-            ]
-            restaurant_with_dishes["matching_dish_count"] = len(dishes)
-            matching_restaurants.append(restaurant_with_dishes)
-            print(f"{restaurant_name}: Found {len(dishes)} {dietary_requirements} dishes")
-        else:
-            print(f"{restaurant_name}: No {dietary_requirements} options found")
 
-    # Update state
-    state["dietary_matches"] = matching_restaurants
-    state["messages"].append(
-        f"Dietary Analyzer: Found {len(matching_restaurants)} restaurants with {dietary_requirements} options"
-    )
+def merge_matches(candidates: list, previous: dict, update: dict = None) -> dict:
+    """Dietary results for candidates, combined from runs over disjoint candidate sets.
+    Args:
+        candidates: Restaurant IDs to cover, in output order
+        previous: Update of an earlier run
+        update: Optional update of a run over candidates the earlier one did not see
+    Returns:
+        dietary_matches and dish_matches for candidates
+    """
+    runs = [previous] if update is None else [previous, update]
+    matched = set().union(*(run["dietary_matches"] for run in runs))
+    dish_matches = {}
+    for run in runs:
+        dish_matches.update(run["dish_matches"])
+    dietary_matches = [c for c in candidates if c in matched]
+    return {
+        "dietary_matches": dietary_matches,
+        "dish_matches": {c: dish_matches[c] for c in dietary_matches if c in dish_matches},
+    }
+
 
-    if not matching_restaurants:
-        print(f"\n No restaurants found with {dietary_requirements} options")
+def _candidate_chunks(state: AgentState):
+    """Yields (restaurant IDs, names) in DIETARY_FETCH_CHUNK_SIZE slices"""
+    candidates = state["restaurant_candidates"]
+    catalog = get_catalog()
+    size = max(1, DIETARY_FETCH_CHUNK_SIZE)
+    for start in range(0, len(candidates), size):
+        chunk = candidates[start:start + size]
+        yield chunk, [catalog.restaurant(i).name for i in chunk]
 
-    return state
 
-        
+def _skip_unrestricted(state: AgentState) -> dict:
+    """Passes all candidates through when no dietary requirement was given"""
+    debug("\n[Dietary Analyzer Agent] No dietary requirements specified, skipping")
+    return {
+        "dietary_matches": state["restaurant_candidates"],
+        "dish_matches": {},
+        "messages": ["Dietary Analyzer: No dietary restrictions"],
+    }
 
 
-    
\ No newline at end of file
+def _match_restaurants(state: AgentState, restaurant_ids: list, names: list,
+                       dishes_by_restaurant: dict, dish_matches: dict, write) -> None:
+    """Records restaurants with matching dishes in dish_matches.
+    Each match is handed to the stream writer (as IDs) as soon as it is recorded.
+    """
+    dietary_requirements = state["dietary_requirements"]
+    registry = get_dish_registry()
+
+    # For each restaurant candidate, check if they have suitable dishes
+    for restaurant_id, restaurant_name in zip(restaurant_ids, names):
+        dishes = dishes_by_restaurant.get(restaurant_name, [])
+
+        if dishes:
+            top_dishes = registry.register(dishes[:TOP_DISHES])
+            dish_matches[restaurant_id] = (len(dishes), tuple(d.id for d in top_dishes))
+            write({"dietary_match": (restaurant_id, dish_matches[restaurant_id])})
+            debug(f"{restaurant_name}: Found {len(dishes)} {dietary_requirements} dishes")
+        else:
+            debug(f"{restaurant_name}: No {dietary_requirements} options found")
+
+
+def _finish(state: AgentState, dish_matches: dict) -> dict:
+    """Builds the state update from the collected matches"""
+    dietary_requirements = state["dietary_requirements"]
+    if not dish_matches:
+        debug(f"\n No restaurants found with {dietary_requirements} options")
+
+    return {
+        "dietary_matches": list(dish_matches),
+        "dish_matches": dish_matches,
+        "messages": [f"Dietary Analyzer: Found {len(dish_matches)} restaurants with {dietary_requirements} options"],
+    }
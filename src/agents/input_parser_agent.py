@@ -1,33 +1,54 @@
 """Input Parser Agent - Extracts structured data from natural language.
 Uses LLM to parse user input into structured requirements
 """
-from langchain_groq import ChatGroq
 import os
 import json
+import logging
+import threading
 from dotenv import load_dotenv
 from src.utils.state import AgentState
+from src.agents.rule_parser import parse_query_rules
+from src.agents.parse_cache import get_parse_cache
+from src.utils.metrics import LLM_SECONDS, debug, log_event, record_llm_usage, timed
+from src.config.settings import RULE_PARSER_MIN_CONFIDENCE, LLM_BACKEND, STUB_LLM_LATENCY_MS
 
 load_dotenv()
 
 groq_api_key = os.getenv("GROQ_API_KEY")
 groq_model = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+if LLM_BACKEND == "stub":
+    groq_model = "stub"
 
-# Initialize LLM
-llm = ChatGroq(model=groq_model, api_key=groq_api_key, temperature=0)
+_llm = None
+_llm_lock = threading.Lock()
 
 
-def input_parser_agent(state: AgentState) -> AgentState:
-    """Parses natural langugae input into structured requirements
-    Args: 
-        state: current agent state with user query
-    Returns:
-        Updated state with parsed requirements
+def get_llm():
+    """Returns the shared chat model, creating it on first call.
+    LLM_BACKEND=stub returns an offline stand-in for load testing.
     """
-    user_query = state["user_query"]
-    print(f"[Input Parser Agent] Parsing: '{user_query}'")
-
-    # Create prompt for structured extraction
-    prompt = f"""
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                if LLM_BACKEND == "stub":
+                    from src.agents.stub_llm import StubLLM
+                    _llm = StubLLM(latency_ms=STUB_LLM_LATENCY_MS)
+                else:
+                    from langchain_groq import ChatGroq
+                    _llm = ChatGroq(model=groq_model, api_key=groq_api_key, temperature=0)
+    return _llm
+
+
+PARSED_FIELDS = [
+    "persons_count", "dietary_requirements", "budget_per_person",
+    "date", "time", "location", "cuisine_preference",
+]
+
+
+def build_prompt(user_query: str) -> str:
+    """Builds the structured-extraction prompt for a user query"""
+    return f"""
     You are an expert at extracting structured information from natural language.
 
 User Query: {user_query}
@@ -36,49 +57,175 @@ Extract the following information. If something is not mentioned, return null.
 Return only valid JSON in this exact format:
 {{
     "persons_count": <number or null>,
-    "dietary_requirements": "<string or null>"
+    "dietary_requirements": "<string or null>",
     "budget_per_person": <number or null>,
     "date": "<string or null>",
     "time": "<string or null>",
     "location": "<string or null>",
-    "cuisine_prference": "<string or null>"
+    "cuisine_preference": "<string or null>"
 }}
 
 Examples: 
 - "Table for 4, vegan options, downtown Seattle, Saturday 7pm"
--> {{"persons_count": 4, "dietary_requirements": "vegan", "budget_per_person": null, "date": "Saturday", "time": "7pm", "location": "downtown Seattle", "cuisine_prference": null}}
+-> {{"persons_count": 4, "dietary_requirements": "vegan", "budget_per_person": null, "date": "Saturday", "time": "7pm", "location": "downtown Seattle", "cuisine_preference": null}}
 
 - "Italian restaurant for 2, budget $50 per person"
--> {{"persons_count": 2, "dietary_requirements": null, "budget_per_person": 50, "date": null, "time": null, "location": null, "cuisine_prference": "Italian"}}
+-> {{"persons_count": 2, "dietary_requirements": null, "budget_per_person": 50, "date": null, "time": null, "location": null, "cuisine_preference": "Italian"}}
 
 Now parse the user query above. Return ONLY the JSON, no other text.
 """
 
-    # Get LLM response
-    response = llm.invoke(prompt)
 
-    try: 
-        # Parse JSON response
-        parsed_data = json.loads(response.content)
+def parse_llm_response(content: str):
+    """Parses the LLM's JSON answer into a dict of PARSED_FIELDS.
+    Returns:
+        Parsed dict, or None if the response was not valid JSON
+    """
+    try:
+        parsed_data = json.loads(content)
+    except json.JSONDecodeError as e:
+        log_event("llm_response_invalid", logging.WARNING, error=str(e), raw_response=content[:500])
+        return None
+    return {field: parsed_data.get(field) for field in PARSED_FIELDS}
+
+
+def parsed_update(parsed: dict, message: str) -> dict:
+    """Builds the state update for parsed requirements"""
+    update = {field: parsed.get(field) for field in PARSED_FIELDS}
+    update["messages"] = [message]
+    return update
 
-        # Update state with parsed values
-        state["persons_count"] = parsed_data.get("persons_count")
-        state["dietary_requirements"] = parsed_data.get("dietary_requirements")
-        state["budget_per_person"] = parsed_data.get("budget_per_person")
-        state["date"] = parsed_data.get("date")
-        state["time"] = parsed_data.get("time")
-        state["location"] = parsed_data.get("location")
-        state["cuisine_preference"] = parsed_data.get("cuisine_preference")
 
-        # Log successful parse
-        state["messages"].append(f"Input Parser: Extracted requirements from query")
-        print(f"[Input Parser Agent] Parsed data: {state}")
+def _turn_text(state: AgentState) -> str:
+    """Text to parse this turn: a session's follow-up, else the query"""
+    return state.get("follow_up") or state["user_query"]
 
-    except json.JSONDecodeError as e:
-        print(f"Failed to parse JSON: {e}")
-        print(f"Raw response: {response.content}")
-        state["messages"].append(f"Input Parser: Failed to extract requirements from query")
 
-    return state
+def _parse_without_llm(user_query: str):
+    """Tries the parse cache and the rule parser.
+    Returns:
+        State update if the LLM can be skipped, otherwise None
+    """
+    debug(f"[Input Parser Agent] Parsing: '{user_query}'")
+
+    # Reuse an earlier LLM parse of the same (normalized) query
+    cached = get_parse_cache().get(user_query, groq_model)
+    if cached is not None:
+        debug(f"[Input Parser Agent] Cache hit: {cached}")
+        return parsed_update(cached, "Input Parser: Reused cached requirements for query")
+
+    # Fast path: skip the LLM round trip when the rules explain the whole query
+    parsed, confidence = parse_query_rules(user_query)
+    if confidence >= RULE_PARSER_MIN_CONFIDENCE:
+        debug(f"[Input Parser Agent] Rule parser: {parsed}")
+        return parsed_update(parsed, f"Input Parser: Extracted requirements with rule parser (confidence {confidence:.2f})")
 
+    return None
 
+
+def _apply_llm_response(user_query: str, content: str) -> dict:
+    """Parses the LLM answer into a state update and caches it"""
+    parsed = parse_llm_response(content)
+
+    if parsed is None:
+        return {"messages": ["Input Parser: Failed to extract requirements from query"]}
+
+    get_parse_cache().put(user_query, groq_model, parsed)
+    debug(f"[Input Parser Agent] Parsed data: {parsed}")
+    return parsed_update(parsed, "Input Parser: Extracted requirements from query")
+
+
+def _apply_follow_up(state: AgentState, update: dict) -> dict:
+    """Turns the parse of a follow-up into a refinement of the current requirements.
+    Fields the follow-up mentions replace the previous values; the others
+    are kept. The follow-up is appended to user_query so ranking still
+    sees the dishes asked for earlier.
+    """
+    follow_up = state.get("follow_up")
+    if not follow_up:
+        return update
+
+    refined = {
+        field: update[field] if update.get(field) is not None else state.get(field)
+        for field in PARSED_FIELDS
+    }
+    changed = [field for field in PARSED_FIELDS if refined[field] != state.get(field)]
+    debug(f"[Input Parser Agent] Follow-up changed: {changed}")
+    return {
+        **refined,
+        "user_query": f"{state['user_query']} {follow_up}",
+        "follow_up": None,
+        "messages": update["messages"] + [f"Input Parser: Follow-up changed {', '.join(changed) or 'nothing'}"],
+    }
+
+
+def input_parser_agent(state: AgentState) -> dict:
+    """Parses natural langugae input into structured requirements.
+    Repeated queries are served from the parse cache, common unambiguous
+    queries by the deterministic rule parser; everything else goes to the LLM.
+    On a session's follow-up turn only the follow-up text is parsed.
+
+    Args: 
+        state: current agent state with user query
+    Returns:
+        State update with parsed requirements
+    """
+    user_query = _turn_text(state)
+    update = _parse_without_llm(user_query)
+    if update is None:
+        # Get LLM response
+        with timed(LLM_SECONDS, model=groq_model, mode="invoke"):
+            response = get_llm().invoke(build_prompt(user_query))
+        record_llm_usage(response, groq_model)
+        update = _apply_llm_response(user_query, response.content)
+    return _apply_follow_up(state, update)
+
+
+async def ainput_parser_agent(state: AgentState) -> dict:
+    """Async variant of input_parser_agent using the LLM's async client"""
+    user_query = _turn_text(state)
+    update = _parse_without_llm(user_query)
+    if update is None:
+        with timed(LLM_SECONDS, model=groq_model, mode="ainvoke"):
+            response = await get_llm().ainvoke(build_prompt(user_query))
+        record_llm_usage(response, groq_model)
+        update = _apply_llm_response(user_query, response.content)
+    return _apply_follow_up(state, update)
+
+
+async def aprime_parse_cache(user_queries: list, max_concurrency: int = 8) -> int:
+    """Parses many queries with one batched LLM call and caches the results.
+    Queries already cached or handled by the rule parser are skipped. Run
+    this before pushing the queries through the workflow so its input
+    parser stage is served from the cache.
+
+    Args:
+        user_queries: Raw user queries
+        max_concurrency: Maximum concurrent LLM requests inside the batch
+    Returns:
+        Number of queries sent to the LLM
+    """
+    parse_cache = get_parse_cache()
+    pending = list(dict.fromkeys(
+        q for q in user_queries
+        if not parse_cache.contains(q, groq_model)
+        and parse_query_rules(q)[1] < RULE_PARSER_MIN_CONFIDENCE
+    ))
+    if not pending:
+        return 0
+
+    with timed(LLM_SECONDS, model=groq_model, mode="abatch"):
+        responses = await get_llm().abatch(
+            [build_prompt(q) for q in pending],
+            config={"max_concurrency": max_concurrency},
+            return_exceptions=True
+        )
+    for user_query, response in zip(pending, responses):
+        if isinstance(response, Exception):
+            log_event("llm_batch_parse_failed", logging.WARNING, user_query=user_query, error=repr(response))
+            continue
+        record_llm_usage(response, groq_model)
+        parsed = parse_llm_response(response.content)
+        if parsed is not None:
+            parse_cache.put(user_query, groq_model, parsed)
+    return len(pending)
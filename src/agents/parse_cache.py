@@ -0,0 +1,150 @@
+"""Parse Cache - Reuses LLM parses for repeated and near-duplicate queries.
+Queries are normalized (case, whitespace, punctuation) and keyed together
+with the model name. Entries live in an in-memory LRU with a TTL and,
+when PARSE_CACHE_PATH is set, in a SQLite tier that survives restarts.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from src.config.settings import PARSE_CACHE_SIZE, PARSE_CACHE_TTL_SECONDS, PARSE_CACHE_PATH
+
+
+def normalize_query(query: str) -> str:
+    """Normalizes a query so trivially different phrasings share a key.
+    Lowercases, drops punctuation that does not carry meaning (keeping
+    "$30" and "7:30pm" intact) and collapses whitespace.
+    """
+    query = query.lower()
+    query = re.sub(r"(?<!\d)[.:]|[.:](?!\d)", " ", query)
+    query = re.sub(r"[^\w$.:]+", " ", query)
+    return " ".join(query.split())
+
+
+class ParseCache:
+    """LRU + TTL cache of parsed requirements with an optional disk tier."""
+
+    def __init__(self, max_entries: int = PARSE_CACHE_SIZE, ttl_seconds: float = PARSE_CACHE_TTL_SECONDS,
+                 disk_path: Path = PARSE_CACHE_PATH):
+        """
+        Args:
+            max_entries: Maximum entries kept in memory
+            ttl_seconds: Lifetime of an entry in either tier
+            disk_path: Optional SQLite file for the persistent tier
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if disk_path is not None:
+            self._conn = sqlite3.connect(str(disk_path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS parses ("
+                "key TEXT PRIMARY KEY, parsed TEXT NOT NULL, created_at REAL NOT NULL) WITHOUT ROWID"
+            )
+            self._conn.commit()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(query: str, model: str) -> str:
+        """Builds the cache key for a query under a given model."""
+        return hashlib.sha256(f"{model}\x1f{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+    def get(self, query: str, model: str):
+        """Returns the cached parse for a query, or None.
+        Args:
+            query: Raw user query
+            model: LLM model name the parse came from
+        """
+        key = self.make_key(query, model)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, parsed = entry
+                if now - created_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return dict(parsed)
+                del self._entries[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT parsed, created_at FROM parses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] < self.ttl_seconds:
+                    parsed = json.loads(row[0])
+                    self._remember(key, row[1], parsed)
+                    self.disk_hits += 1
+                    return dict(parsed)
+
+            self.misses += 1
+            return None
+
+    def contains(self, query: str, model: str) -> bool:
+        """Whether a live parse is cached for a query, without counting a
+        lookup or changing the LRU order (e.g. to plan a prefetch)"""
+        key = self.make_key(query, model)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl_seconds:
+                return True
+            if self._conn is not None:
+                row = self._conn.execute("SELECT created_at FROM parses WHERE key = ?", (key,)).fetchone()
+                return row is not None and now - row[0] < self.ttl_seconds
+            return False
+
+    def put(self, query: str, model: str, parsed: dict) -> None:
+        """Stores a parse in both tiers."""
+        key = self.make_key(query, model)
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, dict(parsed))
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO parses (key, parsed, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(parsed), now),
+                )
+                self._conn.execute("DELETE FROM parses WHERE created_at < ?", (now - self.ttl_seconds,))
+                self._conn.commit()
+
+    def _remember(self, key: str, created_at: float, parsed: dict) -> None:
+        self._entries[key] = (created_at, parsed)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the overall hit rate."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+_parse_cache = None
+_parse_cache_lock = threading.Lock()
+
+
+def get_parse_cache() -> ParseCache:
+    """Returns the shared parse cache, creating it on first call."""
+    global _parse_cache
+    if _parse_cache is None:
+        with _parse_cache_lock:
+            if _parse_cache is None:
+                _parse_cache = ParseCache()
+    return _parse_cache
@@ -0,0 +1,139 @@
+"""Ranking Agent - Scores matching restaurants and keeps the top K.
+Scores are computed for the whole candidate set at once with NumPy; the
+top K are then selected with a bounded heap instead of a full sort.
+"""
+
+import functools
+import heapq
+import re
+import numpy as np
+from src.utils.state import AgentState
+from src.utils.metrics import debug
+from src.config.settings import RANKING_TOP_K, RANKING_WEIGHTS, DISH_RECORD_CACHE_SIZE
+from src.rag.records import Dish, get_dish_registry
+from src.rag.restaurant_catalog import get_catalog
+
+_WORD = re.compile(r"[a-z]{3,}")
+
+_NO_MATCH = (0, ())
+
+
+@functools.lru_cache(maxsize=DISH_RECORD_CACHE_SIZE)
+def _dish_words(dish: Dish) -> frozenset:
+    """Words of a dish's name and description, computed once per record"""
+    return frozenset(_WORD.findall(f"{dish.name} {dish.description}".lower()))
+
+
+def dish_relevance(matches: list, query: str) -> np.ndarray:
+    """Share of the query's dish words found in each restaurant's matching dishes.
+    A query word counts as a dish word when it appears in any candidate's
+    matching dishes, so location, date and filler words drop out.
+
+    Args:
+        matches: (matching dish count, top dish IDs) per restaurant
+        query: User query
+    Returns:
+        Array of shares in [0, 1] aligned with matches
+    """
+    relevance = np.zeros(len(matches))
+    query_words = sorted(set(_WORD.findall(query.lower())))
+    dish_ids = [dish_id for _, ids in matches for dish_id in ids]
+    if not query_words or not dish_ids:
+        return relevance
+
+    # One registry call, and one row of word hits per distinct dish
+    unique_ids, inverse = np.unique(np.asarray(dish_ids), return_inverse=True)
+    dishes = {dish.id: dish for dish in get_dish_registry().get(unique_ids.tolist())}
+    hits = np.array(
+        [[word in words for word in query_words]
+         for words in (_dish_words(dishes[d]) if d in dishes else frozenset() for d in unique_ids.tolist())],
+        dtype=bool,
+    )[inverse]
+
+    # OR the hits of each restaurant's dishes (contiguous runs in dish_ids)
+    lengths = np.fromiter((len(ids) for _, ids in matches), dtype=np.int64, count=len(matches))
+    starts = np.cumsum(lengths) - lengths
+    found = np.zeros((len(matches), len(query_words)), dtype=bool)
+    has_dishes = lengths > 0
+    found[has_dishes] = np.logical_or.reduceat(hits, starts[has_dishes], axis=0)
+
+    dish_words = found.any(axis=0)
+    if dish_words.any():
+        relevance = found[:, dish_words].sum(axis=1) / dish_words.sum()
+    return relevance
+
+
+def score_restaurants(restaurant_ids: list, dish_matches: dict = None, budget: float = None,
+                      query: str = "", weights: dict = RANKING_WEIGHTS) -> np.ndarray:
+    """Scores restaurants on rating, price headroom, dish count and relevance.
+    Args:
+        restaurant_ids: Candidate catalog IDs (from ranking_candidates)
+        dish_matches: Restaurant ID -> (matching dish count, top dish IDs)
+        budget: Optional budget per person
+        query: User query, used for dish relevance
+        weights: Weight per feature (rating, price_headroom, dish_count, relevance)
+    Returns:
+        Array of scores aligned with restaurant_ids
+    """
+    catalog = get_catalog()
+    dish_matches = dish_matches or {}
+    ids = np.asarray(restaurant_ids, dtype=np.int64)
+    ratings = catalog.ratings[ids].astype(np.float64)
+    prices = catalog.prices[ids].astype(np.float64)
+    matches = [dish_matches.get(i, _NO_MATCH) for i in restaurant_ids]
+    dish_counts = np.fromiter((count for count, _ in matches), dtype=np.float64, count=len(matches))
+
+    # Rating on a 0-5 scale
+    rating_score = ratings / 5.0
+
+    # Share of the budget left over after the meal
+    if budget:
+        headroom = np.clip((budget - prices) / budget, 0.0, 1.0)
+    else:
+        headroom = np.zeros(len(ids))
+
+    # Diminishing returns on the number of matching dishes
+    max_count = dish_counts.max() if len(dish_counts) else 0.0
+    dish_score = np.log1p(dish_counts) / np.log1p(max_count) if max_count else np.zeros(len(ids))
+
+    # Share of the query's dish words found in the restaurant's matching dishes
+    relevance = dish_relevance(matches, query)
+
+    return (
+        weights.get("rating", 0.0) * rating_score
+        + weights.get("price_headroom", 0.0) * headroom
+        + weights.get("dish_count", 0.0) * dish_score
+        + weights.get("relevance", 0.0) * relevance
+    )
+
+
+def ranking_candidates(state: AgentState) -> list:
+    """Restaurants left for ranking: the dietary matches when the dietary
+    analyzer is in the plan, otherwise the filtered candidates"""
+    if "dietary_analyzer" in state["execution_plan"]:
+        return state["dietary_matches"]
+    return state["restaurant_candidates"]
+
+
+def ranking_agent(state: AgentState) -> dict:
+    """Ranks the remaining restaurants and stores the top K in final_recommendations.
+    Args:
+        state: current agent state with execution_plan and restaurant_candidates or dietary_matches
+    Returns:
+        State update with final_recommendations as (restaurant ID, score), best first
+    """
+    restaurants = ranking_candidates(state)
+    if not restaurants:
+        return {"final_recommendations": [], "messages": ["Ranking: No restaurants to rank"]}
+
+    scores = score_restaurants(
+        restaurants, state.get("dish_matches"), state["budget_per_person"], state["user_query"]
+    )
+
+    # Bounded heap: O(n log k) instead of sorting every candidate
+    top = heapq.nlargest(RANKING_TOP_K, range(len(restaurants)), key=scores.__getitem__)
+    debug(f"\n[Ranking Agent] Top {len(top)} of {len(restaurants)} restaurants")
+    return {
+        "final_recommendations": [(restaurants[i], round(float(scores[i]), 4)) for i in top],
+        "messages": [f"Ranking: Top {len(top)} of {len(restaurants)} restaurants selected"],
+    }
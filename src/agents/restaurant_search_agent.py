@@ -1,8 +1,12 @@
 """Restaurant Search Agent - Finds restaurants based on location and cuisine
-Note: Currently using mock data
+Searches the indexed restaurant catalog built at ingest time; falls back to
+the mock restaurants below when no catalog has been ingested.
 """
 
 from src.utils.state import AgentState
+from src.utils.metrics import debug
+from src.rag.restaurant_catalog import get_catalog, DIETARY_FLAGS
+from src.rag.schema import normalize_tag
 
 MOCK_RESTAURANTS = [
      {
@@ -57,42 +61,36 @@ MOCK_RESTAURANTS = [
     }
 ]
 
-def restaurant_search_agent(state: AgentState) -> AgentState:
+def restaurant_search_agent(state: AgentState) -> dict:
     """ Searches for restaurants based on location and cuisine preference.
     Args:
         state: current agent state with parsed requirements
     Returns:
-        Updated state restaurant_candidates
+        State update with restaurant_candidates (catalog IDs)
     """
 
     location = state["location"] or "Seattle"
     cuisine = state["cuisine_preference"]
 
-    print(f"[Restaurant Search Agent] Searching in {location} ...")
+    debug(f"[Restaurant Search Agent] Searching in {location} ...")
     if cuisine:
-        print(f"Filtering by cuisine: {cuisine}")
+        debug(f"Filtering by cuisine: {cuisine}")
 
-    # Filter restaturants
-    restaurant_candidates = []
-    for restaurant in MOCK_RESTAURANTS:
-        # Check location match (simple string matching for now)
-        location_match = location.lower() in restaurant["location"].lower()
+    # Dietary flags are a cheap necessary condition for the RAG dietary stage
+    required_flags = DIETARY_FLAGS.get(normalize_tag(state["dietary_requirements"] or ""), 0)
 
-        # Check cusine match (if specified)
-        cuisine_match = True
-        if cuisine:
-            cuisine_match = cuisine.lower() in restaurant["cuisine"].lower()
-        if location_match and cuisine_match:
-            restaurant_candidates.append(restaurant)
+    # Intersect the location and cuisine indexes
+    catalog = get_catalog()
+    restaurant_candidates = catalog.search(
+        location=location, cuisine=cuisine, required_flags=required_flags
+    ).tolist()
 
-    # Update state
-    state["restaurant_candidates"] = restaurant_candidates
-    state["messages"].append(f"Restaurant Search: Found {len(restaurant_candidates)} restaurants")
+    debug(f"Found {len(restaurant_candidates)} restaurants:")
+    debug(lambda: "\n".join(
+        f" - {r.name} ({r.cuisine}) - ${r.price_range}/person" for r in map(catalog.restaurant, restaurant_candidates)
+    ))
 
-    print(f"Found {len(restaurant_candidates)} restaurants:")
-    for r in restaurant_candidates:
-        print(f" - {r['name']} ({r['cuisine']}) - ${r['price_range']}/person")
-
-    return state
-
-      
+    return {
+        "restaurant_candidates": restaurant_candidates,
+        "messages": [f"Restaurant Search: Found {len(restaurant_candidates)} restaurants"],
+    }
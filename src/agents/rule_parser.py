@@ -0,0 +1,170 @@
+"""Rule Parser - Deterministic fast path for common booking queries.
+Extracts party size, budget, dietary terms, day/time, cuisine and known
+neighborhoods with regular expressions. Every extractor records which
+part of the query it consumed; the confidence score is the share of
+meaningful words that were explained. Queries with unexplained words or
+conflicting values get a low score and go to the LLM instead.
+"""
+
+import re
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+_NUM = r"(\d{1,2}|" + "|".join(NUMBER_WORDS) + r")"
+
+DIETARY_TERMS = {
+    "vegan": "vegan",
+    "vegetarian": "vegetarian",
+    "veggie": "vegetarian",
+    "gluten[- ]?free": "gluten-free",
+    "dairy[- ]?free": "dairy-free",
+    "nut[- ]?free": "nut-free",
+    "halal": "halal",
+    "kosher": "kosher",
+    "pescatarian": "pescatarian",
+}
+
+CUISINES = [
+    "American", "Mediterranean", "Italian", "Indian", "Seafood", "Mexican", "Chinese",
+    "Japanese", "Thai", "French", "Greek", "Korean", "Vietnamese", "Spanish", "Middle Eastern",
+]
+
+# Neighborhoods we serve; longer names first so "downtown Seattle" wins over "Seattle"
+KNOWN_LOCATIONS = sorted([
+    "downtown Seattle", "Capitol Hill Seattle", "Capitol Hill", "Waterfront Seattle", "Waterfront",
+    "Ballard", "Fremont", "Queen Anne", "South Lake Union", "Belltown", "Pioneer Square",
+    "University District", "Seattle",
+], key=len, reverse=True)
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+RELATIVE_DAYS = ["today", "tonight", "tomorrow"]
+MONTHS = ["january", "february", "march", "april", "may", "june", "july",
+          "august", "september", "october", "november", "december"]
+
+# Words that carry no requirement on their own
+FILLER_WORDS = {
+    "a", "an", "the", "for", "of", "at", "on", "in", "to", "with", "and", "or", "please",
+    "table", "tables", "party", "people", "persons", "person", "guests", "pax", "us", "me",
+    "i", "we", "want", "need", "would", "like", "book", "booking", "reserve", "reservation",
+    "find", "looking", "some", "any", "options", "option", "food", "restaurant", "restaurants",
+    "place", "places", "spot", "dinner", "lunch", "brunch", "breakfast", "per", "each", "head",
+    "pp", "budget", "under", "below", "max", "maximum", "less", "than", "up", "around", "about",
+    "near", "dishes", "menu", "friendly", "cuisine", "somewhere", "good", "nice", "can", "you",
+    "get", "pm", "am", "this", "next", "o'clock", "dollars", "usd", "is", "my", "our",
+}
+
+PATTERNS = {
+    "persons_count": [
+        re.compile(r"\b(?:table|party|reservation|booking)\s+(?:for|of)\s+" + _NUM + r"\b", re.I),
+        re.compile(r"\b" + _NUM + r"\s+(?:people|persons|guests|pax|adults)\b", re.I),
+        re.compile(r"\bfor\s+" + _NUM + r"\b(?!\s*(?:am|pm|:|\$))", re.I),
+    ],
+    "budget_per_person": [
+        re.compile(r"\b(?:under|below|less than|max(?:imum)?|up to|budget(?: of)?)\s+\$?\s*(\d+(?:\.\d+)?)"
+                   r"(?:\s*(?:dollars|usd))?(?:\s*(?:per|a|/)\s*(?:person|head|pp))?", re.I),
+        re.compile(r"\$\s*(\d+(?:\.\d+)?)\s*(?:per|a|/)\s*(?:person|head|pp)", re.I),
+        re.compile(r"\$\s*(\d+(?:\.\d+)?)\s*(?:budget|max)", re.I),
+    ],
+    "time": [
+        re.compile(r"\b(\d{1,2}(?::\d{2})?\s*(?:am|pm))\b", re.I),
+        re.compile(r"\b(noon|midnight)\b", re.I),
+    ],
+    "date": [
+        re.compile(r"\b(?:this\s+|next\s+)?(" + "|".join(WEEKDAYS) + r")\b", re.I),
+        re.compile(r"\b(" + "|".join(RELATIVE_DAYS) + r")\b", re.I),
+        re.compile(r"\b((?:" + "|".join(MONTHS) + r")\s+\d{1,2}(?:st|nd|rd|th)?)\b", re.I),
+    ],
+}
+
+_DIETARY_PATTERNS = [(re.compile(r"\b" + p + r"\b", re.I), tag) for p, tag in DIETARY_TERMS.items()]
+_CUISINE_PATTERNS = [(re.compile(r"\b" + re.escape(c) + r"\b", re.I), c) for c in CUISINES]
+_LOCATION_PATTERNS = [(re.compile(r"\b" + re.escape(l) + r"\b", re.I), l) for l in KNOWN_LOCATIONS]
+_TOKEN = re.compile(r"[a-z0-9'$]+", re.I)
+
+
+def _to_number(value: str) -> float:
+    value = value.lower()
+    return float(NUMBER_WORDS.get(value) or value)
+
+
+def _find_all(patterns, query: str):
+    """Returns (value, span) for every pattern match, without overlaps."""
+    found, taken = [], []
+    for pattern in patterns:
+        for match in pattern.finditer(query):
+            if any(match.start() < end and start < match.end() for start, end in taken):
+                continue
+            taken.append(match.span())
+            found.append((match, match.span()))
+    return found
+
+
+def parse_query_rules(query: str):
+    """Extracts booking requirements from a query without calling the LLM.
+    Args:
+        query: User query text
+    Returns:
+        Tuple of (parsed, confidence). parsed has the same keys as the LLM
+        parse; confidence is in [0, 1], where 1 means every meaningful word
+        was explained and no field had conflicting values.
+    """
+    parsed = {
+        "persons_count": None, "dietary_requirements": None, "budget_per_person": None,
+        "date": None, "time": None, "location": None, "cuisine_preference": None,
+    }
+    spans = []
+    conflicts = 0
+
+    def take(field, values, value_spans):
+        nonlocal conflicts
+        distinct = list(dict.fromkeys(values))
+        if not distinct:
+            return
+        if len(distinct) > 1:
+            conflicts += 1
+        parsed[field] = distinct[0]
+        spans.extend(value_spans)
+
+    # Budget first so "$30" is not mistaken for a party size
+    matches = _find_all(PATTERNS["budget_per_person"], query)
+    budgets = [_to_number(m.group(1)) for m, _ in matches]
+    take("budget_per_person", [int(b) if b.is_integer() else b for b in budgets], [s for _, s in matches])
+
+    for field in ("time", "date"):
+        matches = [(m, s) for m, s in _find_all(PATTERNS[field], query)
+                   if not any(s[0] < e and b < s[1] for b, e in spans)]
+        take(field, [m.group(1).capitalize() if field == "date" else m.group(1).replace(" ", "").lower()
+                     for m, _ in matches], [s for _, s in matches])
+
+    matches = [(m, s) for m, s in _find_all(PATTERNS["persons_count"], query)
+               if not any(s[0] < e and b < s[1] for b, e in spans)]
+    take("persons_count", [int(_to_number(m.group(1))) for m, _ in matches], [s for _, s in matches])
+
+    for field, patterns in (("dietary_requirements", _DIETARY_PATTERNS),
+                            ("cuisine_preference", _CUISINE_PATTERNS),
+                            ("location", _LOCATION_PATTERNS)):
+        found = _find_all([p for p, _ in patterns], query)
+        labels = {p.pattern: label for p, label in patterns}
+        values = [
+            m.group(0) if field == "location" else labels[m.re.pattern]
+            for m, _ in found
+        ]
+        take(field, values, [s for _, s in found])
+
+    # Share of meaningful words explained by some extractor
+    content_tokens = [
+        t for t in _TOKEN.finditer(query)
+        if t.group(0).lower().strip("$") not in FILLER_WORDS and t.group(0).strip("$")
+    ]
+    explained = sum(
+        1 for t in content_tokens
+        if any(start <= t.start() and t.end() <= end for start, end in spans)
+    )
+    confidence = explained / len(content_tokens) if content_tokens else 0.0
+    if not spans:
+        confidence = 0.0
+    confidence *= 0.5 ** conflicts
+
+    return parsed, confidence
@@ -0,0 +1,62 @@
+"""Stub LLM - Offline stand-in for the Groq chat model.
+Answers parser prompts with valid JSON built by the rule parser, after an
+optional artificial delay. Used for load testing without a Groq key
+(LLM_BACKEND=stub).
+"""
+
+import asyncio
+import json
+import re
+import time
+from dataclasses import dataclass
+from src.agents.rule_parser import parse_query_rules
+
+_QUERY_LINE = re.compile(r"^User Query: (.*)$", re.M)
+
+
+@dataclass
+class StubMessage:
+    """Minimal chat message with the .content and .usage_metadata attributes agents read"""
+    content: str
+    usage_metadata: dict = None
+
+
+class StubLLM:
+    """Chat-model look-alike supporting invoke/ainvoke/batch/abatch."""
+
+    model_name = "stub"
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def _answer(self, prompt: str) -> StubMessage:
+        self.calls += 1
+        match = _QUERY_LINE.search(prompt)
+        parsed, _ = parse_query_rules(match.group(1) if match else prompt)
+        content = json.dumps(parsed)
+        # Whitespace token counts keep the token metrics meaningful offline
+        usage = {"input_tokens": len(prompt.split()), "output_tokens": len(content.split())}
+        return StubMessage(content=content, usage_metadata=usage)
+
+    def invoke(self, prompt: str, config=None) -> StubMessage:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return self._answer(prompt)
+
+    async def ainvoke(self, prompt: str, config=None) -> StubMessage:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return self._answer(prompt)
+
+    def batch(self, prompts: list, config=None, return_exceptions: bool = False) -> list:
+        return [self.invoke(p) for p in prompts]
+
+    async def abatch(self, prompts: list, config=None, return_exceptions: bool = False) -> list:
+        limit = asyncio.Semaphore((config or {}).get("max_concurrency") or len(prompts) or 1)
+
+        async def gated(prompt):
+            async with limit:
+                return await self.ainvoke(prompt)
+
+        return list(await asyncio.gather(*(gated(p) for p in prompts), return_exceptions=return_exceptions))
@@ -0,0 +1,166 @@
+"""Restaurant Booking Assistant - HTTP Service.
+Compiles the workflow once and serves booking queries concurrently with
+ainvoke. Run with:
+
+    uvicorn src.api:app --host 0.0.0.0 --port 8000
+
+POST /recommendations/stream returns the same run as partial results,
+as Server-Sent Events (default) or JSON lines (?format=jsonl).
+Requests carrying a session_id are turns of one conversation: later
+queries refine the first one and rerun only the stages they affect.
+POST /reservations holds or books a table; holds are confirmed with
+POST /reservations/{id}/confirm and released with DELETE /reservations/{id}.
+GET /metrics exports Prometheus metrics.
+
+Set LLM_BACKEND=stub (and optionally STUB_LLM_LATENCY_MS) to load test
+without calling Groq.
+"""
+
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Request, Query
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+from src.booking import BookingError, get_availability_engine, parse_time, resolve_date
+from src.config.settings import WARMUP_ON_STARTUP, BOOKING_DEFAULT_PARTY
+from src.graph import build_workflow, warmup, astream_events
+from src.graph.sessions import get_checkpointer, arun_turn, astream_turn
+from src.graph.streaming import to_json_line, to_sse
+from src.main import create_initial_state
+from src.utils.executor import run_blocking
+from src.utils.metrics import render_prometheus
+from src.rag.restaurant_catalog import get_catalog
+from src.rag.views import recommendation_views
+
+
+class RecommendationRequest(BaseModel):
+    query: str
+    # Conversation to continue; the query then refines the previous turns
+    session_id: Optional[str] = None
+
+
+class RecommendationResponse(BaseModel):
+    user_query: str
+    persons_count: Optional[int] = None
+    dietary_requirements: Optional[str] = None
+    budget_per_person: Optional[float] = None
+    date: Optional[str] = None
+    time: Optional[str] = None
+    location: Optional[str] = None
+    cuisine_preference: Optional[str] = None
+    execution_plan: list
+    restaurants: list
+    messages: list
+
+
+class ReservationRequest(BaseModel):
+    restaurant: str
+    date: str
+    time: str
+    persons_count: int = BOOKING_DEFAULT_PARTY
+    # Hold the table until confirmed (or it expires) instead of booking outright
+    hold: bool = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Compiles the workflows once per process and optionally warms up models"""
+    app.state.workflow = build_workflow()
+    app.state.session_workflow = build_workflow(get_checkpointer())
+    if WARMUP_ON_STARTUP:
+        await run_blocking(warmup)
+    yield
+
+
+app = FastAPI(title="Restaurant Booking Assistant", lifespan=lifespan)
+
+
+@app.get("/health")
+async def health() -> dict:
+    return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Exports workflow, LLM, embedding and menu store metrics for Prometheus"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/recommendations", response_model=RecommendationResponse)
+async def recommendations(body: RecommendationRequest, request: Request) -> RecommendationResponse:
+    """Runs the booking workflow for one natural language query"""
+    if body.session_id:
+        result = await arun_turn(request.app.state.session_workflow, body.session_id, body.query)
+    else:
+        result = await request.app.state.workflow.ainvoke(create_initial_state(body.query))
+    return RecommendationResponse(
+        user_query=result["user_query"],
+        persons_count=result["persons_count"],
+        dietary_requirements=result["dietary_requirements"],
+        budget_per_person=result["budget_per_person"],
+        date=result["date"],
+        time=result["time"],
+        location=result["location"],
+        cuisine_preference=result["cuisine_preference"],
+        execution_plan=result["execution_plan"],
+        restaurants=recommendation_views(result),
+        messages=result["messages"],
+    )
+
+
+@app.post("/recommendations/stream")
+async def recommendations_stream(
+    body: RecommendationRequest,
+    request: Request,
+    format: str = Query("sse", pattern="^(sse|jsonl)$"),
+) -> StreamingResponse:
+    """Streams partial results for one query as each stage completes"""
+    encode, media_type = (to_sse, "text/event-stream") if format == "sse" else (to_json_line, "application/x-ndjson")
+
+    async def events():
+        if body.session_id:
+            stream = astream_turn(request.app.state.session_workflow, body.session_id, body.query)
+        else:
+            stream = astream_events(request.app.state.workflow, create_initial_state(body.query))
+        async for event in stream:
+            yield encode(event)
+
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+@app.post("/reservations")
+async def create_reservation(body: ReservationRequest) -> dict:
+    """Holds or books a table at a start time, e.g. one from available_time"""
+    if body.restaurant not in get_catalog().ids_by_name:
+        raise HTTPException(404, f"unknown restaurant {body.restaurant}")
+    day, minutes = resolve_date(body.date), parse_time(body.time)
+    if day is None or minutes is None or body.persons_count < 1:
+        raise HTTPException(400, f"cannot read date {body.date!r}, time {body.time!r} or party size")
+    engine = get_availability_engine()
+    try:
+        engine.check_bookable(day, minutes)
+    except BookingError as error:
+        raise HTTPException(400, str(error))
+    reserve = engine.hold if body.hold else engine.book
+    try:
+        return reserve(body.restaurant, day, minutes, body.persons_count).to_dict()
+    except BookingError as error:
+        raise HTTPException(409, str(error))
+
+
+@app.post("/reservations/{reservation_id}/confirm")
+async def confirm_reservation(reservation_id: str) -> dict:
+    """Turns a hold into a booking"""
+    try:
+        return get_availability_engine().confirm(reservation_id).to_dict()
+    except BookingError as error:
+        raise HTTPException(404, str(error))
+
+
+@app.delete("/reservations/{reservation_id}")
+async def cancel_reservation(reservation_id: str) -> dict:
+    """Releases a hold or booking"""
+    try:
+        return get_availability_engine().cancel(reservation_id).to_dict()
+    except BookingError as error:
+        raise HTTPException(404, str(error))
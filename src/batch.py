@@ -0,0 +1,183 @@
+"""Restaurant Booking Assistant - Batch Entry Point.
+Runs a JSONL file of queries through the compiled workflow with bounded
+concurrency and streams one JSON result per line as queries complete.
+Queries the rule parser cannot handle are first parsed with a single
+batched LLM call, so the workflow's parser stage is served from cache.
+
+Input lines look like {"query": "..."} with an optional "id".
+
+Usage:
+    python -m src.batch queries.jsonl -o results.jsonl [--concurrency 16] [--no-batch-parse]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from langchain_core.callbacks import BaseCallbackHandler
+from src.agents.input_parser_agent import aprime_parse_cache
+from src.graph.stage_cache import get_stage_cache
+from src.graph import build_workflow
+from src.main import create_initial_state
+from src.rag.views import restaurant_names
+from src.utils.metrics import percentile
+
+
+class StageTimer(BaseCallbackHandler):
+    """Records end-to-end and per-node wall time for one workflow run"""
+
+    run_inline = True
+
+    def __init__(self):
+        self.stage_seconds = {}
+        self.total_seconds = None
+        self._started = {}
+        self._root = None
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        if parent_run_id is None:
+            self._root = run_id
+            self._started[run_id] = (None, time.perf_counter())
+        elif node and kwargs.get("name") == node:
+            self._started[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def _finish(self, run_id):
+        if run_id not in self._started:
+            return
+        node, started = self._started.pop(run_id)
+        elapsed = time.perf_counter() - started
+        if run_id == self._root:
+            self.total_seconds = elapsed
+        else:
+            self.stage_seconds[node] = self.stage_seconds.get(node, 0.0) + elapsed
+
+
+def read_queries(path: str) -> list:
+    """Reads {"query", optional "id"} records from a JSONL file"""
+    records = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                record = json.loads(line)
+                record.setdefault("id", line_number)
+                records.append(record)
+    return records
+
+
+def result_record(record: dict, result, timer: StageTimer) -> dict:
+    """Builds the output JSON line for one query"""
+    out = {"id": record["id"], "query": record["query"]}
+    if isinstance(result, Exception):
+        out["error"] = repr(result)
+    else:
+        for field in ("persons_count", "dietary_requirements", "budget_per_person",
+                      "date", "time", "location", "cuisine_preference"):
+            out[field] = result.get(field)
+        out["execution_plan"] = result["execution_plan"]
+        out["restaurants"] = restaurant_names([i for i, _ in result["final_recommendations"]])
+    out["latency_ms"] = round((timer.total_seconds or 0.0) * 1000, 3)
+    out["stage_ms"] = {k: round(v * 1000, 3) for k, v in timer.stage_seconds.items()}
+    return out
+
+
+async def run_batch(records: list, output, concurrency: int = 16, batch_parse: bool = True) -> dict:
+    """Runs every query through the workflow, writing results as they finish.
+    Args:
+        records: Query records from read_queries
+        output: Text file object receiving JSONL results
+        concurrency: Maximum workflow runs in flight
+        batch_parse: Parse LLM-bound queries with one batched LLM call first
+    Returns:
+        Summary statistics
+    """
+    app = build_workflow()
+    started = time.perf_counter()
+
+    parse_seconds = 0.0
+    if batch_parse:
+        print(f"[Batch] Batch-parsing queries (concurrency {concurrency})...", file=sys.stderr)
+        parse_started = time.perf_counter()
+        sent = await aprime_parse_cache([r["query"] for r in records], max_concurrency=concurrency)
+        parse_seconds = time.perf_counter() - parse_started
+        print(f"[Batch] {sent} queries sent to the LLM in {parse_seconds:.2f}s", file=sys.stderr)
+
+    timers = [StageTimer() for _ in records]
+    configs = [{"callbacks": [timer], "max_concurrency": concurrency} for timer in timers]
+    inputs = [create_initial_state(r["query"]) for r in records]
+
+    errors = 0
+    async for index, result in app.abatch_as_completed(inputs, config=configs, return_exceptions=True):
+        errors += isinstance(result, Exception)
+        output.write(json.dumps(result_record(records[index], result, timers[index])) + "\n")
+        output.flush()
+
+    elapsed = time.perf_counter() - started
+    latencies = [t.total_seconds * 1000 for t in timers if t.total_seconds is not None]
+    stages = {}
+    for timer in timers:
+        for name, seconds in timer.stage_seconds.items():
+            stages.setdefault(name, []).append(seconds * 1000)
+
+    return {
+        "queries": len(records),
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "throughput_qps": len(records) / elapsed if elapsed else 0.0,
+        "batch_parse_s": parse_seconds,
+        "latency_p50_ms": percentile(latencies, 50) if latencies else None,
+        "latency_p95_ms": percentile(latencies, 95) if latencies else None,
+        "stage_ms": {
+            name: {"mean": sum(v) / len(v), "p50": percentile(v, 50), "p95": percentile(v, 95)}
+            for name, v in stages.items()
+        },
+        "stage_cache": get_stage_cache().stats()["stages"],
+    }
+
+
+def print_summary(summary: dict) -> None:
+    """Prints the batch summary to stderr so stdout can carry results"""
+    err = sys.stderr
+    print("\n" + "-"*60, file=err)
+    print("Batch run summary", file=err)
+    print("-"*60, file=err)
+    print(f"Queries: {summary['queries']} ({summary['errors']} errors) in {summary['elapsed_s']:.2f}s", file=err)
+    print(f"Throughput: {summary['throughput_qps']:.1f} queries/s", file=err)
+    if summary["latency_p50_ms"] is not None:
+        print(f"Latency: p50 {summary['latency_p50_ms']:.1f} ms, p95 {summary['latency_p95_ms']:.1f} ms", file=err)
+    if summary["batch_parse_s"]:
+        print(f"Batched LLM parse: {summary['batch_parse_s']:.2f}s", file=err)
+    for name, stats in summary["stage_ms"].items():
+        print(f"   {name:>18}: mean {stats['mean']:.1f} ms, p50 {stats['p50']:.1f} ms, p95 {stats['p95']:.1f} ms", file=err)
+    for name, stats in summary["stage_cache"].items():
+        print(f"   {name:>18}: stage cache {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%})", file=err)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a JSONL file of queries through the workflow")
+    parser.add_argument("queries", help="JSONL file with one {\"query\": ...} per line")
+    parser.add_argument("-o", "--output", help="Result JSONL file (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximum workflow runs in flight")
+    parser.add_argument("--no-batch-parse", action="store_true", help="Parse each query inside the workflow instead")
+    args = parser.parse_args()
+
+    records = read_queries(args.queries)
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        summary = asyncio.run(run_batch(records, output, args.concurrency, not args.no_batch_parse))
+    finally:
+        if args.output:
+            output.close()
+    print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
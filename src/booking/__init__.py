@@ -0,0 +1,6 @@
+"""Reservation availability for the Restaurant Booking Assistant"""
+
+from .availability import AvailabilityEngine, BookingError, Reservation, get_availability_engine
+from .timeslots import parse_time, resolve_date, format_minutes
+
+__all__ = ["AvailabilityEngine", "BookingError", "Reservation", "get_availability_engine", "parse_time", "resolve_date", "format_minutes"]
@@ -0,0 +1,415 @@
+"""Availability Engine - In-memory table inventory with holds and bookings.
+Each restaurant has tables in a few sizes (BOOKING_TABLES). A day is a
+grid of BOOKING_SLOT_MINUTES slots over service hours, and for every
+(restaurant, table size, slot) the engine counts the tables taken. A
+sitting occupies its table for BOOKING_SITTING_MINUTES worth of slots.
+
+Counting is exact: for identical tables a set of sittings can be given
+tables without moving anyone iff no slot is over capacity (interval
+graphs are perfect), so a party fits at a start slot iff one table size
+large enough has a free table in every slot of the sitting. The bulk
+query evaluates that for many restaurants at once as boolean masks over
+the count arrays, plus a cumulative sum along the slots to test every
+start in the window.
+
+Counts live in blocks of BLOCK_ROWS restaurants per day, allocated on
+first booking, so adding restaurants or days never moves existing
+arrays. Writes (hold, book, confirm, cancel) take the lock stripe of
+their restaurant; the bulk query reads without locks, as a pre-filter
+whose answer the booking call re-checks under the lock. Holds count as
+taken until confirmed, cancelled or expired; expired holds are released
+lazily by writes on their stripe and by the bulk query.
+
+Only times between now and horizon_days ahead can be reserved, which
+bounds the days holding count blocks; the periodic sweep also drops the
+blocks and reservations of days that have passed.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta
+import numpy as np
+from src.booking.timeslots import format_minutes
+from src.config.settings import (
+    BOOKING_TABLES, BOOKING_OPEN, BOOKING_CLOSE, BOOKING_SLOT_MINUTES, BOOKING_SITTING_MINUTES,
+    BOOKING_WINDOW_MINUTES, BOOKING_HOLD_SECONDS, BOOKING_HORIZON_DAYS, BOOKING_LOCK_STRIPES,
+)
+from src.utils.metrics import BOOKING_OPERATIONS
+
+# Restaurants per count block
+BLOCK_ROWS = 256
+
+# Seconds between expired-hold sweeps triggered by the bulk query
+REAP_INTERVAL_SECONDS = 1.0
+
+
+class BookingError(ValueError):
+    """A reservation could not be made or changed"""
+
+
+@dataclass(frozen=True, slots=True)
+class Reservation:
+    """A held or confirmed table"""
+    id: str
+    restaurant: str
+    day: date
+    start: int
+    party: int
+    table_size: int
+    # time.time() at which an unconfirmed hold lapses; None once confirmed
+    expires_at: float = None
+
+    def to_dict(self) -> dict:
+        """Plain dict in the shape the API returns"""
+        return {
+            "id": self.id,
+            "restaurant": self.restaurant,
+            "date": self.day.isoformat(),
+            "time": format_minutes(self.start),
+            "persons_count": self.party,
+            "table_size": self.table_size,
+            "status": "held" if self.expires_at is not None else "confirmed",
+            "expires_at": self.expires_at,
+        }
+
+
+class AvailabilityEngine:
+    """Per-restaurant, per-day slot capacity with lock-striped reservations"""
+
+    def __init__(self, tables: dict = BOOKING_TABLES, opening: int = BOOKING_OPEN, closing: int = BOOKING_CLOSE,
+                 slot_minutes: int = BOOKING_SLOT_MINUTES, sitting_minutes: int = BOOKING_SITTING_MINUTES,
+                 hold_seconds: float = BOOKING_HOLD_SECONDS, horizon_days: int = BOOKING_HORIZON_DAYS,
+                 stripes: int = BOOKING_LOCK_STRIPES):
+        """
+        Args:
+            tables: Table size (seats) -> number of tables, for every restaurant
+            opening: First start time, minutes after midnight
+            closing: Time every sitting must end by, minutes after midnight
+            slot_minutes: Grid of start times
+            sitting_minutes: How long a table stays taken
+            hold_seconds: Lifetime of an unconfirmed hold
+            horizon_days: Furthest day ahead that can be reserved
+            stripes: Number of booking locks
+        """
+        self.sizes = np.array(sorted(tables), dtype=np.int32)
+        self.default_capacity = np.array([tables[s] for s in sorted(tables)], dtype=np.uint16)
+        self.opening = opening
+        self.slot_minutes = slot_minutes
+        self.slots = (closing - opening) // slot_minutes
+        self.sitting = -(-sitting_minutes // slot_minutes)
+        self.hold_seconds = hold_seconds
+        self.horizon_days = horizon_days
+
+        self._rows = {}
+        self._names = []
+        self._capacity = []
+        self._days = {}
+        self._grow_lock = threading.Lock()
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._reservations = [{} for _ in range(stripes)]
+        self._expiry = [[] for _ in range(stripes)]
+        self._ids = itertools.count(1)
+        self._catalog_rows = (None, None)
+        self._next_reap = 0.0
+
+    @property
+    def max_party(self) -> int:
+        """Largest party one table seats"""
+        return int(self.sizes[-1])
+
+    # Rows and blocks
+
+    def rows(self, names) -> np.ndarray:
+        """Engine rows for restaurant names, registering new ones"""
+        rows = np.empty(len(names), dtype=np.int64)
+        for i, name in enumerate(names):
+            row = self._rows.get(name)
+            if row is None:
+                row = self._register(str(name))
+            rows[i] = row
+        return rows
+
+    def _register(self, name: str) -> int:
+        with self._grow_lock:
+            row = self._rows.get(name)
+            if row is None:
+                row = len(self._names)
+                if row % BLOCK_ROWS == 0:
+                    self._capacity.append(np.tile(self.default_capacity, (BLOCK_ROWS, 1)))
+                self._names.append(name)
+                self._rows[name] = row
+            return row
+
+    def catalog_rows(self, catalog) -> np.ndarray:
+        """Engine row of every catalog ID (cached per catalog instance)"""
+        cached_catalog, rows = self._catalog_rows
+        if cached_catalog is not catalog:
+            rows = self.rows(catalog.names)
+            self._catalog_rows = (catalog, rows)
+        return rows
+
+    def set_tables(self, restaurant: str, tables: dict) -> None:
+        """Replaces one restaurant's table inventory (sizes must be engine sizes)"""
+        row = self.rows([restaurant])[0]
+        capacity = np.array([tables.get(int(s), 0) for s in self.sizes], dtype=np.uint16)
+        with self._locks[row % len(self._locks)]:
+            self._capacity[row // BLOCK_ROWS][row % BLOCK_ROWS] = capacity
+
+    def _day_blocks(self, day: date, block: int) -> list:
+        """Count blocks of a day, allocated through `block`"""
+        blocks = self._days.get(day)
+        if blocks is None or len(blocks) <= block:
+            with self._grow_lock:
+                blocks = self._days.setdefault(day, [])
+                while len(blocks) <= block:
+                    blocks.append(np.zeros((BLOCK_ROWS, len(self.sizes), self.slots), dtype=np.uint16))
+        return blocks
+
+    def _gather(self, rows: np.ndarray, day: date, lo: int, hi: int) -> tuple:
+        """Counts (N, sizes, hi - lo) and capacities (N, sizes) for rows"""
+        counts = np.zeros((len(rows), len(self.sizes), hi - lo), dtype=np.uint16)
+        capacity = np.empty((len(rows), len(self.sizes)), dtype=np.uint16)
+        blocks = self._days.get(day) or []
+        block_of = rows // BLOCK_ROWS
+        for block in np.unique(block_of):
+            selected = block_of == block
+            offsets = rows[selected] % BLOCK_ROWS
+            capacity[selected] = self._capacity[block][offsets]
+            if block < len(blocks):
+                counts[selected] = blocks[block][offsets, :, lo:hi]
+        return counts, capacity
+
+    # Queries
+
+    def _slot(self, minutes: int) -> int:
+        """Grid slot of a start time; raises BookingError if off the grid"""
+        slot, remainder = divmod(minutes - self.opening, self.slot_minutes)
+        if remainder or not 0 <= slot <= self.slots - self.sitting:
+            raise BookingError(f"{format_minutes(minutes)} is not a bookable start time")
+        return slot
+
+    def check_bookable(self, day: date, minutes: int) -> None:
+        """Checks that a start time lies between now and the booking horizon
+        Raises:
+            BookingError: The time has passed or the day is beyond the horizon
+        """
+        now = datetime.now()
+        today = now.date()
+        if day < today or (day == today and minutes < now.hour * 60 + now.minute):
+            raise BookingError(f"{day} at {format_minutes(minutes)} has already passed")
+        if day > today + timedelta(days=self.horizon_days):
+            raise BookingError(f"{day} is more than {self.horizon_days} days ahead")
+
+    def _starts(self, minutes: int, window_minutes: int) -> np.ndarray:
+        """Bookable start slots within the window, nearest to the request first"""
+        slots = np.arange(self.slots - self.sitting + 1)
+        distance = np.abs(self.opening + slots * self.slot_minutes - minutes)
+        within = slots[distance <= window_minutes]
+        return within[np.argsort(distance[within], kind="stable")]
+
+    def available(self, rows: np.ndarray, day: date, minutes: int, party: int,
+                  window_minutes: int = BOOKING_WINDOW_MINUTES) -> np.ndarray:
+        """Which restaurants can seat a party near a time.
+        Args:
+            rows: Engine rows (see rows() / catalog_rows())
+            day: Date of the visit
+            minutes: Requested time, minutes after midnight
+            party: Number of guests
+            window_minutes: Accepted distance from the requested time
+        Returns:
+            Per row, the start time (minutes) nearest the request at which a
+            table is free for the whole sitting, or -1
+        """
+        self._maybe_reap()
+        rows = np.asarray(rows, dtype=np.int64)
+        result = np.full(len(rows), -1, dtype=np.int32)
+        classes = np.flatnonzero(self.sizes >= party)
+        starts = self._starts(minutes, window_minutes)
+        if not len(rows) or not len(classes) or not len(starts):
+            return result
+
+        lo, hi = int(starts.min()), int(starts.max()) + self.sitting
+        counts, capacity = self._gather(rows, day, lo, hi)
+        free = counts[:, classes] < capacity[:, classes, None]
+        # runs[..., j] = free slots before lo + j; a sitting fits if all of its slots are free
+        runs = np.zeros(free.shape[:2] + (free.shape[2] + 1,), dtype=np.int16)
+        np.cumsum(free, axis=2, out=runs[:, :, 1:])
+        offsets = starts - lo
+        fits = (runs[:, :, offsets + self.sitting] - runs[:, :, offsets] == self.sitting).any(axis=1)
+        found = fits.any(axis=1)
+        nearest = starts[fits.argmax(axis=1)]
+        result[found] = self.opening + nearest[found] * self.slot_minutes
+        return result
+
+    # Reservations
+
+    def hold(self, restaurant: str, day: date, minutes: int, party: int, hold_seconds: float = None) -> Reservation:
+        """Takes a table until the hold is confirmed, cancelled or expires.
+        Args:
+            restaurant: Restaurant name
+            day: Date of the visit
+            minutes: Start time on the slot grid, minutes after midnight
+            party: Number of guests
+            hold_seconds: Hold lifetime (default: the engine's)
+        Returns:
+            The hold
+        Raises:
+            BookingError: The time is off the grid, has passed or is beyond
+                the horizon, or no table of a fitting size is free
+        """
+        expires_at = time.time() + (self.hold_seconds if hold_seconds is None else hold_seconds)
+        return self._reserve("hold", restaurant, day, minutes, party, expires_at)
+
+    def book(self, restaurant: str, day: date, minutes: int, party: int) -> Reservation:
+        """Takes a table outright; same arguments and errors as hold()"""
+        return self._reserve("book", restaurant, day, minutes, party, None)
+
+    def _reserve(self, operation: str, restaurant: str, day: date, minutes: int, party: int,
+                 expires_at: float) -> Reservation:
+        try:
+            self.check_bookable(day, minutes)
+        except BookingError:
+            BOOKING_OPERATIONS.inc(operation=operation, result="rejected")
+            raise
+        start = self._slot(minutes)
+        classes = np.flatnonzero(self.sizes >= party)
+        row = int(self.rows([restaurant])[0])
+        stripe = row % len(self._locks)
+        counts = self._day_blocks(day, row // BLOCK_ROWS)[row // BLOCK_ROWS][row % BLOCK_ROWS]
+        capacity = self._capacity[row // BLOCK_ROWS][row % BLOCK_ROWS]
+        end = start + self.sitting
+
+        with self._locks[stripe]:
+            self._reap(stripe, time.time())
+            # Smallest table size with a free table in every slot of the sitting
+            free = (counts[classes, start:end] < capacity[classes, None]).all(axis=1)
+            if not free.any():
+                BOOKING_OPERATIONS.inc(operation=operation, result="unavailable")
+                raise BookingError(f"{restaurant} has no table for {party} at {format_minutes(minutes)} on {day}")
+            size = classes[free.argmax()]
+            counts[size, start:end] += 1
+            reservation = Reservation(
+                id=f"{row}-{next(self._ids)}", restaurant=restaurant, day=day, start=minutes,
+                party=party, table_size=int(self.sizes[size]), expires_at=expires_at,
+            )
+            self._reservations[stripe][reservation.id] = reservation
+            if expires_at is not None:
+                heapq.heappush(self._expiry[stripe], (expires_at, reservation.id))
+        BOOKING_OPERATIONS.inc(operation=operation, result="ok")
+        return reservation
+
+    def _stripe_of(self, reservation_id: str) -> int:
+        row, _, _ = reservation_id.partition("-")
+        if not row.isdigit():
+            raise BookingError(f"unknown reservation {reservation_id}")
+        return int(row) % len(self._locks)
+
+    def confirm(self, reservation_id: str) -> Reservation:
+        """Turns a live hold into a booking (confirming a booking is a no-op)
+        Raises:
+            BookingError: Unknown, cancelled or expired reservation
+        """
+        stripe = self._stripe_of(reservation_id)
+        with self._locks[stripe]:
+            self._reap(stripe, time.time())
+            reservation = self._reservations[stripe].get(reservation_id)
+            if reservation is None:
+                BOOKING_OPERATIONS.inc(operation="confirm", result="unknown")
+                raise BookingError(f"unknown or expired reservation {reservation_id}")
+            if reservation.expires_at is not None:
+                reservation = replace(reservation, expires_at=None)
+                self._reservations[stripe][reservation_id] = reservation
+        BOOKING_OPERATIONS.inc(operation="confirm", result="ok")
+        return reservation
+
+    def cancel(self, reservation_id: str) -> Reservation:
+        """Releases a hold or booking
+        Raises:
+            BookingError: Unknown, already cancelled or expired reservation
+        """
+        stripe = self._stripe_of(reservation_id)
+        with self._locks[stripe]:
+            reservation = self._reservations[stripe].pop(reservation_id, None)
+            if reservation is None:
+                BOOKING_OPERATIONS.inc(operation="cancel", result="unknown")
+                raise BookingError(f"unknown or expired reservation {reservation_id}")
+            self._release(reservation)
+        BOOKING_OPERATIONS.inc(operation="cancel", result="ok")
+        return reservation
+
+    def get(self, reservation_id: str):
+        """Returns a live reservation, or None"""
+        try:
+            stripe = self._stripe_of(reservation_id)
+        except BookingError:
+            return None
+        reservation = self._reservations[stripe].get(reservation_id)
+        if reservation is not None and reservation.expires_at is not None and reservation.expires_at <= time.time():
+            return None
+        return reservation
+
+    def _release(self, reservation: Reservation) -> None:
+        """Gives a reservation's table back (stripe lock held)"""
+        row = self._rows[reservation.restaurant]
+        start = self._slot(reservation.start)
+        size = int(np.searchsorted(self.sizes, reservation.table_size))
+        counts = self._days[reservation.day][row // BLOCK_ROWS][row % BLOCK_ROWS]
+        counts[size, start:start + self.sitting] -= 1
+
+    def _reap(self, stripe: int, now: float) -> None:
+        """Releases the stripe's lapsed holds (stripe lock held)"""
+        expiry, reservations = self._expiry[stripe], self._reservations[stripe]
+        while expiry and expiry[0][0] <= now:
+            expires_at, reservation_id = heapq.heappop(expiry)
+            reservation = reservations.get(reservation_id)
+            # Confirmed or cancelled holds leave stale heap entries behind
+            if reservation is not None and reservation.expires_at == expires_at:
+                del reservations[reservation_id]
+                self._release(reservation)
+                BOOKING_OPERATIONS.inc(operation="expire", result="ok")
+
+    def _maybe_reap(self) -> None:
+        now = time.time()
+        if now < self._next_reap:
+            return
+        self._next_reap = now + REAP_INTERVAL_SECONDS
+        for stripe, expiry in enumerate(self._expiry):
+            if expiry and expiry[0][0] <= now:
+                with self._locks[stripe]:
+                    self._reap(stripe, now)
+        self.drop_past_days(date.today())
+
+    def drop_past_days(self, today: date) -> int:
+        """Frees the count blocks and reservations of days before today.
+        Returns:
+            Number of days dropped
+        """
+        past = [day for day in list(self._days) if day < today]
+        if not past:
+            return 0
+        # Reservations first, so a cancel never releases into a dropped day
+        for stripe, reservations in enumerate(self._reservations):
+            with self._locks[stripe]:
+                for reservation_id in [i for i, r in reservations.items() if r.day < today]:
+                    del reservations[reservation_id]
+        with self._grow_lock:
+            for day in past:
+                del self._days[day]
+        return len(past)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_availability_engine() -> AvailabilityEngine:
+    """Returns the process-wide availability engine, creating it on first call"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = AvailabilityEngine()
+    return _engine
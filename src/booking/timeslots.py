@@ -0,0 +1,83 @@
+"""Time Slots - Resolves parsed date and time strings for reservations.
+The parsers return dates and times as the user wrote them ("Saturday",
+"tomorrow", "May 3rd", "7:30pm", "noon"); the LLM may also answer in ISO
+or 24-hour form. These helpers turn them into a calendar date and
+minutes after midnight.
+"""
+
+import re
+from datetime import date, timedelta
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MONTHS = ["january", "february", "march", "april", "may", "june", "july",
+          "august", "september", "october", "november", "december"]
+
+_TIME = re.compile(r"^(\d{1,2})(?::(\d{2}))?\s*([ap])?\.?\s*m?\.?$")
+_MONTH_DAY = re.compile(r"^([a-z]+)\.?\s+(\d{1,2})(?:st|nd|rd|th)?$")
+
+
+def parse_time(text: str):
+    """Minutes after midnight for "7pm", "7:30 PM", "19:00", "noon"...
+    Returns:
+        Minutes, or None if the text is not a time of day
+    """
+    if not text:
+        return None
+    text = text.strip().lower()
+    if text in ("noon", "midday"):
+        return 12 * 60
+    if text == "midnight":
+        return 0
+    match = _TIME.match(text)
+    if match is None:
+        return None
+    hours, minutes, meridiem = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if meridiem:
+        if not 1 <= hours <= 12:
+            return None
+        hours = hours % 12 + (12 if meridiem == "p" else 0)
+    if hours > 23 or minutes > 59:
+        return None
+    return hours * 60 + minutes
+
+
+def resolve_date(text: str, today: date = None):
+    """Calendar date for "today", "tonight", "tomorrow", a weekday (its next
+    occurrence, today included), "May 3rd" (this year unless already past)
+    or an ISO date.
+    Returns:
+        date, or None if the text is not recognized
+    """
+    if not text:
+        return None
+    today = today or date.today()
+    text = " ".join(text.strip().lower().split())
+    text = re.sub(r"^(?:this|next|on)\s+", "", text)
+    if text in ("today", "tonight"):
+        return today
+    if text == "tomorrow":
+        return today + timedelta(days=1)
+    if text in WEEKDAYS:
+        return today + timedelta(days=(WEEKDAYS.index(text) - today.weekday()) % 7)
+
+    match = _MONTH_DAY.match(text)
+    if match is not None:
+        word = match.group(1)
+        month = next((i + 1 for i, name in enumerate(MONTHS) if len(word) >= 3 and name.startswith(word)), None)
+        if month is None:
+            return None
+        try:
+            resolved = date(today.year, month, int(match.group(2)))
+            return resolved if resolved >= today else resolved.replace(year=today.year + 1)
+        except ValueError:
+            return None
+
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def format_minutes(minutes: int) -> str:
+    """"HH:MM" for minutes after midnight"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
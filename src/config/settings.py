@@ -17,6 +17,11 @@ def _resolve_path(value: str, base_level: int=2) -> Path:
 
     return path_obj.resolve()
 
+def _minutes_of_day(value: str) -> int:
+    """Converts "HH:MM" to minutes after midnight"""
+    hours, _, minutes = value.partition(":")
+    return int(hours) * 60 + int(minutes or 0)
+
 # Base Directory
 BASE_DIR = Path(__file__).resolve().parents[2]
 
@@ -25,4 +30,133 @@ MENUS_DIR = _resolve_path(os.getenv("MENUS_DIR", "data/menus"))
 PERSIST_DIR = _resolve_path(os.getenv("PERSIST_DIR", "chroma_db"))
 
 # Ensure required directories exist
-PERSIST_DIR.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
+PERSIST_DIR.mkdir(parents=True, exist_ok=True)
+
+# Structured dish store (SQLite) written alongside the vector store
+DISH_STORE_PATH = _resolve_path(os.getenv("DISH_STORE_PATH", str(PERSIST_DIR / "dishes.sqlite")))
+
+# Content-hash manifest used by incremental ingestion
+MANIFEST_PATH = _resolve_path(os.getenv("MANIFEST_PATH", str(PERSIST_DIR / "ingest_manifest.sqlite")))
+
+# Embedding cache: on-disk document vectors and in-memory LRU for query vectors
+EMBEDDING_CACHE_PATH = _resolve_path(os.getenv("EMBEDDING_CACHE_PATH", str(PERSIST_DIR / "embedding_cache.sqlite")))
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+
+# Ingestion pipeline sizing
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 1)))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "512"))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+
+# Queries the rule parser explains at least this well skip the LLM (set above 1 to disable)
+RULE_PARSER_MIN_CONFIDENCE = float(os.getenv("RULE_PARSER_MIN_CONFIDENCE", "0.9"))
+
+# Parsed-requirements cache (in-memory LRU with TTL, optional SQLite tier)
+PARSE_CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", "4096"))
+PARSE_CACHE_TTL_SECONDS = float(os.getenv("PARSE_CACHE_TTL_SECONDS", "86400"))
+PARSE_CACHE_PATH = _resolve_path(os.getenv("PARSE_CACHE_PATH")) if os.getenv("PARSE_CACHE_PATH") else None
+
+# Workflow stage cache: restaurant_search, budget_filter and dietary_analyzer outputs
+# keyed by the normalized requirements each stage reads, bounded to roughly
+# STAGE_CACHE_MAX_BYTES (0 disables). Entries are tied to the data version ingest
+# writes to DATA_VERSION_PATH, so re-ingesting invalidates them in every process.
+STAGE_CACHE_MAX_BYTES = int(os.getenv("STAGE_CACHE_MAX_BYTES", str(32 * 2**20)))
+DATA_VERSION_PATH = _resolve_path(os.getenv("DATA_VERSION_PATH", str(PERSIST_DIR / "data_version")))
+
+# Conversation sessions: workflow checkpoints per session are kept in memory, or in
+# this SQLite file when set (needs the langgraph-checkpoint-sqlite package)
+SESSION_DB_PATH = _resolve_path(os.getenv("SESSION_DB_PATH")) if os.getenv("SESSION_DB_PATH") else None
+# When a turn's state is saved: "exit" (once, when the turn finishes; a failed turn
+# leaves the session as it was), or "async" / "sync" to checkpoint after every node
+SESSION_DURABILITY = os.getenv("SESSION_DURABILITY", "exit")
+
+# Embedding backend: "huggingface" (default) or "fake" for offline benchmarks
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "huggingface")
+FAKE_EMBEDDING_DIM = int(os.getenv("FAKE_EMBEDDING_DIM", "384"))
+
+# Menu store mode: "inprocess" (default) or "sidecar", where search_menus and the
+# dish lookups are forwarded to `python -m src.rag.sidecar` over a Unix socket so
+# only that process loads the embedding model and vector store
+MENU_STORE_MODE = os.getenv("MENU_STORE_MODE", "inprocess")
+MENU_SIDECAR_SOCKET = _resolve_path(os.getenv("MENU_SIDECAR_SOCKET", str(PERSIST_DIR / "menu_store.sock")))
+MENU_SIDECAR_TIMEOUT_SECONDS = float(os.getenv("MENU_SIDECAR_TIMEOUT_SECONDS", "30"))
+
+# Query embedding micro-batching (HuggingFace backend): concurrent cache misses
+# are embedded together, up to QUERY_EMBED_BATCH_SIZE texts or QUERY_EMBED_WAIT_MS
+# after the first one arrives. QUERY_EMBED_BATCH_SIZE=1 disables batching.
+QUERY_EMBED_BATCH_SIZE = int(os.getenv("QUERY_EMBED_BATCH_SIZE", "32"))
+QUERY_EMBED_WAIT_MS = float(os.getenv("QUERY_EMBED_WAIT_MS", "2"))
+
+# LLM backend: "groq" (default) or "stub" for offline load testing
+LLM_BACKEND = os.getenv("LLM_BACKEND", "groq")
+STUB_LLM_LATENCY_MS = float(os.getenv("STUB_LLM_LATENCY_MS", "0"))
+
+# Threads available to blocking vector store / embedding calls from async code
+BLOCKING_POOL_SIZE = int(os.getenv("BLOCKING_POOL_SIZE", "8"))
+
+# HTTP service
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") == "1"
+
+# Restaurant catalog (columnar arrays + inverted indexes) built at ingest time
+CATALOG_PATH = _resolve_path(os.getenv("CATALOG_PATH", str(PERSIST_DIR / "restaurant_catalog.npz")))
+
+# Ranking: number of recommendations and score weights ("name=weight,...")
+RANKING_TOP_K = int(os.getenv("RANKING_TOP_K", "5"))
+RANKING_WEIGHTS = {
+    name.strip(): float(weight)
+    for name, weight in (
+        pair.split("=") for pair in os.getenv(
+            "RANKING_WEIGHTS", "rating=0.4,price_headroom=0.2,dish_count=0.2,relevance=0.2"
+        ).split(",") if pair.strip()
+    )
+}
+
+# Vector backend: "chroma" (default) or "numpy", an in-process index of normalized
+# embeddings in a memory-mapped .npy file, rebuilt from the dish store at ingest
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+VECTOR_INDEX_DIR = _resolve_path(os.getenv("VECTOR_INDEX_DIR", str(PERSIST_DIR / "vector_index")))
+# NumPy index storage ("float32", "float16" or per-row scaled "int8"; applied at ingest)
+# and the shortlist (x k) rescored in float32 on quantized indexes (0 disables rescoring).
+# Rescoring keeps a float32 copy next to a quantized index, so on disk it then takes
+# more space than float32 alone; ingest with 0 to store only the quantized rows.
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "float32")
+VECTOR_RESCORE_MULTIPLIER = int(os.getenv("VECTOR_RESCORE_MULTIPLIER", "4"))
+
+# Menu search: "hybrid" (BM25 + vector, fused by reciprocal rank) or "vector".
+# Each side fetches k * SEARCH_CANDIDATE_MULTIPLIER filtered candidates before fusion.
+SEARCH_MODE = os.getenv("SEARCH_MODE", "hybrid")
+SEARCH_CANDIDATE_MULTIPLIER = int(os.getenv("SEARCH_CANDIDATE_MULTIPLIER", "4"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# Reservation availability (in memory, per process). Every restaurant gets the
+# BOOKING_TABLES inventory ("seats:tables,..."); sittings start on a
+# BOOKING_SLOT_MINUTES grid within service hours, last BOOKING_SITTING_MINUTES and
+# must end by closing, from now up to BOOKING_HORIZON_DAYS ahead. The availability
+# filter accepts starts within BOOKING_WINDOW_MINUTES of the requested time;
+# unconfirmed holds expire.
+BOOKING_TABLES = {
+    int(seats): int(count)
+    for seats, count in (
+        pair.split(":") for pair in os.getenv("BOOKING_TABLES", "2:6,4:8,6:4,8:2").split(",") if pair.strip()
+    )
+}
+BOOKING_OPEN = _minutes_of_day(os.getenv("BOOKING_OPEN", "11:00"))
+BOOKING_CLOSE = _minutes_of_day(os.getenv("BOOKING_CLOSE", "23:00"))
+BOOKING_SLOT_MINUTES = int(os.getenv("BOOKING_SLOT_MINUTES", "15"))
+BOOKING_SITTING_MINUTES = int(os.getenv("BOOKING_SITTING_MINUTES", "90"))
+BOOKING_WINDOW_MINUTES = int(os.getenv("BOOKING_WINDOW_MINUTES", "30"))
+BOOKING_HOLD_SECONDS = float(os.getenv("BOOKING_HOLD_SECONDS", "300"))
+# Furthest day ahead that can be booked; each bookable day costs a count block
+BOOKING_HORIZON_DAYS = int(os.getenv("BOOKING_HORIZON_DAYS", "90"))
+BOOKING_DEFAULT_PARTY = int(os.getenv("BOOKING_DEFAULT_PARTY", "2"))
+# Booking operations lock one of this many stripes (restaurant row modulo stripes)
+BOOKING_LOCK_STRIPES = int(os.getenv("BOOKING_LOCK_STRIPES", "64"))
+
+# Dish records kept in memory for ID lookups from workflow state
+DISH_RECORD_CACHE_SIZE = int(os.getenv("DISH_RECORD_CACHE_SIZE", "50000"))
+
+# Dietary analyzer: candidates per dish lookup; matches stream out after each chunk
+DIETARY_FETCH_CHUNK_SIZE = int(os.getenv("DIETARY_FETCH_CHUNK_SIZE", "16"))
+
+# Observability: console progress output is opt-in; structured JSON logs go to stderr
+DEBUG_OUTPUT = os.getenv("DEBUG_OUTPUT", "0") == "1"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING").upper()
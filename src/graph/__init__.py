@@ -1,5 +1,6 @@
 """Graph module for workflow orchestration"""
 
-from .workflow import build_workflow
+from .workflow import build_workflow, warmup
+from .streaming import stream_events, astream_events
 
-__all__ = ["build_workflow"]
+__all__ = ["build_workflow", "warmup", "stream_events", "astream_events"]
@@ -0,0 +1,74 @@
+"""Query Planner - Chooses the stage order for each request.
+Cheap predicates run first so the expensive RAG dietary stage only sees
+restaurants that can still be recommended. Every filter stage is a pure
+predicate over the candidate set, so the order does not change results.
+Stages whose requirement was not given are left out of the plan.
+"""
+
+from langgraph.graph import END
+from src.utils.state import AgentState
+from src.utils.metrics import debug
+from src.rag.restaurant_catalog import DIETARY_FLAGS
+from src.rag.schema import normalize_tag
+
+# Relative cost per candidate restaurant
+STAGE_COSTS = {
+    "budget_filter": 1,
+    "availability_filter": 2,
+    "dietary_analyzer": 100,
+}
+
+# Runs after every filter stage
+FINAL_STAGE = "ranking"
+
+
+def plan_stages(state: AgentState) -> list:
+    """Orders the stages needed for this request by estimated cost.
+    Args:
+        state: State with parsed requirements
+    Returns:
+        List of node names, starting with restaurant_search and ending
+        with the ranking stage
+    """
+    stages = []
+    if state["budget_per_person"]:
+        stages.append("budget_filter")
+    if state["time"]:
+        stages.append("availability_filter")
+    if state["dietary_requirements"]:
+        stages.append("dietary_analyzer")
+    return ["restaurant_search"] + sorted(stages, key=STAGE_COSTS.get) + [FINAL_STAGE]
+
+
+def describe_pushdown(state: AgentState) -> list:
+    """Lists the predicates evaluated inside the catalog search"""
+    predicates = ["location"]
+    if state["cuisine_preference"]:
+        predicates.append("cuisine")
+    dietary = normalize_tag(state["dietary_requirements"] or "")
+    if dietary in DIETARY_FLAGS:
+        predicates.append(f"{dietary} flag")
+    return predicates
+
+
+def query_planner(state: AgentState) -> dict:
+    """Records the execution plan chosen for this request"""
+    plan = plan_stages(state)
+    debug(f"[Query Planner] Plan: {' -> '.join(plan)}")
+    return {
+        "execution_plan": plan,
+        "messages": [f"Planner: {' -> '.join(plan)} (search filters: {', '.join(describe_pushdown(state))})"],
+    }
+
+
+def next_stage(current: str):
+    """Builds a router that follows the plan after `current`.
+    Ends the run early once no candidates are left.
+    """
+    def route(state: AgentState) -> str:
+        if not state["restaurant_candidates"]:
+            return END
+        plan = state["execution_plan"]
+        position = plan.index(current)
+        return plan[position + 1] if position + 1 < len(plan) else END
+    return route
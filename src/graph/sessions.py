@@ -0,0 +1,212 @@
+"""Sessions - Multi-turn query refinement over checkpointed workflow state.
+A session is a LangGraph thread: the session workflow is compiled with a
+checkpointer, so each turn starts from the state the previous one left.
+The first turn runs like a one-shot query. A follow-up ("actually make it
+under $20") goes in as follow_up; the input parser parses only that text
+and replaces the requirements it mentions.
+
+Every filter stage records its run in stage_runs. On a later turn a stage
+whose key fields, input candidates and data version are unchanged returns
+the recorded update instead of running, and the dietary analyzer looks up
+only the candidates it has not analyzed under the same requirement. A
+budget change therefore reruns budget_filter and re-filters the recorded
+dietary matches without a menu lookup; ranking always reruns.
+
+Checkpoints are kept in memory, or in SQLite at SESSION_DB_PATH. The
+SQLite saver has no async interface, so async turns then run on the
+blocking pool. By default a turn is saved once, when it finishes
+(SESSION_DURABILITY=exit): per-node checkpoints are written from a
+background thread that LangGraph starts for every run, which costs more
+than the stages a follow-up reruns.
+"""
+
+import functools
+import hashlib
+import inspect
+import threading
+from langgraph.checkpoint.memory import InMemorySaver
+from src.config.settings import SESSION_DB_PATH, SESSION_DURABILITY
+from src.graph.stage_cache import STAGE_INPUTS, StageCache
+from src.graph.streaming import stream_events, astream_events
+from src.rag.data_version import data_version
+from src.utils.executor import run_blocking
+from src.utils.metrics import debug
+
+_checkpointer = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer():
+    """Returns the process-wide session checkpointer, creating it on first call"""
+    global _checkpointer
+    if _checkpointer is None:
+        with _checkpointer_lock:
+            if _checkpointer is None and SESSION_DB_PATH is not None:
+                import sqlite3
+                from langgraph.checkpoint.sqlite import SqliteSaver
+                _checkpointer = SqliteSaver(sqlite3.connect(str(SESSION_DB_PATH), check_same_thread=False))
+            elif _checkpointer is None:
+                _checkpointer = InMemorySaver()
+    return _checkpointer
+
+
+def _supports_async(app) -> bool:
+    return isinstance(app.checkpointer, InMemorySaver)
+
+
+def session_config(session_id: str) -> dict:
+    """Runnable config that selects a session's checkpoint thread"""
+    return {"configurable": {"thread_id": session_id}}
+
+
+# Stage outputs cleared at the start of every follow-up turn. A turn that
+# ends early (no candidates left) must not return the previous turn's
+# matches and recommendations; stages that reuse an earlier run restore
+# their outputs from stage_runs.
+TURN_OUTPUTS = (
+    "execution_plan", "restaurant_candidates", "available_times",
+    "dietary_matches", "dish_matches", "final_recommendations",
+)
+
+
+def _turn_input(previous: dict, query: str) -> dict:
+    """Graph input for a turn: a fresh state first, then the follow-up with
+    the previous turn's stage outputs reset"""
+    from src.main import create_initial_state
+    fresh = create_initial_state(query)
+    if previous:
+        return {"follow_up": query, **{key: fresh[key] for key in TURN_OUTPUTS}}
+    return fresh
+
+
+def run_turn(app, session_id: str, query: str) -> dict:
+    """Runs one turn of a session.
+    Args:
+        app: Workflow compiled with a checkpointer (build_workflow(get_checkpointer()))
+        session_id: Conversation ID
+        query: First request, or a refinement of it
+    Returns:
+        Final state of the turn
+    """
+    config = session_config(session_id)
+    return app.invoke(_turn_input(app.get_state(config).values, query), config, durability=SESSION_DURABILITY)
+
+
+async def arun_turn(app, session_id: str, query: str) -> dict:
+    """Async variant of run_turn"""
+    if not _supports_async(app):
+        return await run_blocking(run_turn, app, session_id, query)
+    config = session_config(session_id)
+    previous = (await app.aget_state(config)).values
+    return await app.ainvoke(_turn_input(previous, query), config, durability=SESSION_DURABILITY)
+
+
+def stream_turn(app, session_id: str, query: str):
+    """Runs one turn of a session and yields its streaming events"""
+    config = session_config(session_id)
+    yield from stream_events(app, _turn_input(app.get_state(config).values, query), config, SESSION_DURABILITY)
+
+
+async def astream_turn(app, session_id: str, query: str):
+    """Async variant of stream_turn. With a sync-only checkpointer the turn
+    runs on the blocking pool and its events arrive when it finishes."""
+    if not _supports_async(app):
+        for event in await run_blocking(lambda: list(stream_turn(app, session_id, query))):
+            yield event
+        return
+    config = session_config(session_id)
+    previous = (await app.aget_state(config)).values
+    async for event in astream_events(app, _turn_input(previous, query), config, SESSION_DURABILITY):
+        yield event
+
+
+def _digest(value) -> str:
+    return hashlib.sha1(repr(value).encode("utf-8")).hexdigest()
+
+
+def _results(update: dict) -> dict:
+    """A stage update without its log lines, as kept in stage_runs"""
+    return {key: value for key, value in update.items() if key != "messages"}
+
+
+def session_stage(stage: str, func, on_reuse=None, merge=None):
+    """Wraps a filter stage to reuse its run from an earlier turn.
+
+    Args:
+        stage: Node name, a key of STAGE_KEY_FIELDS
+        func: Sync or async node function taking the state
+        on_reuse: Optional callable given reused results before they are
+            returned, e.g. to replay the node's custom stream events
+        merge: For stages that judge each candidate on its own:
+            merge(candidates, previous, update=None) combines recorded
+            results with a run over other candidates. The stage then only
+            runs on candidates no earlier turn analyzed.
+    Returns:
+        Wrapped function of the same kind (sync or async)
+    """
+    source = STAGE_INPUTS.get(stage)
+
+    def plan(state) -> tuple:
+        """Decides what to run.
+        Returns:
+            (update to return without running, or None;
+             state to run the stage on, or None;
+             context for finish)
+        """
+        _, fields, candidates = StageCache.make_key(stage, state)
+        record = (state.get("stage_runs") or {}).get(stage)
+        # Per-candidate stages are keyed without their candidates, so a
+        # record also serves a different candidate set
+        key = _digest((data_version(), fields) if merge else (data_version(), fields, candidates))
+        if record is None or record["key"] != key:
+            return None, state, {"key": key, "seen": list(candidates) if merge else None, "previous": None}
+
+        if merge is None:
+            debug(f"[Session] {stage}: inputs unchanged, reusing the previous turn's result")
+            if on_reuse is not None:
+                on_reuse(record["update"])
+            return {**record["update"], "messages": [f"Session: Reused {stage} result, inputs unchanged"]}, None, None
+
+        seen = set(record["seen"])
+        unseen = [c for c in candidates if c not in seen]
+        debug(f"[Session] {stage}: {len(unseen)} of {len(candidates)} candidates not analyzed before")
+        if on_reuse is not None:
+            on_reuse(merge(list(candidates), record["update"]))
+        context = {"key": key, "seen": record["seen"] + unseen, "previous": record["update"], "ran": len(unseen)}
+        return None, ({**state, source: unseen} if unseen else None), context
+
+    def finish(state, context: dict, update: dict) -> dict:
+        """Builds the node's update, including this run's stage_runs record"""
+        previous = context["previous"]
+        if previous is None:
+            results = merge(context["seen"], _results(update)) if merge else _results(update)
+            record = {"key": context["key"], "seen": context["seen"], "update": results}
+            return {**update, "stage_runs": {stage: record}}
+
+        results = merge(context["seen"], previous, _results(update) if update else None)
+        record = {"key": context["key"], "seen": context["seen"], "update": results}
+        messages = update["messages"] if update else []
+        return {
+            **merge(list(state.get(source) or ()), results),
+            "stage_runs": {stage: record},
+            "messages": messages + [f"Session: {stage} ran on {context['ran']} new candidates, reused the rest"],
+        }
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def session_async(state):
+            reused, run_state, context = plan(state)
+            if reused is not None:
+                return reused
+            update = await func(run_state) if run_state is not None else None
+            return finish(state, context, update)
+        return session_async
+
+    @functools.wraps(func)
+    def session_sync(state):
+        reused, run_state, context = plan(state)
+        if reused is not None:
+            return reused
+        update = func(run_state) if run_state is not None else None
+        return finish(state, context, update)
+    return session_sync
@@ -0,0 +1,216 @@
+"""Stage Cache - Reuses filter stage results across equivalent requests.
+Many phrasings parse to the same requirements, and restaurant_search,
+budget_filter and dietary_analyzer are deterministic functions of a few
+parsed fields, their input candidates and the ingested data. Each stage's
+state update is stored under
+
+    (stage, normalized key fields, input candidates)
+
+in an LRU bounded by an estimate of its memory footprint. Entries belong
+to the data version they were computed under; the first lookup that sees
+a new version (after ingest_menus) drops them all.
+
+Key fields are the requirements a stage actually reads. Date, time and
+party size are in none of them: no cached stage looks at them, so
+requests that differ only there share entries. A stage that starts
+depending on them must add them to its key fields.
+"""
+
+import functools
+import inspect
+import sys
+import threading
+from collections import OrderedDict
+from src.config.settings import STAGE_CACHE_MAX_BYTES
+from src.rag.data_version import data_version
+from src.utils.metrics import STAGE_CACHE_LOOKUPS, debug
+
+# Cached stage -> parsed fields its result depends on
+STAGE_KEY_FIELDS = {
+    "restaurant_search": ("location", "cuisine_preference", "dietary_requirements"),
+    "budget_filter": ("budget_per_person",),
+    "dietary_analyzer": ("dietary_requirements",),
+}
+
+# Cached stage -> state key with its input candidates (also part of the key)
+STAGE_INPUTS = {
+    "budget_filter": "restaurant_candidates",
+    "dietary_analyzer": "restaurant_candidates",
+}
+
+
+def _normalize(value):
+    """Case- and whitespace-insensitive strings, budgets to the cent"""
+    if isinstance(value, str):
+        return " ".join(value.lower().split()) or None
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+
+def _approx_size(value) -> int:
+    """Rough memory footprint of a key or update, in bytes"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_approx_size(k) + _approx_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_approx_size(v) for v in value)
+    return size
+
+
+def _copy(update: dict) -> dict:
+    """Fresh top-level containers, so no run can mutate a cached entry"""
+    return {
+        key: list(value) if isinstance(value, list) else dict(value) if isinstance(value, dict) else value
+        for key, value in update.items()
+    }
+
+
+class StageCache:
+    """Memory-bounded LRU of stage updates for one data version"""
+
+    def __init__(self, max_bytes: int = STAGE_CACHE_MAX_BYTES):
+        """
+        Args:
+            max_bytes: Approximate memory budget for keys and updates
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = {stage: 0 for stage in STAGE_KEY_FIELDS}
+        self.misses = {stage: 0 for stage in STAGE_KEY_FIELDS}
+
+    @staticmethod
+    def make_key(stage: str, state: dict) -> tuple:
+        """Builds the cache key for a stage run on this state"""
+        fields = tuple(_normalize(state.get(field)) for field in STAGE_KEY_FIELDS[stage])
+        source = STAGE_INPUTS.get(stage)
+        return stage, fields, tuple(state.get(source) or ()) if source else ()
+
+    def _use_version(self, version: str) -> None:
+        """Drops every entry when the data version moved on (lock held)"""
+        if version != self._version:
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def get(self, key: tuple, version: str):
+        """Returns a copy of the cached update for a key, or None.
+        Args:
+            key: Key from make_key
+            version: Current data version
+        """
+        stage = key[0]
+        with self._lock:
+            self._use_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses[stage] += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits[stage] += 1
+        STAGE_CACHE_LOOKUPS.inc(stage=stage, result="miss" if entry is None else "hit")
+        return None if entry is None else _copy(entry[1])
+
+    def put(self, key: tuple, version: str, update: dict) -> None:
+        """Stores a stage's update, unless the data changed while it ran.
+        Args:
+            key: Key from make_key
+            version: Data version read before the stage ran
+            update: State update the stage returned
+        """
+        update = _copy(update)
+        size = _approx_size(key) + _approx_size(update)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if version != self._version:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[0]
+            self._entries[key] = (size, update)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def clear(self) -> None:
+        """Drops every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Returns per-stage hit/miss counters and hit rates, and the cache size"""
+        with self._lock:
+            stages = {}
+            for stage in STAGE_KEY_FIELDS:
+                hits, misses = self.hits[stage], self.misses[stage]
+                stages[stage] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                }
+            return {"stages": stages, "entries": len(self._entries), "bytes": self._bytes}
+
+
+_stage_cache = None
+_stage_cache_lock = threading.Lock()
+
+
+def get_stage_cache() -> StageCache:
+    """Returns the shared stage cache, creating it on first call."""
+    global _stage_cache
+    if _stage_cache is None:
+        with _stage_cache_lock:
+            if _stage_cache is None:
+                _stage_cache = StageCache()
+    return _stage_cache
+
+
+def cached_stage(stage: str, func, on_hit=None):
+    """Wraps a workflow node so equivalent requests reuse its update.
+
+    Args:
+        stage: Node name, a key of STAGE_KEY_FIELDS
+        func: Sync or async node function taking the state
+        on_hit: Optional callable given a cached update before it is
+            returned, e.g. to replay the node's custom stream events
+    Returns:
+        Wrapped function of the same kind (sync or async), or func itself
+        when the cache is disabled
+    """
+    if get_stage_cache().max_bytes <= 0:
+        return func
+
+    def lookup(state):
+        cache = get_stage_cache()
+        key, version = cache.make_key(stage, state), data_version()
+        update = cache.get(key, version)
+        if update is not None:
+            debug(f"[Stage Cache] {stage}: reusing cached result")
+            if on_hit is not None:
+                on_hit(update)
+        return cache, key, version, update
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def cached_async(state):
+            cache, key, version, update = lookup(state)
+            if update is None:
+                update = await func(state)
+                cache.put(key, version, update)
+            return update
+        return cached_async
+
+    @functools.wraps(func)
+    def cached(state):
+        cache, key, version, update = lookup(state)
+        if update is None:
+            update = func(state)
+            cache.put(key, version, update)
+        return update
+    return cached
@@ -0,0 +1,89 @@
+"""Workflow Streaming - Partial results as each stage completes.
+Turns LangGraph's "updates" and "custom" stream modes into a flat sequence
+of events a client can render progressively:
+
+    requirements     parsed fields, right after the input parser
+    plan             stage order chosen by the query planner
+    candidates       restaurants left after search / budget filtering
+    dietary_match    one restaurant with its matching dishes, as soon as it is computed
+    dietary_matches  names of all dietary matches once the stage is done
+    recommendations  final ranked restaurants
+    done             end of the run
+
+Each event is a dict {"event": ..., "stage": ..., "data": ...}.
+"""
+
+import json
+from src.agents.input_parser_agent import PARSED_FIELDS
+from src.rag.views import candidate_views, recommendation_views, restaurant_names, restaurant_view
+
+STREAM_MODES = ["updates", "custom"]
+
+# Node name -> (event name, state so far -> payload)
+NODE_EVENTS = {
+    "input_parser": ("requirements", lambda s: {field: s.get(field) for field in PARSED_FIELDS}),
+    "query_planner": ("plan", lambda s: s.get("execution_plan", [])),
+    "restaurant_search": ("candidates", lambda s: candidate_views(s.get("restaurant_candidates", []))),
+    "budget_filter": ("candidates", lambda s: candidate_views(s.get("restaurant_candidates", []))),
+    "availability_filter": ("candidates", lambda s: candidate_views(s.get("restaurant_candidates", []))),
+    "dietary_analyzer": ("dietary_matches", lambda s: restaurant_names(s.get("dietary_matches", []))),
+    "ranking": ("recommendations", recommendation_views),
+}
+
+
+def _to_events(mode: str, chunk, seen: dict) -> list:
+    """Converts one (mode, chunk) pair from graph.stream into events.
+    Nodes only return the keys they change, so updates are merged into
+    `seen` to resolve payloads that need earlier stages' output.
+    """
+    if mode == "custom":
+        if "dietary_match" in chunk:
+            restaurant_id, dish_match = chunk["dietary_match"]
+            return [{"event": "dietary_match", "stage": "dietary_analyzer",
+                     "data": restaurant_view(restaurant_id, dish_match)}]
+        return [chunk]
+
+    events = []
+    for node, update in chunk.items():
+        if node in NODE_EVENTS and update:
+            seen.update(update)
+            event, payload = NODE_EVENTS[node]
+            events.append({"event": event, "stage": node, "data": payload(seen)})
+    return events
+
+
+def stream_events(app, initial_state: dict, config: dict = None, durability: str = None):
+    """Runs the compiled workflow and yields events as stages complete.
+
+    Args:
+        app: Compiled workflow from build_workflow()
+        initial_state: State from create_initial_state()
+        config: Optional runnable config
+        durability: Optional checkpoint durability for session workflows
+    Returns:
+        Generator of event dicts, ending with a "done" event
+    """
+    seen = dict(initial_state)
+    for mode, chunk in app.stream(initial_state, config=config, stream_mode=STREAM_MODES, durability=durability):
+        yield from _to_events(mode, chunk, seen)
+    yield {"event": "done", "stage": None, "data": None}
+
+
+async def astream_events(app, initial_state: dict, config: dict = None, durability: str = None):
+    """Async variant of stream_events for the HTTP service"""
+    seen = dict(initial_state)
+    async for mode, chunk in app.astream(initial_state, config=config, stream_mode=STREAM_MODES,
+                                         durability=durability):
+        for event in _to_events(mode, chunk, seen):
+            yield event
+    yield {"event": "done", "stage": None, "data": None}
+
+
+def to_json_line(event: dict) -> str:
+    """Formats an event as one JSON line"""
+    return json.dumps(event, default=str) + "\n"
+
+
+def to_sse(event: dict) -> str:
+    """Formats an event as a Server-Sent Events message"""
+    return f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
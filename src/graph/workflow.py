@@ -1,28 +1,83 @@
 """Workflow Graph Builder - Orchestrates multi-agent workflow using Langgraph."""
 
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 from src.utils.state import AgentState
-from src.agents import input_parser_agent, restaurant_search_agent, dietary_analyzer_agent, budget_filter_agent
+from src.agents import (
+    input_parser_agent, ainput_parser_agent, restaurant_search_agent,
+    dietary_analyzer_agent, adietary_analyzer_agent, budget_filter_agent, availability_filter_agent, ranking_agent
+)
+from src.agents.input_parser_agent import get_llm
+from src.agents.dietary_analyzer_agent import replay_matches, merge_matches
+from src.agents.ranking_agent import ranking_candidates
+from src.graph.planner import query_planner, next_stage
+from src.graph.stage_cache import STAGE_KEY_FIELDS, cached_stage
+from src.graph.sessions import session_stage
+from src.utils.metrics import trace_node
+from src.rag import warmup as warmup_rag
 
 
-def build_workflow():
-    """Builds and compiles the multi-agent workflow graph"""
+def build_workflow(checkpointer=None):
+    """Builds and compiles the multi-agent workflow graph.
+    Nodes with I/O have both sync and async implementations, so the same
+    compiled graph serves invoke() and ainvoke(). After parsing, the query
+    planner picks the stage order; conditional edges follow that plan and
+    stop as soon as no candidates are left. The filter stages reuse
+    results of earlier requests with the same requirements (stage_cache)
+    and, within a session, of earlier turns (sessions). The availability
+    filter reads live bookings, so it always runs.
+
+    Args:
+        checkpointer: Optional LangGraph checkpointer; pass
+            sessions.get_checkpointer() to run multi-turn sessions
+    """
 
     # Initialize graph with state schema
     graph_builder = StateGraph(AgentState)
 
-    # Add Agent Nodes
-    graph_builder.add_node("input_parser", input_parser_agent)
-    graph_builder.add_node("restaurant_search", restaurant_search_agent)
-    graph_builder.add_node("dietary_analyzer", dietary_analyzer_agent)
-    graph_builder.add_node("budget_filter", budget_filter_agent)
+    # Add Agent Nodes, each timed and counted by the metrics layer
+    for name, func, afunc, candidates_in, candidates_out in [
+        ("input_parser", input_parser_agent, ainput_parser_agent, None, None),
+        ("query_planner", query_planner, None, None, None),
+        ("restaurant_search", restaurant_search_agent, None, None, "restaurant_candidates"),
+        ("dietary_analyzer", dietary_analyzer_agent, adietary_analyzer_agent, "restaurant_candidates", "dietary_matches"),
+        ("budget_filter", budget_filter_agent, None, "restaurant_candidates", "restaurant_candidates"),
+        ("availability_filter", availability_filter_agent, None, "restaurant_candidates", "restaurant_candidates"),
+        ("ranking", ranking_agent, None, ranking_candidates, "final_recommendations"),
+    ]:
+        if name in STAGE_KEY_FIELDS:
+            dietary = name == "dietary_analyzer"
+            on_hit = replay_matches if dietary else None
+            merge = merge_matches if dietary else None
+            func = session_stage(name, cached_stage(name, func, on_hit), on_hit, merge)
+            if afunc is not None:
+                afunc = session_stage(name, cached_stage(name, afunc, on_hit), on_hit, merge)
+        node = trace_node(name, func, candidates_in, candidates_out)
+        if afunc is not None:
+            node = RunnableLambda(node, afunc=trace_node(name, afunc, candidates_in, candidates_out), name=name)
+        graph_builder.add_node(name, node)
 
     # Define workflow Edges
     graph_builder.set_entry_point("input_parser")
-    graph_builder.add_edge("input_parser", "restaurant_search")
-    graph_builder.add_edge("restaurant_search", "dietary_analyzer")
-    graph_builder.add_edge("dietary_analyzer", "budget_filter")
-    graph_builder.add_edge("budget_filter", END)
+    graph_builder.add_edge("input_parser", "query_planner")
+    graph_builder.add_edge("query_planner", "restaurant_search")
+    for stage, targets in [
+        ("restaurant_search", ["budget_filter", "availability_filter", "dietary_analyzer", "ranking", END]),
+        ("budget_filter", ["availability_filter", "dietary_analyzer", "ranking", END]),
+        ("availability_filter", ["dietary_analyzer", "ranking", END]),
+        ("dietary_analyzer", ["ranking", END]),
+    ]:
+        graph_builder.add_conditional_edges(stage, next_stage(stage), targets)
+    graph_builder.add_edge("ranking", END)
 
     # Compile and return the graph
-    return graph_builder.compile()
\ No newline at end of file
+    return graph_builder.compile(checkpointer=checkpointer)
+
+
+def warmup():
+    """Creates the LLM client, embedding model and vector store up front.
+    Servers can call this once at startup; CLI runs can skip it and let
+    each resource load on first use.
+    """
+    get_llm()
+    warmup_rag()
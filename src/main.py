@@ -1,10 +1,51 @@
-"""Restaurant Booking Assitant - Main Entry Point"""
+"""Restaurant Booking Assitant - Main Entry Point
 
+Usage:
+    python -m src.main ["query"] [--stream [-o events.jsonl]] [--interactive]
+
+--stream writes partial results as JSON lines while the workflow runs.
+--interactive keeps the conversation open: each line typed afterwards
+refines the request ("actually make it under $20").
+"""
+
+import argparse
+import sys
+import uuid
 from dotenv import load_dotenv
-from src.graph import build_workflow
+from src.graph import build_workflow, stream_events
+from src.graph.sessions import get_checkpointer, run_turn
+from src.graph.streaming import to_json_line
+from src.agents.ranking_agent import ranking_candidates
+from src.rag.views import recommendation_views
 
 load_dotenv()
 
+DEFAULT_QUERY = "Table for 4, vegan options, downtown Seattle, Saturday 7pm, under $30 per person"
+
+
+def create_initial_state(user_query: str) -> dict:
+    """Builds the initial workflow state for a user query"""
+    return {
+        "user_query": user_query,
+        "follow_up": None,
+        "persons_count": None,
+        'dietary_requirements': None,
+        "budget_per_person": None,
+        "date": None,
+        "time": None,
+        "location": None,
+        "cuisine_preference": None,
+        "execution_plan": [],
+        "restaurant_candidates": [],
+        "dietary_matches": [],
+        "dish_matches": {},
+        "available_times": {},
+        "final_recommendations": [],
+        "stage_runs": {},
+        "messages": []
+    }
+
+
 def print_results(result: dict) -> None:
     """Prints workflow results in a readable format"""
     print("\n" + "-"*60)
@@ -19,7 +60,7 @@ def print_results(result: dict) -> None:
     print(f"   Location: {result['location']}")
     print(f"   Date/Time: {result['date']} at {result['time']}" if result['date'] else "   Date/Time: Not specified")
 
-    restaurants = result['dietary_matches']
+    restaurants = ranking_candidates(result)
     if not restaurants:
         print(f"\n No restaurants found matching your criteria")
         return
@@ -28,13 +69,16 @@ def print_results(result: dict) -> None:
     print("-"*60)
 
     
-    print(f"\n Found {len(result['restaurant_candidates'])} Restaurants:")
-    for i, restaurant in enumerate(result['restaurant_candidates'], 1):
-        print(f"\n   {i}. {restaurant['name']}")
+    recommendations = recommendation_views(result)
+    print(f"\n Top {len(recommendations)} Recommendations:")
+    for i, restaurant in enumerate(recommendations, 1):
+        print(f"\n   {i}. {restaurant['name']} (score {restaurant['score']})")
         print(f"      Cuisine: {restaurant['cuisine']}")
         print(f"      Price: ${restaurant['price_range']}/person")
         print(f"      Rating: {restaurant['rating']}*")
         print(f"      Location: {restaurant['location']}")
+        if 'available_time' in restaurant:
+            print(f"      Table available at: {restaurant['available_time']}")
 
         # Show matching dishes (from RAG)
         if 'matching_dishes' in restaurant:
@@ -44,35 +88,62 @@ def print_results(result: dict) -> None:
 
 
 
+def stream_main(user_query: str, output) -> None:
+    """Runs the workflow and writes each partial result as a JSON line"""
+    app = build_workflow()
+    for event in stream_events(app, create_initial_state(user_query)):
+        output.write(to_json_line(event))
+        output.flush()
+
+
+def interactive_main(user_query: str) -> None:
+    """Runs a session: the query, then one refinement per input line"""
+    app = build_workflow(get_checkpointer())
+    session_id = uuid.uuid4().hex
+    while user_query:
+        print(f"\n Processing: '{user_query}'\n")
+        print_results(run_turn(app, session_id, user_query))
+        try:
+            user_query = input("\nRefine your request (empty line to quit): ").strip()
+        except EOFError:
+            return
+
+
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Find restaurants for a booking request")
+    parser.add_argument("query", nargs="?", default=DEFAULT_QUERY, help="Natural language booking request")
+    parser.add_argument("--stream", action="store_true", help="Write partial results as JSON lines")
+    parser.add_argument("-o", "--output", help="Event JSONL file for --stream (default: stdout)")
+    parser.add_argument("-i", "--interactive", action="store_true", help="Refine the request over several turns")
+    args = parser.parse_args()
+
+    if args.interactive:
+        interactive_main(args.query)
+        return
+
+    if args.stream:
+        output = open(args.output, "w") if args.output else sys.stdout
+        try:
+            stream_main(args.query, output)
+        finally:
+            if args.output:
+                output.close()
+        return
+
     print("\n" + "-"*60)
     print("Welcome to Restaurant Booking Assistant")
     print("-"*60)
 
 
-    # Test query
-    user_query = "Table for 4, vegan options, downtown Seattle, Saturday 7pm, under $30 per person"
+    user_query = args.query
     print(f"\n Processing user query: '{user_query}'\n")
 
     # Build and compile workflow
     app = build_workflow()
 
     #Initialize state
-    initial_state = {
-        "user_query": user_query,
-        "persons_count": None,
-        'dietary_requirements': None,
-        "budget_per_person": None,
-        "date": None,
-        "time": None,
-        "location": None,
-        "cuisine_preference": None,
-        "restaurant_candidates": [],
-        "dietary_matches": [],
-        "final_recommendations": [],
-        "messages": []
-    }
+    initial_state = create_initial_state(user_query)
 
     # Run workflow
     result = app.invoke(initial_state)
@@ -1,5 +1,5 @@
 """RAG modules for semantic menu search"""
 
-from .menu_vectorstore import menu_vectorstore, search_menus, get_restaurant_dishes
+from .menu_vectorstore import get_embeddings, get_menu_vectorstore, warmup, search_menus, get_restaurant_dishes, get_dishes_for_restaurants, get_dishes_by_id
 
-__all__ = ["menu_vectorstore", "search_menus", "get_restaurant_dishes"]
\ No newline at end of file
+__all__ = ["get_embeddings", "get_menu_vectorstore", "warmup", "search_menus", "get_restaurant_dishes", "get_dishes_for_restaurants", "get_dishes_by_id"]
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""Data Version - Token naming the current ingest of the menu data.
+ingest_menus writes a fresh token when it finishes. Anything derived from
+the stores (the restaurant catalog, cached stage results) remembers the
+token it was built under and is rebuilt once the token changes, including
+after an ingest run by another process. Reading the token costs one
+stat() unless the file changed.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from src.config.settings import DATA_VERSION_PATH
+
+# Version reported before the first ingest writes one
+INITIAL_VERSION = "0"
+
+# (path, file identity, token) of the last read
+_cached = (None, None, INITIAL_VERSION)
+_lock = threading.Lock()
+
+
+def data_version(path: Path = DATA_VERSION_PATH) -> str:
+    """Returns the current data version token"""
+    global _cached
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return INITIAL_VERSION
+    # Every bump replaces the file, so a new inode or mtime means a new token
+    identity = (stat.st_ino, stat.st_mtime_ns)
+    seen_path, seen_identity, version = _cached
+    if (path, identity) != (seen_path, seen_identity):
+        with _lock:
+            version = Path(path).read_text().strip() or INITIAL_VERSION
+            _cached = (path, identity, version)
+    return version
+
+
+def bump_data_version(path: Path = DATA_VERSION_PATH) -> str:
+    """Writes a new version token (ingest step).
+    Returns:
+        The new token
+    """
+    version = f"{time.time_ns():x}"
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.tmp")
+    tmp.write_text(version + "\n")
+    tmp.replace(path)
+    return version
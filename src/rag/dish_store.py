@@ -0,0 +1,364 @@
+"""Dish Store - Indexed SQLite store of dishes for exact-filter lookups.
+Written by ingestion next to the vector store. Answers "which dishes at
+these restaurants are vegan and nut free" style questions from indexes,
+without embedding anything. An FTS5 index over dish name, description
+and dietary tags serves the lexical (BM25) half of hybrid menu search.
+"""
+
+import re
+import sqlite3
+from pathlib import Path
+from src.config.settings import DISH_STORE_PATH
+from src.rag.schema import normalize_tag, extract_description
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dishes (
+    id INTEGER PRIMARY KEY,
+    dish_key TEXT NOT NULL UNIQUE,
+    restaurant_name TEXT NOT NULL,
+    location TEXT,
+    cuisine TEXT,
+    category TEXT,
+    price_range REAL,
+    rating REAL,
+    dish_name TEXT NOT NULL,
+    price REAL,
+    dietary TEXT,
+    allergens TEXT,
+    document TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dietary_tags (
+    id INTEGER PRIMARY KEY,
+    tag TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS dish_dietary (
+    dish_id INTEGER NOT NULL REFERENCES dishes(id) ON DELETE CASCADE,
+    tag_id INTEGER NOT NULL REFERENCES dietary_tags(id),
+    PRIMARY KEY (tag_id, dish_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS allergens (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS dish_allergens (
+    dish_id INTEGER NOT NULL REFERENCES dishes(id) ON DELETE CASCADE,
+    allergen_id INTEGER NOT NULL REFERENCES allergens(id),
+    PRIMARY KEY (allergen_id, dish_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_dishes_restaurant ON dishes(restaurant_name);
+CREATE INDEX IF NOT EXISTS idx_dishes_price ON dishes(price);
+CREATE INDEX IF NOT EXISTS idx_dish_dietary_dish ON dish_dietary(dish_id);
+CREATE INDEX IF NOT EXISTS idx_dish_allergens_dish ON dish_allergens(dish_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS dishes_fts USING fts5(
+    dish_name, description, tags, tokenize = 'porter unicode61'
+);
+"""
+
+# BM25 column weights for dish_name, description, tags
+FTS_WEIGHTS = (5.0, 1.0, 2.0)
+
+_FTS_TOKEN = re.compile(r"[a-z0-9]{2,}")
+
+# Columns returned to callers, in the same shape as the Chroma metadata
+METADATA_COLUMNS = [
+    "restaurant_name", "location", "cuisine", "category",
+    "price_range", "rating", "dish_name", "price", "dietary", "allergens",
+]
+
+
+def dish_store_exists(path: Path = DISH_STORE_PATH) -> bool:
+    """Checks whether ingestion has written the dish store."""
+    return Path(path).exists()
+
+
+def connect(path: Path = DISH_STORE_PATH) -> sqlite3.Connection:
+    """Opens the dish store and makes sure the schema exists.
+    Args:
+        path: Location of the SQLite file
+    Returns:
+        Open sqlite3 connection
+    """
+    conn = sqlite3.connect(str(path))
+    conn.execute("PRAGMA foreign_keys = ON")
+    had_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'dishes_fts'").fetchone()
+    conn.executescript(SCHEMA)
+
+    # Stores written before the rating column existed
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(dishes)")}
+    if "rating" not in columns:
+        conn.execute("ALTER TABLE dishes ADD COLUMN rating REAL")
+
+    # Stores written before the lexical index existed
+    if not had_fts:
+        with conn:
+            conn.executemany(
+                "INSERT INTO dishes_fts (rowid, dish_name, description, tags) VALUES (?, ?, ?, ?)",
+                (_fts_row(dish_id, name, document, dietary)
+                 for dish_id, name, document, dietary in
+                 conn.execute("SELECT id, dish_name, document, dietary FROM dishes")),
+            )
+    return conn
+
+
+def _fts_row(dish_id: int, dish_name: str, document: str, dietary: str) -> tuple:
+    """Builds the lexical index row for a dish"""
+    return (dish_id, dish_name, extract_description(document), " ".join(_split_tags(dietary)))
+
+
+def _split_tags(value: str) -> list:
+    """Splits a comma-joined metadata value into normalized tags."""
+    if not value or value == "none":
+        return []
+    return [normalize_tag(v) for v in value.split(",") if v.strip()]
+
+
+def _lookup_id(conn: sqlite3.Connection, table: str, column: str, value: str, cache: dict) -> int:
+    """Returns the id of a tag/allergen row, inserting it on first use."""
+    if value not in cache:
+        conn.execute(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)", (value,))
+        cache[value] = conn.execute(f"SELECT id FROM {table} WHERE {column} = ?", (value,)).fetchone()[0]
+    return cache[value]
+
+
+def insert_dishes(conn: sqlite3.Connection, ids: list, texts: list, metadatas: list) -> None:
+    """Inserts (or replaces) dish rows and their tag/allergen links.
+    Args:
+        conn: Open dish store connection
+        ids: Deterministic dish IDs (same IDs as the vector store)
+        texts: Dish documents (as embedded)
+        metadatas: Matching Chroma metadata dicts
+    """
+    delete_dishes(conn, ids)
+    tag_ids, allergen_ids = {}, {}
+    for key, text, metadata in zip(ids, texts, metadatas):
+        cursor = conn.execute(
+            f"INSERT INTO dishes (dish_key, {', '.join(METADATA_COLUMNS)}, document) "
+            f"VALUES ({', '.join('?' * (len(METADATA_COLUMNS) + 2))})",
+            [key] + [metadata.get(c) for c in METADATA_COLUMNS] + [text],
+        )
+        dish_id = cursor.lastrowid
+        conn.execute(
+            "INSERT INTO dishes_fts (rowid, dish_name, description, tags) VALUES (?, ?, ?, ?)",
+            _fts_row(dish_id, metadata.get("dish_name"), text, metadata.get("dietary")),
+        )
+        for tag in _split_tags(metadata.get("dietary")):
+            conn.execute(
+                "INSERT OR IGNORE INTO dish_dietary (dish_id, tag_id) VALUES (?, ?)",
+                (dish_id, _lookup_id(conn, "dietary_tags", "tag", tag, tag_ids)),
+            )
+        for allergen in _split_tags(metadata.get("allergens")):
+            conn.execute(
+                "INSERT OR IGNORE INTO dish_allergens (dish_id, allergen_id) VALUES (?, ?)",
+                (dish_id, _lookup_id(conn, "allergens", "name", allergen, allergen_ids)),
+            )
+
+
+def delete_dishes(conn: sqlite3.Connection, ids: list) -> None:
+    """Deletes dishes (and their links) by deterministic dish ID.
+    Args:
+        conn: Open dish store connection
+        ids: Dish IDs to remove
+    """
+    keys = [(key,) for key in ids]
+    conn.executemany("DELETE FROM dishes_fts WHERE rowid IN (SELECT id FROM dishes WHERE dish_key = ?)", keys)
+    conn.executemany("DELETE FROM dishes WHERE dish_key = ?", keys)
+
+
+def write_dish_store(ids: list, texts: list, metadatas: list, path: Path = DISH_STORE_PATH) -> None:
+    """Rebuilds the dish store from ingested documents.
+    Args:
+        ids: Deterministic dish IDs
+        texts: Dish documents
+        metadatas: Matching metadata dicts
+        path: Location of the SQLite file
+    """
+    # Start from an empty file so schema changes are picked up
+    Path(path).unlink(missing_ok=True)
+    conn = connect(path)
+    with conn:
+        insert_dishes(conn, ids, texts, metadatas)
+    conn.close()
+
+
+def update_dish_store(upsert_ids: list, texts: list, metadatas: list, delete_ids: list,
+                      path: Path = DISH_STORE_PATH) -> None:
+    """Applies an incremental change set to the dish store in one transaction.
+    Args:
+        upsert_ids: IDs of new or changed dishes
+        texts: Documents for upsert_ids
+        metadatas: Metadata for upsert_ids
+        delete_ids: IDs of dishes that no longer exist
+        path: Location of the SQLite file
+    """
+    conn = connect(path)
+    with conn:
+        delete_dishes(conn, delete_ids)
+        insert_dishes(conn, upsert_ids, texts, metadatas)
+    conn.close()
+
+
+def _filter_clauses(restaurant_names: list = None, dietary_filter: str = None,
+                    exclude_allergens: list = None, max_price: float = None,
+                    dish_keys: list = None):
+    """Builds WHERE clauses over dishes (aliased d) for the exact filters.
+    Returns:
+        (clauses, params), or None if a filter can match nothing
+    """
+    clauses, params = [], []
+    if dish_keys is not None:
+        if not dish_keys:
+            return None
+        clauses.append(f"d.dish_key IN ({', '.join('?' * len(dish_keys))})")
+        params.extend(dish_keys)
+    if restaurant_names is not None:
+        if not restaurant_names:
+            return None
+        clauses.append(f"d.restaurant_name IN ({', '.join('?' * len(restaurant_names))})")
+        params.extend(restaurant_names)
+    if dietary_filter:
+        clauses.append(
+            "d.id IN (SELECT dd.dish_id FROM dish_dietary dd "
+            "JOIN dietary_tags t ON t.id = dd.tag_id WHERE t.tag = ?)"
+        )
+        params.append(normalize_tag(dietary_filter))
+    if exclude_allergens:
+        allergens = [normalize_tag(a) for a in exclude_allergens]
+        clauses.append(
+            "d.id NOT IN (SELECT da.dish_id FROM dish_allergens da "
+            "JOIN allergens a ON a.id = da.allergen_id "
+            f"WHERE a.name IN ({', '.join('?' * len(allergens))}))"
+        )
+        params.extend(allergens)
+    if max_price is not None:
+        clauses.append("d.price <= ?")
+        params.append(max_price)
+    return clauses, params
+
+
+def _read_rows(sql: str, params: list, path: Path) -> list:
+    """Runs a read-only query and returns (dish ID, document, metadata) tuples"""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+    return [(row[0], row[-1], dict(zip(METADATA_COLUMNS, row[1:-1]))) for row in rows]
+
+
+_SELECT_DISHES = f"SELECT d.dish_key, {', '.join('d.' + c for c in METADATA_COLUMNS)}, d.document"
+
+
+def query_dishes(restaurant_names: list = None, dietary_filter: str = None,
+                 exclude_allergens: list = None, max_price: float = None,
+                 dish_keys: list = None, path: Path = DISH_STORE_PATH) -> list:
+    """Finds dishes matching exact filters using the store indexes.
+    Args:
+        restaurant_names: Optional restaurants to restrict to
+        dietary_filter: Optional dietary tag the dish must have
+        exclude_allergens: Optional allergens the dish must not contain
+        max_price: Optional maximum dish price
+        dish_keys: Optional dish IDs to restrict to
+        path: Location of the SQLite file
+    Returns:
+        List of (dish ID, document, metadata) tuples
+    """
+    filters = _filter_clauses(restaurant_names, dietary_filter, exclude_allergens, max_price, dish_keys)
+    if filters is None:
+        return []
+    clauses, params = filters
+
+    sql = f"{_SELECT_DISHES} FROM dishes d"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY d.id"
+    return _read_rows(sql, params, path)
+
+
+def count_dishes(path: Path = DISH_STORE_PATH) -> int:
+    """Number of dishes in the store"""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM dishes").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def iter_dishes(batch_size: int = 512, path: Path = DISH_STORE_PATH):
+    """Streams every dish in insertion order.
+    Args:
+        batch_size: Rows fetched per batch
+        path: Location of the SQLite file
+    Yields:
+        Lists of (dish ID, document, metadata) tuples
+    """
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        cursor = conn.execute(f"{_SELECT_DISHES} FROM dishes d ORDER BY d.id")
+        while rows := cursor.fetchmany(batch_size):
+            yield [(row[0], row[-1], dict(zip(METADATA_COLUMNS, row[1:-1]))) for row in rows]
+    finally:
+        conn.close()
+
+
+def fts_query(text: str) -> str:
+    """Turns free text into an FTS5 OR-query of quoted terms ("" if none)"""
+    terms = dict.fromkeys(_FTS_TOKEN.findall(text.lower()))
+    return " OR ".join(f'"{t}"' for t in terms)
+
+
+def search_dishes_text(query: str, limit: int, restaurant_names: list = None,
+                       dietary_filter: str = None, exclude_allergens: list = None,
+                       max_price: float = None, path: Path = DISH_STORE_PATH) -> list:
+    """Ranks dishes by BM25 over name, description and tags, filters applied in SQL.
+    Args:
+        query: Free-text query
+        limit: Maximum number of dishes
+        restaurant_names, dietary_filter, exclude_allergens, max_price: As in query_dishes
+        path: Location of the SQLite file
+    Returns:
+        List of (dish ID, document, metadata) tuples, best match first.
+        Empty if the query has no searchable terms or the store predates the index.
+    """
+    match = fts_query(query)
+    filters = _filter_clauses(restaurant_names, dietary_filter, exclude_allergens, max_price)
+    if not match or filters is None:
+        return []
+    clauses, params = filters
+
+    sql = (
+        f"{_SELECT_DISHES} FROM dishes_fts JOIN dishes d ON d.id = dishes_fts.rowid "
+        "WHERE dishes_fts MATCH ?"
+    )
+    if clauses:
+        sql += " AND " + " AND ".join(clauses)
+    sql += f" ORDER BY bm25(dishes_fts, {', '.join(map(str, FTS_WEIGHTS))}) LIMIT ?"
+    try:
+        return _read_rows(sql, [match] + params + [limit], path)
+    except sqlite3.OperationalError:
+        return []
+
+
+def query_restaurants(path: Path = DISH_STORE_PATH) -> list:
+    """Aggregates restaurant-level rows from the dish table.
+    Args:
+        path: Location of the SQLite file
+    Returns:
+        List of (name, location, cuisine, price_range, rating, tags) where
+        tags is the set of dietary tags offered by at least one dish
+    """
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(
+            "SELECT restaurant_name, MIN(location), MIN(cuisine), MAX(price_range), MAX(rating) "
+            "FROM dishes GROUP BY restaurant_name ORDER BY restaurant_name"
+        ).fetchall()
+        tags = {}
+        for name, tag in conn.execute(
+            "SELECT DISTINCT d.restaurant_name, t.tag FROM dishes d "
+            "JOIN dish_dietary dd ON dd.dish_id = d.id JOIN dietary_tags t ON t.id = dd.tag_id"
+        ):
+            tags.setdefault(name, set()).add(tag)
+    finally:
+        conn.close()
+
+    return [row + (tags.get(row[0], set()),) for row in rows]
@@ -0,0 +1,123 @@
+"""Embedding Cache - Avoids recomputing embeddings for texts seen before.
+Document vectors are kept on disk (SQLite) so re-ingestion does not
+re-embed unchanged dishes; query vectors are kept in a bounded in-memory
+LRU so repeated probes such as "all dishes" are embedded once.
+Entries are keyed by (model name, text hash), so changing EMBED_MODEL
+never serves vectors from a different model.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from langchain_core.embeddings import Embeddings
+from src.config.settings import EMBEDDING_CACHE_PATH, QUERY_EMBEDDING_CACHE_SIZE
+from src.utils.metrics import EMBED_SECONDS, EMBED_TEXTS, timed
+
+
+def text_hash(text: str) -> str:
+    """Hashes a text for use as a cache key."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper with a persistent document cache and a query LRU."""
+
+    def __init__(self, underlying: Embeddings, model_name: str,
+                 store_path: Path = EMBEDDING_CACHE_PATH,
+                 query_cache_size: int = QUERY_EMBEDDING_CACHE_SIZE):
+        """
+        Args:
+            underlying: Embedding model that computes cache misses
+            model_name: Model identifier, part of every cache key
+            store_path: SQLite file for document vectors
+            query_cache_size: Maximum number of query vectors kept in memory
+        """
+        self.underlying = underlying
+        self.model_name = model_name
+        self.query_cache_size = query_cache_size
+        self._query_cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(store_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (model, text_hash)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+        self.document_hits = 0
+        self.document_misses = 0
+        self.query_hits = 0
+        self.query_misses = 0
+
+    def embed_documents(self, texts: list) -> list:
+        """Embeds documents, computing only vectors missing from the store."""
+        keys = [text_hash(t) for t in texts]
+        cached = {}
+        with self._lock:
+            # SQLite limits the number of bound parameters per statement
+            unique_keys = list(dict.fromkeys(keys))
+            for start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                    f"AND text_hash IN ({', '.join('?' * len(chunk))})",
+                    [self.model_name] + chunk,
+                ).fetchall()
+                cached.update((key, array("f", blob).tolist()) for key, blob in rows)
+
+        missing = list({key: text for key, text in zip(keys, texts) if key not in cached}.items())
+        if missing:
+            with timed(EMBED_SECONDS, kind="documents"):
+                vectors = self.underlying.embed_documents([text for _, text in missing])
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                    [(self.model_name, key, array("f", vector).tobytes())
+                     for (key, _), vector in zip(missing, vectors)],
+                )
+                self._conn.commit()
+            for (key, _), vector in zip(missing, vectors):
+                cached[key] = list(vector)
+
+        with self._lock:
+            self.document_misses += len(missing)
+            self.document_hits += len(texts) - len(missing)
+        EMBED_TEXTS.inc(len(missing), kind="documents", cache="miss")
+        EMBED_TEXTS.inc(len(texts) - len(missing), kind="documents", cache="hit")
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> list:
+        """Embeds a query, serving repeats from the in-memory LRU."""
+        key = text_hash(text)
+        with self._lock:
+            vector = self._query_cache.get(key)
+            if vector is not None:
+                self._query_cache.move_to_end(key)
+                self.query_hits += 1
+                EMBED_TEXTS.inc(kind="query", cache="hit")
+                return vector
+            self.query_misses += 1
+
+        EMBED_TEXTS.inc(kind="query", cache="miss")
+        with timed(EMBED_SECONDS, kind="query"):
+            vector = self.underlying.embed_query(text)
+        with self._lock:
+            self._query_cache[key] = vector
+            if len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+        return vector
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters for both cache tiers."""
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "document_hits": self.document_hits,
+                "document_misses": self.document_misses,
+                "query_hits": self.query_hits,
+                "query_misses": self.query_misses,
+                "query_cache_entries": len(self._query_cache),
+            }
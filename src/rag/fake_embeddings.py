@@ -0,0 +1,39 @@
+"""Fake Embeddings - Cheap deterministic stand-in for the sentence model.
+Feature-hashes word unigrams into a fixed-size vector and L2-normalizes
+it, so texts sharing words land close together and the same text always
+gets the same vector. Used for benchmarks and offline runs
+(EMBEDDING_BACKEND=fake); not meant for real retrieval quality.
+"""
+
+import hashlib
+import math
+import re
+from langchain_core.embeddings import Embeddings
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic hashed bag-of-words embeddings."""
+
+    def __init__(self, dimensions: int = 384):
+        """
+        Args:
+            dimensions: Vector size (384 matches all-MiniLM-L6-v2)
+        """
+        self.dimensions = dimensions
+
+    def _embed(self, text: str) -> list:
+        vector = [0.0] * self.dimensions
+        for word in _WORD.findall(text.lower()):
+            digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: list) -> list:
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> list:
+        return self._embed(text)
@@ -0,0 +1,29 @@
+"""Hybrid Search - Fuses lexical and vector rankings of menu dishes.
+BM25 is good at exact dish names and ingredients ("paneer tikka"), the
+embedding is good at paraphrase ("something creamy and meatless"). Their
+scores are not comparable, so the rankings are combined by reciprocal
+rank fusion, which only looks at positions.
+"""
+
+from src.config.settings import RRF_K
+
+
+def reciprocal_rank_fusion(rankings: list, k: int, rrf_k: int = RRF_K) -> list:
+    """Combines ranked lists of Documents into one.
+    Each document scores sum(1 / (rrf_k + rank)) over the lists it appears
+    in; documents are identified by their dish ID.
+
+    Args:
+        rankings: Lists of Documents, each best first
+        k: Number of documents to return
+        rrf_k: Damping constant; larger values flatten the rank weights
+    Returns:
+        Up to k Documents, best first. Ties keep first-seen order.
+    """
+    scores, documents = {}, {}
+    for ranking in rankings:
+        for rank, document in enumerate(ranking, start=1):
+            scores[document.id] = scores.get(document.id, 0.0) + 1.0 / (rrf_k + rank)
+            documents.setdefault(document.id, document)
+    best = sorted(scores, key=scores.get, reverse=True)[:k]
+    return [documents[dish_id] for dish_id in best]
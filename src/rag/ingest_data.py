@@ -1,33 +1,55 @@
 """Data Ingestion - Loads restaurant menu data into ChromaDB vector store.
-Run this once to populate the database before using the system.
+Run this once to populate the database before using the system. Later runs
+are incremental: only new or changed dishes are embedded, and dishes from
+removed or edited menus are deleted.
+
+Ingestion is a streaming pipeline: menu files are parsed in a process
+pool, dishes are grouped into fixed-size batches, and each batch is
+embedded and written as soon as it is full, so memory stays bounded no
+matter how many menus there are.
+
+Usage:
+    python -m src.rag.ingest_data [--full] [--workers N] [--batch-size N]
+                                  [--quantization float32|float16|int8]
 """
 
-from pathlib import Path
+import argparse
+import hashlib
 import json
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
-import os
-from dotenv import load_dotenv
-from src.config.settings import MENUS_DIR, PERSIST_DIR
-
-load_dotenv()
-
-EMBED_MODEL = os.getenv("EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
-
-def load_menu_data():
-    """Loads all menu JSON files from data/menus directory.
-
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from src.config.settings import (
+    MENUS_DIR, PERSIST_DIR, DISH_STORE_PATH, MANIFEST_PATH, INGEST_WORKERS, INGEST_BATCH_SIZE,
+    VECTOR_BACKEND, VECTOR_INDEX_DIR, VECTOR_QUANTIZATION, DATA_VERSION_PATH,
+)
+from src.rag.data_version import bump_data_version
+from src.rag.dish_store import write_dish_store, update_dish_store
+from src.rag.menu_vectorstore import get_menu_vectorstore, get_embeddings, reset_menu_vectorstore
+from src.rag.restaurant_catalog import build_catalog
+from src.rag.schema import dietary_flag_key, allergen_flag_key
+
+def dish_id(restaurant_name: str, category: str, dish_name: str, occurrence: int = 0) -> str:
+    """Builds a deterministic document ID for a dish.
+    Args:
+        restaurant_name: Restaurant the dish belongs to
+        category: Menu category (e.g., mains)
+        dish_name: Name of the dish
+        occurrence: Disambiguates repeated dish names within a category
     Returns:
-        List of menu dictionaries
+        Hex ID, stable across ingestion runs
     """
-    menus = []
+    key = f"{restaurant_name}\x1f{category}\x1f{dish_name}\x1f{occurrence}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
 
-    for menus_file in MENUS_DIR.glob("*.json"):
-        with open(menus_file, 'r') as f:
-            menu_data = json.load(f)
-            menus.append(menu_data)
+def content_hash(text: str, metadata: dict) -> str:
+    """Hashes a dish document and its metadata to detect edits."""
+    payload = text + "\x1e" + json.dumps(metadata, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
 
-    return menus
 
 def create_menu_documents(menus):
     """Converts menu data into text documents for embedding.
@@ -37,11 +59,12 @@ def create_menu_documents(menus):
         menus: List of menu dictionaries
 
     Returns:
-        Tuple of (texts, metadatas) for ChromaDB
+        Tuple of (texts, metadatas, ids) for ChromaDB
     """
 
     texts = []
     metadatas = []
+    ids = []
 
     for menu in menus:
         restaurant_name = menu["restaurant_name"]
@@ -51,7 +74,11 @@ def create_menu_documents(menus):
 
         # Process each category (appetizers, mains, desserts)
         for category, items in menu["menu"].items():
+            seen = {}
             for item in items:
+                occurrence = seen.get(item['name'], 0)
+                seen[item['name']] = occurrence + 1
+
                 # Create rich text description for embedding
                 text = f"""
 Restaurant: {restaurant_name}
@@ -78,43 +105,280 @@ Allergens: {', '.join(item['allergens']) if item['allergens'] else 'None'}
                     "allergens": ",".join(item['allergens']) if item['allergens'] else "none"
                 }
 
+                if menu.get("rating") is not None:
+                    metadata["rating"] = menu["rating"]
+
+                # One boolean flag per dietary tag so filters can run inside Chroma
+                for tag in item['dietary']:
+                    metadata[dietary_flag_key(tag)] = True
+                for allergen in item['allergens']:
+                    metadata[allergen_flag_key(allergen)] = True
+
                 texts.append(text.strip())
                 metadatas.append(metadata)
+                ids.append(dish_id(restaurant_name, category, item['name'], occurrence))
+
+    return texts, metadatas, ids
+
+
+class IngestManifest:
+    """Content-hash manifest of what is currently ingested.
+    Stored in SQLite so incremental runs over very large corpora do not
+    need the whole manifest in memory.
+    """
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.conn = sqlite3.connect(str(path))
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                name TEXT PRIMARY KEY,
+                file_hash TEXT NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS dishes (
+                id TEXT PRIMARY KEY,
+                file_name TEXT NOT NULL,
+                content_hash TEXT NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_manifest_dishes_file ON dishes(file_name);
+        """)
+
+    def file_hashes(self) -> dict:
+        """Returns {file name: file hash} for every ingested file."""
+        return dict(self.conn.execute("SELECT name, file_hash FROM files"))
+
+    def dish_hashes(self, file_name: str) -> dict:
+        """Returns {dish id: content hash} for one ingested file."""
+        return dict(self.conn.execute(
+            "SELECT id, content_hash FROM dishes WHERE file_name = ?", (file_name,)
+        ))
+
+    def replace_file(self, file_name: str, file_hash: str, dishes: dict) -> None:
+        """Records the current hashes of a file and its dishes."""
+        self.conn.execute("DELETE FROM dishes WHERE file_name = ?", (file_name,))
+        self.conn.execute("INSERT OR REPLACE INTO files (name, file_hash) VALUES (?, ?)", (file_name, file_hash))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO dishes (id, file_name, content_hash) VALUES (?, ?, ?)",
+            [(id_, file_name, hash_) for id_, hash_ in dishes.items()]
+        )
+
+    def remove_file(self, file_name: str) -> None:
+        """Forgets a file and its dishes."""
+        self.conn.execute("DELETE FROM dishes WHERE file_name = ?", (file_name,))
+        self.conn.execute("DELETE FROM files WHERE name = ?", (file_name,))
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def parse_menu_file(path: Path, previous_hash: str = None):
+    """Parses one menu file into dish documents (runs in a worker process).
+    Args:
+        path: Menu JSON file
+        previous_hash: File hash from the last ingest, if any
+    Returns:
+        Tuple of (file name, file hash, dishes) where dishes is a list of
+        (id, text, metadata, content hash), or None if the file is unchanged
+    """
+    raw = Path(path).read_bytes()
+    file_hash = hashlib.sha1(raw).hexdigest()
+    if file_hash == previous_hash:
+        return Path(path).name, file_hash, None
 
-    return texts, metadatas
+    texts, metadatas, ids = create_menu_documents([json.loads(raw)])
+    dishes = [
+        (id_, text, metadata, content_hash(text, metadata))
+        for id_, text, metadata in zip(ids, texts, metadatas)
+    ]
+    return Path(path).name, file_hash, dishes
 
 
-def ingest_menus():
-    """Main ingestion function. Loads menus and creates ChromaDB vector store.
+def _parse_menu_file_args(args):
+    return parse_menu_file(*args)
+
+
+def iter_parsed_menus(tasks, workers: int):
+    """Parses menu files in a process pool, yielding results in order.
+    At most a few tasks per worker are in flight, so parsed menus never
+    pile up faster than the embedding stage consumes them.
+
+    Args:
+        tasks: Iterable of (path, previous file hash)
+        workers: Number of parser processes (1 parses inline)
+    Yields:
+        parse_menu_file results
+    """
+    if workers <= 1:
+        for task in tasks:
+            yield parse_menu_file(*task)
+        return
+
+    window = workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for task in tasks:
+            in_flight.append(executor.submit(_parse_menu_file_args, task))
+            if len(in_flight) >= window:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+class IngestProgress:
+    """Tracks and periodically prints ingestion throughput."""
+
+    def __init__(self, report_every: float = 5.0):
+        self.started = time.perf_counter()
+        self.last_report = self.started
+        self.report_every = report_every
+        self.files_seen = 0
+        self.files_changed = 0
+        self.dishes_written = 0
+        self.dishes_deleted = 0
+
+    def maybe_report(self, force: bool = False) -> None:
+        now = time.perf_counter()
+        if force or now - self.last_report >= self.report_every:
+            self.last_report = now
+            elapsed = now - self.started
+            print(f"  {self.files_seen} files ({self.files_changed} changed), "
+                  f"{self.dishes_written} dishes embedded, {self.dishes_deleted} deleted, "
+                  f"{elapsed:.1f}s, {self.dishes_written / elapsed if elapsed else 0:.0f} dishes/s")
+
+
+class BatchWriter:
+    """Buffers dish upserts/deletes and flushes them in fixed-size batches.
+    Manifest entries for a file are committed only after its dishes are
+    written, so an interrupted run is picked up by the next incremental run.
     """
-    
-    # Load menu data
-    print("Loading menu data...")
-    menus = load_menu_data()
-    print(f"Loaded {len(menus)} restaurant menus")
-
-    # Convert to documents
-    print("Creating documents for embedding...")
-    texts, metadatas = create_menu_documents(menus)
-    print(f"Created {len(texts)} dish documents")
-
-    # Initialize embeddings (using free HuggingFace model)
-    print("Initializing embeddings model...")
-    embeddings = HuggingFaceEmbeddings(
-        model_name=EMBED_MODEL,
-    )
-    print("Embeddings model loaded")
-
-    # Create/update ChromaDB 
-    print("Creating ChromaDB vector store...")
-    vectorstore = Chroma.from_texts(
-        texts=texts, 
-        metadatas=metadatas,
-        embedding=embeddings,
-        collection_name="restaurant_menus",
-        persist_directory=str(PERSIST_DIR)
-    )
-    print(f"ChromaDB vector store created at {PERSIST_DIR}")
+
+    def __init__(self, vectorstore, manifest: IngestManifest, batch_size: int, progress: IngestProgress):
+        self.vectorstore = vectorstore
+        self.manifest = manifest
+        self.batch_size = batch_size
+        self.progress = progress
+        self.upserts = []
+        self.delete_ids = []
+        self.pending_files = []
+
+    def add_file(self, file_name: str, file_hash: str, upserts: list, delete_ids: list, dishes: dict) -> None:
+        self.upserts.extend(upserts)
+        self.delete_ids.extend(delete_ids)
+        self.pending_files.append((file_name, file_hash, dishes))
+        if len(self.upserts) + len(self.delete_ids) >= self.batch_size:
+            self.flush()
+
+    def delete(self, file_name: str, delete_ids: list) -> None:
+        self.delete_ids.extend(delete_ids)
+        self.pending_files.append((file_name, None, None))
+        if len(self.delete_ids) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.delete_ids:
+            self.vectorstore.delete(ids=self.delete_ids)
+        for start in range(0, len(self.upserts), self.batch_size):
+            ids, texts, metadatas = (list(c) for c in zip(*self.upserts[start:start + self.batch_size]))
+            self.vectorstore.add_texts(texts=texts, metadatas=metadatas, ids=ids)
+        if self.upserts or self.delete_ids:
+            ids, texts, metadatas = (list(c) for c in zip(*self.upserts)) if self.upserts else ([], [], [])
+            update_dish_store(ids, texts, metadatas, self.delete_ids)
+
+        for file_name, file_hash, dishes in self.pending_files:
+            if file_hash is None:
+                self.manifest.remove_file(file_name)
+            else:
+                self.manifest.replace_file(file_name, file_hash, dishes)
+        self.manifest.commit()
+
+        self.progress.dishes_written += len(self.upserts)
+        self.progress.dishes_deleted += len(self.delete_ids)
+        self.upserts, self.delete_ids, self.pending_files = [], [], []
+        self.progress.maybe_report()
+
+
+def report_embedding_cache() -> None:
+    """Prints embedding cache hit/miss counters after an ingest run."""
+    embeddings = get_embeddings()
+    if hasattr(embeddings, "stats"):
+        stats = embeddings.stats()
+        print(f"Embedding cache: {stats['document_hits']} hits, {stats['document_misses']} misses")
+
+
+def ingest_menus(full: bool = False, workers: int = INGEST_WORKERS, batch_size: int = INGEST_BATCH_SIZE,
+                 quantization: str = VECTOR_QUANTIZATION):
+    """Main ingestion function. Streams menus into the ChromaDB vector store.
+    Only new or changed dishes are embedded; dishes from edited or removed
+    menus are deleted.
+
+    Args:
+        full: Drop everything and re-ingest every menu. Also happens
+            automatically when there is no ingest manifest yet.
+        workers: Number of parser processes
+        batch_size: Number of dishes embedded and written per batch
+        quantization: Embedding storage for the NumPy index ("float32",
+            "float16" or "int8"). Every run rebuilds that index, so changing
+            it does not need --full. Chroma always stores float32.
+    """
+    full = full or not MANIFEST_PATH.exists()
+    if full:
+        # Start from empty stores so no stale or duplicate documents survive
+        print("Full ingest: clearing vector store, dish store and manifest...")
+        reset_menu_vectorstore()
+        write_dish_store([], [], [])
+        MANIFEST_PATH.unlink(missing_ok=True)
+
+    print("Initializing embeddings model and vector store...")
+    vectorstore = get_menu_vectorstore()
+    manifest = IngestManifest()
+    previous_hashes = manifest.file_hashes()
+    progress = IngestProgress()
+    writer = BatchWriter(vectorstore, manifest, batch_size, progress)
+
+    print(f"Ingesting menus from {MENUS_DIR} ({workers} workers, batch size {batch_size})...")
+    seen_files = set()
+    tasks = ((path, previous_hashes.get(path.name)) for path in sorted(MENUS_DIR.glob("*.json")))
+    for file_name, file_hash, dishes in iter_parsed_menus(tasks, workers):
+        seen_files.add(file_name)
+        progress.files_seen += 1
+        if dishes is None:
+            continue
+
+        # Compare dish by dish so only edited dishes are re-embedded
+        progress.files_changed += 1
+        old_dishes = manifest.dish_hashes(file_name) if file_name in previous_hashes else {}
+        new_dishes = {id_: hash_ for id_, _, _, hash_ in dishes}
+        upserts = [(id_, text, metadata) for id_, text, metadata, hash_ in dishes if old_dishes.get(id_) != hash_]
+        delete_ids = [id_ for id_ in old_dishes if id_ not in new_dishes]
+        writer.add_file(file_name, file_hash, upserts, delete_ids, new_dishes)
+
+    # Menus removed from MENUS_DIR since the last ingest
+    for file_name in previous_hashes:
+        if file_name not in seen_files:
+            writer.delete(file_name, list(manifest.dish_hashes(file_name)))
+
+    writer.flush()
+    manifest.close()
+    progress.maybe_report(force=True)
+    report_embedding_cache()
+
+    # The NumPy index is regenerated from the dish store (vectors come from the embedding cache)
+    if VECTOR_BACKEND == "numpy":
+        indexed = vectorstore.rebuild(batch_size, quantization)
+        print(f"NumPy vector index with {indexed} {quantization} dishes written to {VECTOR_INDEX_DIR}")
+    elif quantization != "float32":
+        print(f"Note: {quantization} storage needs VECTOR_BACKEND=numpy; Chroma keeps float32 embeddings")
+
+    # Restaurant-level catalog for the search agent
+    catalog = build_catalog()
+    print(f"Restaurant catalog with {len(catalog)} restaurants written")
+
+    # New data version: cached stage results and catalogs in running processes are dropped
+    version = bump_data_version()
+    print(f"Data version {version} written to {DATA_VERSION_PATH}")
+    print(f"{VECTOR_BACKEND} vector store at {PERSIST_DIR}, dish store at {DISH_STORE_PATH}")
 
     # Test search
     print("Testing semantic search...")
@@ -131,19 +395,12 @@ def ingest_menus():
     print("\nYou can now run the main application with RAG enabled.\n")
 
 
-
 if __name__ == "__main__":
-    ingest_menus()
-
-
-    
-
-
-
-
- 
-
-
-        
-
-
+    parser = argparse.ArgumentParser(description="Ingest restaurant menus into the vector store")
+    parser.add_argument("--full", action="store_true", help="Re-embed every menu instead of only changes")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS, help="Parser processes")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE, help="Dishes per embed/write batch")
+    parser.add_argument("--quantization", choices=["float32", "float16", "int8"], default=VECTOR_QUANTIZATION,
+                        help="Embedding storage for the NumPy vector index")
+    args = parser.parse_args()
+    ingest_menus(full=args.full, workers=args.workers, batch_size=args.batch_size, quantization=args.quantization)
@@ -1,70 +1,356 @@
-"""Menu Vector Store - Provides access to ChromaDB for menu searches"""
+"""Menu Vector Store - Provides access to the menu vector index for searches.
+The backend is ChromaDB, or the in-process NumPy index when
+VECTOR_BACKEND=numpy. The embedding model and store are created lazily on
+first use so importing this module stays cheap. With MENU_STORE_MODE=sidecar
+the search and lookup functions below are forwarded to the menu store
+sidecar process instead, so this process never loads either.
+"""
 
+import functools
+import inspect
 import os
+import threading
 from dotenv import load_dotenv
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
-from src.config.settings import PERSIST_DIR
+from langchain_core.documents import Document
+from src.config.settings import (
+    PERSIST_DIR, EMBED_BATCH_SIZE, EMBEDDING_BACKEND, FAKE_EMBEDDING_DIM,
+    SEARCH_MODE, SEARCH_CANDIDATE_MULTIPLIER, VECTOR_BACKEND, VECTOR_INDEX_DIR, QUERY_EMBED_BATCH_SIZE,
+    MENU_STORE_MODE,
+)
+from src.rag.schema import dietary_flag_key, allergen_flag_key, normalize_tag
+from src.rag.dish_store import dish_store_exists, query_dishes, search_dishes_text
+from src.rag.hybrid import reciprocal_rank_fusion
+from src.rag.embedding_cache import CachedEmbeddings
+from src.rag.data_version import data_version
+from src.utils.metrics import VECTOR_SECONDS, VECTOR_RESULTS, timed
 
 load_dotenv()
 
 EMBED_MODEL = os.getenv("EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
 
-# Initialize embeddings
-embeddings = HuggingFaceEmbeddings(
-    model_name=EMBED_MODEL,
-)
+_embeddings = None
+_menu_vectorstore = None
+_init_lock = threading.Lock()
+# (data version, dish count) of the menu collection
+_collection_size = None
 
-# Initialize vector store (connects to existing database)
-menu_vectorstore = Chroma(
-    collection_name="restaurant_menus",
-    embedding_function=embeddings,
-    persist_directory=str(PERSIST_DIR)
-)
 
-def search_menus(query: str, k: int = 5, dietary_filter: str = None):
-    """Semantic search for restaurant menus.
-    Args: 
-        query: Searh  query (e.g., vegan pasta)
+def _sidecar_routed(func):
+    """Forwards calls to the menu store sidecar when MENU_STORE_MODE=sidecar.
+    The sidecar itself runs the original function (inspect.unwrap).
+    Arguments annotated `list` are converted to lists before they are sent,
+    so sets and tuples are accepted in both modes.
+    """
+    if MENU_STORE_MODE != "sidecar":
+        return func
+    signature = inspect.signature(func)
+    list_params = [name for name, param in signature.parameters.items() if param.annotation is list]
+
+    @functools.wraps(func)
+    def forward(*args, **kwargs):
+        from src.rag.sidecar import get_client
+        arguments = dict(signature.bind(*args, **kwargs).arguments)
+        for name in list_params:
+            if arguments.get(name) is not None:
+                arguments[name] = list(arguments[name])
+        return get_client().call(func.__name__, arguments)
+    return forward
+
+
+def get_embeddings():
+    """Returns the shared (cached) embedding model, loading it on first call.
+    Query cache misses from concurrent requests are micro-batched into one
+    forward pass (see QueryBatcher). EMBEDDING_BACKEND=fake uses
+    deterministic hashed embeddings instead; they are cheaper than a queue
+    hop, so they are not batched.
+    """
+    global _embeddings
+    if _embeddings is None:
+        with _init_lock:
+            if _embeddings is None and EMBEDDING_BACKEND == "fake":
+                from src.rag.fake_embeddings import HashEmbeddings
+                _embeddings = CachedEmbeddings(
+                    HashEmbeddings(FAKE_EMBEDDING_DIM),
+                    model_name=f"fake-hash-{FAKE_EMBEDDING_DIM}",
+                )
+            elif _embeddings is None:
+                from langchain_huggingface import HuggingFaceEmbeddings
+                model = HuggingFaceEmbeddings(
+                    model_name=EMBED_MODEL,
+                    encode_kwargs={"batch_size": EMBED_BATCH_SIZE},
+                )
+                if QUERY_EMBED_BATCH_SIZE > 1:
+                    from src.rag.query_batcher import QueryBatcher
+                    model = QueryBatcher(model)
+                _embeddings = CachedEmbeddings(model, model_name=EMBED_MODEL)
+    return _embeddings
+
+
+def get_menu_vectorstore():
+    """Returns the shared vector store, connecting on first call.
+    Both backends offer the add_texts / delete / get / similarity_search
+    calls used by ingestion and the agents.
+    """
+    global _menu_vectorstore
+    if _menu_vectorstore is None:
+        embeddings = get_embeddings()
+        with _init_lock:
+            if _menu_vectorstore is None and VECTOR_BACKEND == "numpy":
+                from src.rag.numpy_store import NumpyVectorStore
+                _menu_vectorstore = NumpyVectorStore(embeddings, VECTOR_INDEX_DIR)
+            elif _menu_vectorstore is None:
+                from langchain_community.vectorstores import Chroma
+                # Connects to existing database
+                _menu_vectorstore = Chroma(
+                    collection_name="restaurant_menus",
+                    embedding_function=embeddings,
+                    persist_directory=str(PERSIST_DIR)
+                )
+    return _menu_vectorstore
+
+
+def get_menu_collection():
+    """Returns the store's collection-level query API and its dish count.
+    The NumPy store implements that API itself; for Chroma this is the one
+    place its underlying collection is used. The count is cached per data
+    version, so searches do not pay a count() call each.
+    """
+    global _collection_size
+    store = get_menu_vectorstore()
+    collection = store if VECTOR_BACKEND == "numpy" else store._collection
+    version, size = data_version(), _collection_size
+    if size is None or size[0] != version:
+        size = _collection_size = (version, collection.count())
+    return collection, size[1]
+
+
+def reset_menu_vectorstore():
+    """Drops the menu collection; the next get_menu_vectorstore() recreates it."""
+    global _menu_vectorstore, _collection_size
+    get_menu_vectorstore().delete_collection()
+    with _init_lock:
+        _menu_vectorstore = None
+        _collection_size = None
+
+
+@_sidecar_routed
+def warmup():
+    """Loads the embedding model and opens the vector store ahead of traffic.
+    Optional; servers can call this at startup so the first request does
+    not pay for model loading.
+    """
+    get_embeddings().embed_query("all dishes")
+    get_menu_vectorstore()
+
+
+def __getattr__(name):
+    # Backwards compatible access to the old module-level singletons
+    if name == "menu_vectorstore":
+        return get_menu_vectorstore()
+    if name == "embeddings":
+        return get_embeddings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _menu_where(dietary_filter: str = None, exclude_allergens: list = None,
+                restaurant_names: list = None, max_price: float = None):
+    """Builds the Chroma where-clause for the menu search filters (None if unfiltered)"""
+    conditions = []
+    if dietary_filter:
+        conditions.append({dietary_flag_key(dietary_filter): True})
+    if restaurant_names is not None:
+        conditions.append({"restaurant_name": {"$in": list(restaurant_names)}})
+    if max_price is not None:
+        conditions.append({"price": {"$lte": max_price}})
+    # Dishes ingested before allergen flags existed have no key and pass $ne
+    for allergen in exclude_allergens or []:
+        conditions.append({allergen_flag_key(allergen): {"$ne": True}})
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def _vector_candidates(query: str, n: int, where: dict = None) -> list:
+    """Nearest dishes to the query among those passing the where-clause"""
+    collection, size = get_menu_collection()
+    n = min(n, size)
+    if n <= 0:
+        return []
+    with timed(VECTOR_SECONDS, backend=VECTOR_BACKEND, operation="similarity_search"):
+        results = collection.query(
+            query_embeddings=[get_embeddings().embed_query(query)],
+            n_results=n,
+            where=where,
+            include=["documents", "metadatas"],
+        )
+    VECTOR_RESULTS.observe(len(results["ids"][0]), backend=VECTOR_BACKEND, operation="similarity_search")
+    return [
+        Document(id=key, page_content=text, metadata=metadata)
+        for key, text, metadata in zip(results["ids"][0], results["documents"][0], results["metadatas"][0])
+    ]
+
+
+def _lexical_candidates(query: str, n: int, **filters) -> list:
+    """BM25 matches for the query from the dish store, filters applied in SQL"""
+    with timed(VECTOR_SECONDS, backend="dish_store", operation="text_search"):
+        rows = search_dishes_text(query, n, **filters)
+    VECTOR_RESULTS.observe(len(rows), backend="dish_store", operation="text_search")
+    return [Document(id=key, page_content=text, metadata=metadata) for key, text, metadata in rows]
+
+
+@_sidecar_routed
+def search_menus(query: str, k: int = 5, dietary_filter: str = None, exclude_allergens: list = None,
+                 restaurant_names: list = None, max_price: float = None, mode: str = None):
+    """Searches restaurant menus for dishes matching a free-text query.
+    Filters are applied inside the stores while candidates are generated,
+    so up to k hits come back whenever that many dishes pass them.
+
+    Args:
+        query: Search query (e.g., vegan pasta)
         k: Number of results to return
         dietary_filter: Optional dietary requirement to filter by
-    
+        exclude_allergens: Optional allergens the dishes must not contain
+        restaurant_names: Optional restaurants to restrict to
+        max_price: Optional maximum dish price
+        mode: "hybrid" or "vector" (defaults to SEARCH_MODE). Hybrid fuses
+            dish store BM25 with the vector ranking and needs the dish store;
+            without it the vector ranking is returned.
     Returns:
-        List of documents with metadata
+        List of documents with metadata, best first
     """
+    if restaurant_names is not None and not restaurant_names:
+        return []
+    mode = mode or SEARCH_MODE
+    n = k * SEARCH_CANDIDATE_MULTIPLIER if mode == "hybrid" else k
 
-    # Perform similarity search
-    results = menu_vectorstore.similarity_search(query, k=k)
+    where = _menu_where(dietary_filter, exclude_allergens, restaurant_names, max_price)
+    vector_hits = _vector_candidates(query, n, where)
+    if mode != "hybrid" or not dish_store_exists():
+        return vector_hits[:k]
 
-    # Apply dietary filter if specified
-    if dietary_filter:
-        results = [
-            r for r in results
-            if dietary_filter.lower() in [d.strip().lower() for d in r.metadata.get("dietary", "").split(",")]
-        ]
-
-    return results
+    lexical_hits = _lexical_candidates(
+        query, n,
+        restaurant_names=restaurant_names,
+        dietary_filter=dietary_filter,
+        exclude_allergens=exclude_allergens,
+        max_price=max_price,
+    )
+    return reciprocal_rank_fusion([lexical_hits, vector_hits], k)
 
-def get_restaurant_dishes(restaurant_name: str, dietary_filter: str = None):
+@_sidecar_routed
+def get_restaurant_dishes(restaurant_name: str, dietary_filter: str = None, exclude_allergens: list = None):
     """Get all dishes from the specific restaurant.
+    Answered from the indexed dish store when it exists, so no query is
+    embedded. Falls back to a Chroma metadata search otherwise.
+
     Args: 
         restaurant_name: Name of the restaurant
         dietary_filter: Optional dietary requirement
+        exclude_allergens: Optional allergens to exclude (e.g., ["nuts", "dairy"])
     Returns: 
         List of dishes
     """
+    if dish_store_exists():
+        with timed(VECTOR_SECONDS, backend="dish_store", operation="restaurant_dishes"):
+            rows = query_dishes(
+                restaurant_names=[restaurant_name],
+                dietary_filter=dietary_filter,
+                exclude_allergens=exclude_allergens
+            )
+        VECTOR_RESULTS.observe(len(rows), backend="dish_store", operation="restaurant_dishes")
+        return [Document(id=key, page_content=text, metadata=metadata) for key, text, metadata in rows]
 
     # Use metadata filtering
-    results = menu_vectorstore.similarity_search(
-        query="all dishes",
-        k=100,
-        filter={"restaurant_name": restaurant_name}
-    )
+    with timed(VECTOR_SECONDS, backend=VECTOR_BACKEND, operation="restaurant_dishes"):
+        results = get_menu_vectorstore().similarity_search(
+            query="all dishes",
+            k=100,
+            filter={"restaurant_name": restaurant_name}
+        )
+    VECTOR_RESULTS.observe(len(results), backend=VECTOR_BACKEND, operation="restaurant_dishes")
 
     # Apply dietary filter if specified
     if dietary_filter:
         results = [
             r for r in results
-            if dietary_filter.lower() in [d.strip().lower() for d in r.metadata.get("dietary", "").split(",")]
+            if normalize_tag(dietary_filter) in {normalize_tag(d) for d in r.metadata.get("dietary", "").split(",")}
+        ]
+
+    # Drop dishes containing excluded allergens
+    if exclude_allergens:
+        excluded = {normalize_tag(a) for a in exclude_allergens}
+        results = [
+            r for r in results
+            if not excluded & {normalize_tag(a) for a in r.metadata.get("allergens", "").split(",")}
         ]
-    return results
\ No newline at end of file
+    return results
+
+@_sidecar_routed
+def get_dishes_for_restaurants(restaurant_names: list, dietary_filter: str = None,
+                               exclude_allergens: list = None) -> dict:
+    """Get dishes for many restaurants with a single metadata query.
+    This never embeds a query: it reads the indexed dish store when present,
+    otherwise it is a plain Chroma metadata fetch with the restaurant,
+    dietary and allergen filters evaluated in the where-clause.
+
+    Args:
+        restaurant_names: Names of the candidate restaurants
+        dietary_filter: Optional dietary requirement
+        exclude_allergens: Optional allergens to exclude
+    Returns:
+        Dict mapping restaurant name to its list of dishes (Documents).
+        Restaurants without matching dishes are omitted.
+    """
+    if not restaurant_names:
+        return {}
+
+    if dish_store_exists():
+        with timed(VECTOR_SECONDS, backend="dish_store", operation="dishes_for_restaurants"):
+            rows = query_dishes(
+                restaurant_names=list(restaurant_names),
+                dietary_filter=dietary_filter,
+                exclude_allergens=exclude_allergens
+            )
+        VECTOR_RESULTS.observe(len(rows), backend="dish_store", operation="dishes_for_restaurants")
+        dishes_by_restaurant = {}
+        for key, text, metadata in rows:
+            dishes_by_restaurant.setdefault(metadata["restaurant_name"], []).append(
+                Document(id=key, page_content=text, metadata=metadata)
+            )
+        return dishes_by_restaurant
+
+    where = _menu_where(dietary_filter, exclude_allergens, restaurant_names=list(restaurant_names))
+
+    with timed(VECTOR_SECONDS, backend=VECTOR_BACKEND, operation="dishes_for_restaurants"):
+        results = get_menu_vectorstore().get(where=where, include=["documents", "metadatas"])
+    VECTOR_RESULTS.observe(len(results["documents"]), backend=VECTOR_BACKEND, operation="dishes_for_restaurants")
+
+    dishes_by_restaurant = {}
+    for key, text, metadata in zip(results["ids"], results["documents"], results["metadatas"]):
+        dishes_by_restaurant.setdefault(metadata["restaurant_name"], []).append(
+            Document(id=key, page_content=text, metadata=metadata)
+        )
+    return dishes_by_restaurant
+
+
+@_sidecar_routed
+def get_dishes_by_id(dish_ids: list) -> list:
+    """Loads dishes by their deterministic dish IDs.
+    Args:
+        dish_ids: Dish IDs as written at ingest
+    Returns:
+        List of Documents for the IDs that exist
+    """
+    if not dish_ids:
+        return []
+
+    if dish_store_exists():
+        return [
+            Document(id=key, page_content=text, metadata=metadata)
+            for key, text, metadata in query_dishes(dish_keys=list(dish_ids))
+        ]
+
+    results = get_menu_vectorstore().get(ids=list(dish_ids), include=["documents", "metadatas"])
+    return [
+        Document(id=key, page_content=text, metadata=metadata)
+        for key, text, metadata in zip(results["ids"], results["documents"], results["metadatas"])
+    ]
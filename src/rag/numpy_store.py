@@ -0,0 +1,476 @@
+"""NumPy Vector Store - In-process brute-force index over menu embeddings.
+An alternative to Chroma for corpora that fit in RAM. Each index
+generation is a directory under VECTOR_INDEX_DIR holding:
+
+    vectors.npy    (dishes x dims) L2-normalized rows, stored as float32,
+                   float16 or int8 (see VECTOR_QUANTIZATION)
+    scales.npy     per-row float32 scales, int8 only
+    vectors_f32.npy  full-precision rows, quantized indexes built with
+                   rescoring on only; read for the rescored shortlist, so
+                   only those pages are touched
+    columns.npz    dish IDs, documents and metadata (UTF-8 blobs with
+                   offsets), plus one column per metadata key for filters
+
+and the CURRENT file names the live generation. vectors.npy is opened
+memory-mapped, so every worker process on a host shares the same page
+cache pages instead of holding its own copy. A query is one
+matrix-vector product over the rows passing the filter mask, followed by
+argpartition for the top k. On a quantized index the top
+k * VECTOR_RESCORE_MULTIPLIER rows are rescored against the float32
+copy before the final cut. The copy is what rescoring costs on disk: it
+puts a quantized index above a plain float32 one (4 + 2 or 4 + 1 bytes
+per dimension), though queries only page in the shortlisted rows. With
+VECTOR_RESCORE_MULTIPLIER=0 at ingest it is not written, and the index
+ranks by quantized scores alone until rebuilt with rescoring on.
+
+The index is not updated in place. Ingest writes dishes to the dish store
+as usual and rebuild() regenerates the index from it at the end of the
+run; the vectors come from the embedding cache, so nothing is re-embedded.
+Every store remembers the data version it loaded under and reloads
+CURRENT on the first read after an ingest (in any process) bumps it.
+Only the subset of the Chroma API this project uses is implemented.
+"""
+
+import json
+import shutil
+import threading
+import time
+from pathlib import Path
+import numpy as np
+from langchain_core.documents import Document
+from src.config.settings import (
+    VECTOR_INDEX_DIR, INGEST_BATCH_SIZE, VECTOR_QUANTIZATION, VECTOR_RESCORE_MULTIPLIER,
+)
+from src.rag.data_version import data_version
+from src.rag.schema import dietary_flag_key, allergen_flag_key
+
+VECTORS_FILE = "vectors.npy"
+COLUMNS_FILE = "columns.npz"
+SCALES_FILE = "scales.npy"
+FULL_VECTORS_FILE = "vectors_f32.npy"
+CURRENT_FILE = "CURRENT"
+
+QUANTIZATIONS = ("float32", "float16", "int8")
+
+# Quantized rows are widened to float32 this many at a time for scoring (small
+# enough that each block stays in cache)
+SCORE_CHUNK_ROWS = 1024
+
+
+def _with_flags(metadata: dict) -> dict:
+    """Dish store metadata in the Chroma layout: no empty values, plus
+    one boolean flag per dietary tag and allergen"""
+    full = {key: value for key, value in metadata.items() if value is not None}
+    for field, flag_key in (("dietary", dietary_flag_key), ("allergens", allergen_flag_key)):
+        value = full.get(field) or "none"
+        if value != "none":
+            for item in value.split(","):
+                if item.strip():
+                    full[flag_key(item)] = True
+    return full
+
+
+def _pack_strings(values: list):
+    """Packs strings into a (UTF-8 blob, offsets) pair"""
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def quantize(vectors: np.ndarray, quantization: str):
+    """Encodes L2-normalized float32 rows for storage.
+    int8 uses one scale per row (max |component| / 127), so every vector
+    keeps the full int8 range regardless of its shape.
+
+    Returns:
+        (stored rows, float32 per-row scales or None)
+    """
+    if quantization == "float16":
+        return vectors.astype(np.float16), None
+    if quantization == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127
+        scales[scales == 0] = 1
+        return np.round(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+    return vectors, None
+
+
+def _encode_columns(raw_columns: dict, size: int) -> dict:
+    """Turns {key: {row: value}} into filter column arrays.
+    Strings are dictionary-encoded (sorted values + int32 codes, -1 when
+    missing), numbers are float64 (NaN when missing) and booleans are
+    bool (False when missing).
+    """
+    arrays = {}
+    for key, values in raw_columns.items():
+        rows = np.fromiter(values, dtype=np.int64, count=len(values))
+        sample = next(iter(values.values()))
+        if isinstance(sample, bool):
+            column = np.zeros(size, dtype=bool)
+            column[rows] = list(values.values())
+            arrays[f"bool:{key}"] = column
+        elif isinstance(sample, (int, float)):
+            column = np.full(size, np.nan)
+            column[rows] = list(values.values())
+            arrays[f"num:{key}"] = column
+        else:
+            uniques, codes = np.unique(np.asarray([str(v) for v in values.values()], dtype=np.str_), return_inverse=True)
+            column = np.full(size, -1, dtype=np.int32)
+            column[rows] = codes
+            arrays[f"str:{key}"] = column
+            arrays[f"str:{key}:values"] = uniques
+    return arrays
+
+
+class _Index:
+    """One loaded index generation; swapped as a whole on reload"""
+
+    def __init__(self, vectors, ids, texts, metas, columns, scales=None, full=None):
+        self.vectors = vectors
+        self.scales = scales
+        self.full = full
+        self.ids = ids
+        self.texts = texts
+        self.metas = metas
+        self.columns = columns
+        self._rows_by_id = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def quantization(self) -> str:
+        return "int8" if self.scales is not None else self.vectors.dtype.name
+
+    def scores(self, query: np.ndarray, rows: np.ndarray = None) -> np.ndarray:
+        """Approximate dot products of the stored rows (or a subset) with query"""
+        count = len(self) if rows is None else len(rows)
+        if count == 0:
+            return np.zeros(0, dtype=np.float32)
+        if self.vectors.dtype == np.float32:
+            return (self.vectors if rows is None else self.vectors[rows]) @ query
+
+        scores = np.empty(count, dtype=np.float32)
+        for start in range(0, count, SCORE_CHUNK_ROWS):
+            stop = min(start + SCORE_CHUNK_ROWS, count)
+            block = self.vectors[start:stop] if rows is None else self.vectors[rows[start:stop]]
+            scores[start:stop] = block.astype(np.float32) @ query
+        if self.scales is not None:
+            scores *= self.scales if rows is None else self.scales[rows]
+        return scores
+
+    def rows_for(self, dish_ids: list) -> list:
+        """Rows of the given dish IDs that exist, in order"""
+        if self._rows_by_id is None:
+            self._rows_by_id = {key.decode(): row for row, key in enumerate(self.ids)}
+        return [self._rows_by_id[d] for d in dish_ids if d in self._rows_by_id]
+
+    def text(self, row: int) -> str:
+        blob, offsets = self.texts
+        return blob[offsets[row]:offsets[row + 1]].tobytes().decode("utf-8")
+
+    def metadata(self, row: int) -> dict:
+        blob, offsets = self.metas
+        return json.loads(blob[offsets[row]:offsets[row + 1]].tobytes())
+
+    def mask(self, where: dict) -> np.ndarray:
+        """Evaluates a Chroma where-clause into a boolean row mask.
+        Supports $and, $or and per-key $eq, $ne, $gt, $gte, $lt, $lte,
+        $in and $nin. As in Chroma, rows missing the key match only
+        $ne and $nin.
+        """
+        result = np.ones(len(self), dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for clause in condition:
+                    result &= self.mask(clause)
+            elif key == "$or":
+                any_match = np.zeros(len(self), dtype=bool)
+                for clause in condition:
+                    any_match |= self.mask(clause)
+                result &= any_match
+            else:
+                if not isinstance(condition, dict):
+                    condition = {"$eq": condition}
+                for op, value in condition.items():
+                    result &= self._compare(key, op, value)
+        return result
+
+    def _compare(self, key: str, op: str, value) -> np.ndarray:
+        negated = op in ("$ne", "$nin")
+        if key not in self.columns:
+            return np.full(len(self), negated)
+        kind, column, uniques = self.columns[key]
+
+        if kind == "str":
+            def lookup(v):
+                # Unknown values map to -2, which no row has (missing is -1)
+                return int(np.searchsorted(uniques, v)) if v in uniques else -2
+
+            if op in ("$in", "$nin"):
+                matched = np.isin(column, [lookup(str(v)) for v in value])
+            elif op in ("$eq", "$ne"):
+                matched = column == lookup(str(value))
+            else:
+                raise ValueError(f"Unsupported operator {op} for string metadata {key!r}")
+            return ~matched if negated else matched
+
+        if op in ("$in", "$nin"):
+            matched = np.isin(column, list(value))
+        elif op in ("$eq", "$ne"):
+            matched = column == value
+        elif kind == "num" and op in ("$gt", "$gte", "$lt", "$lte"):
+            matched = {"$gt": np.greater, "$gte": np.greater_equal,
+                       "$lt": np.less, "$lte": np.less_equal}[op](column, value)
+        else:
+            raise ValueError(f"Unsupported operator {op} for metadata {key!r}")
+        return ~matched if negated else matched
+
+
+def _empty_index() -> _Index:
+    empty = (np.zeros(0, dtype=np.uint8), np.zeros(1, dtype=np.int64))
+    return _Index(np.zeros((0, 0), dtype=np.float32), np.zeros(0, dtype="S1"), empty, empty, {})
+
+
+class NumpyVectorStore:
+    """Memory-mapped vector index with Chroma-style filtering"""
+
+    def __init__(self, embeddings, index_dir: Path = VECTOR_INDEX_DIR,
+                 rescore_multiplier: int = VECTOR_RESCORE_MULTIPLIER):
+        """
+        Args:
+            embeddings: Embedding model used for queries and rebuilds
+            index_dir: Directory holding the index generations
+            rescore_multiplier: Shortlist size (x k) rescored in float32 on
+                quantized indexes; 0 ranks by the quantized scores alone
+        """
+        self.embeddings = embeddings
+        self.index_dir = Path(index_dir)
+        self.rescore_multiplier = rescore_multiplier
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        # Read before loading: a bump in between only causes one extra reload
+        self._version = data_version()
+        self._index = self._load()
+
+    def _load(self) -> _Index:
+        current = self.index_dir / CURRENT_FILE
+        if not current.exists():
+            return _empty_index()
+        generation = self.index_dir / current.read_text().strip()
+
+        data = np.load(generation / COLUMNS_FILE)
+        columns = {}
+        for name in data.files:
+            kind, _, key = name.partition(":")
+            if kind == "str" and not key.endswith(":values"):
+                columns[key] = ("str", data[name], data[f"str:{key}:values"])
+            elif kind in ("num", "bool"):
+                columns[key] = (kind, data[name], None)
+        optional = {
+            name: np.load(generation / file, mmap_mode="r") if (generation / file).exists() else None
+            for name, file in (("scales", SCALES_FILE), ("full", FULL_VECTORS_FILE))
+        }
+        return _Index(
+            vectors=np.load(generation / VECTORS_FILE, mmap_mode="r"),
+            ids=data["ids"],
+            texts=(data["text_blob"], data["text_offsets"]),
+            metas=(data["meta_blob"], data["meta_offsets"]),
+            columns=columns,
+            **optional,
+        )
+
+    def reload(self) -> None:
+        """Switches to the generation named by CURRENT (e.g. after an ingest
+        in another process)"""
+        version = data_version()
+        index = self._load()
+        with self._lock:
+            self._index, self._version = index, version
+
+    def _current(self) -> _Index:
+        """The loaded index, reloaded first if the data version moved on"""
+        version = data_version()
+        if self._version != version:
+            with self._reload_lock:
+                if self._version != version:
+                    self.reload()
+        return self._index
+
+    # Writes
+
+    def add_texts(self, texts: list, metadatas: list = None, ids: list = None) -> list:
+        """Embeds dishes during ingest.
+        The vectors land in the embedding cache and become searchable when
+        rebuild() regenerates the index from the dish store.
+        """
+        self.embeddings.embed_documents(list(texts))
+        return list(ids or [])
+
+    def delete(self, ids: list = None) -> None:
+        """No-op: deleted dishes leave the dish store and drop out on rebuild()"""
+
+    def delete_collection(self) -> None:
+        """Removes every index generation"""
+        shutil.rmtree(self.index_dir, ignore_errors=True)
+        with self._lock:
+            self._index = _empty_index()
+
+    @property
+    def quantization(self) -> str:
+        """Storage type of the loaded index"""
+        return self._index.quantization
+
+    def rebuild(self, batch_size: int = INGEST_BATCH_SIZE, quantization: str = VECTOR_QUANTIZATION) -> int:
+        """Regenerates the index from the dish store and makes it current.
+        Vectors are written batch by batch into memory-mapped files, so
+        memory stays bounded by batch_size rather than corpus size.
+        Processes still mapping the previous generation keep reading it
+        until they reload. The float32 copy for rescoring is only written
+        for a quantized index when this store's rescore_multiplier is above 0.
+
+        Args:
+            batch_size: Dishes embedded and written per batch
+            quantization: "float32", "float16" or "int8"
+        Returns:
+            Number of indexed dishes
+        """
+        from src.rag.dish_store import dish_store_exists, count_dishes, iter_dishes
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization {quantization!r}, expected one of {QUANTIZATIONS}")
+        total = count_dishes() if dish_store_exists() else 0
+        name = f"gen-{time.time_ns()}"
+        generation = self.index_dir / name
+        generation.mkdir(parents=True)
+
+        ids, texts, metas, raw_columns = [], [], [], {}
+        outputs = None
+        for rows in (iter_dishes(batch_size) if total else ()):
+            vectors = np.asarray(self.embeddings.embed_documents([text for _, text, _ in rows]), dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.where(norms == 0, 1, norms)
+            stored, scales = quantize(vectors, quantization)
+            parts = {VECTORS_FILE: stored, SCALES_FILE: scales}
+            if quantization != "float32" and self.rescore_multiplier > 0:
+                parts[FULL_VECTORS_FILE] = vectors
+            if outputs is None:
+                outputs = {
+                    file: np.lib.format.open_memmap(
+                        generation / file, mode="w+", dtype=part.dtype, shape=(total,) + part.shape[1:]
+                    )
+                    for file, part in parts.items() if part is not None
+                }
+            for file, output in outputs.items():
+                output[len(ids):len(ids) + len(rows)] = parts[file]
+
+            for key, text, metadata in rows:
+                metadata = _with_flags(metadata)
+                for column, value in metadata.items():
+                    raw_columns.setdefault(column, {})[len(ids)] = value
+                ids.append(key)
+                texts.append(text)
+                metas.append(json.dumps(metadata, separators=(",", ":")))
+
+        if len(ids) != total:
+            raise RuntimeError(f"Dish store changed during rebuild ({total} dishes expected, {len(ids)} read)")
+        if outputs is None:
+            np.save(generation / VECTORS_FILE, np.zeros((0, 0), dtype=np.float32))
+        else:
+            for output in outputs.values():
+                output.flush()
+            del outputs
+
+        text_blob, text_offsets = _pack_strings(texts)
+        meta_blob, meta_offsets = _pack_strings(metas)
+        np.savez(
+            generation / COLUMNS_FILE,
+            ids=np.asarray(ids, dtype=np.bytes_) if ids else np.zeros(0, dtype="S1"),
+            text_blob=text_blob, text_offsets=text_offsets,
+            meta_blob=meta_blob, meta_offsets=meta_offsets,
+            **_encode_columns(raw_columns, len(ids)),
+        )
+
+        # Switch generations atomically, then drop the old ones; readers that
+        # still map them keep their (unlinked) files until they reload
+        tmp_current = self.index_dir / f"{CURRENT_FILE}.tmp"
+        tmp_current.write_text(name)
+        tmp_current.replace(self.index_dir / CURRENT_FILE)
+        for old in self.index_dir.glob("gen-*"):
+            if old.name != name:
+                shutil.rmtree(old, ignore_errors=True)
+        self.reload()
+        return len(ids)
+
+    # Reads (Chroma collection API subset)
+
+    def count(self) -> int:
+        return len(self._current())
+
+    def query(self, query_embeddings: list, n_results: int = 10, where: dict = None, include: list = None) -> dict:
+        """Nearest dishes to each query embedding among rows passing where.
+        Returns:
+            Chroma-shaped dict of per-query lists: ids, documents, metadatas
+            and distances (cosine distance)
+        """
+        index = self._current()
+        rows = np.flatnonzero(index.mask(where)) if where else None
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for embedding in query_embeddings:
+            query = np.asarray(embedding, dtype=np.float32)
+            query /= np.linalg.norm(query) or 1.0
+            hits, scores = self._top_k(index, query, n_results, rows, self.rescore_multiplier)
+            result["ids"].append([index.ids[r].decode() for r in hits])
+            result["documents"].append([index.text(r) for r in hits])
+            result["metadatas"].append([index.metadata(r) for r in hits])
+            result["distances"].append((1.0 - scores).tolist())
+        return result
+
+    @staticmethod
+    def _top_k(index: _Index, query: np.ndarray, k: int, rows: np.ndarray = None, rescore_multiplier: int = 0):
+        """Top-k rows by dot product, best first (rows restricts the candidates).
+        On a quantized index with rescoring enabled, a k * rescore_multiplier
+        shortlist is ranked by its float32 scores instead.
+        """
+        scores = index.scores(query, rows)
+        rescore = index.full is not None and rescore_multiplier > 0
+        n = min(k * rescore_multiplier if rescore else k, len(scores))
+        if n <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        top = np.argpartition(-scores, n - 1)[:n] if n < len(scores) else np.arange(len(scores))
+        hits = top if rows is None else rows[top]
+        if rescore:
+            scores = index.full[hits] @ query
+            top = np.arange(len(hits))
+        order = np.argsort(-scores[top], kind="stable")[:k]
+        return hits[order], scores[top][order]
+
+    def get(self, ids: list = None, where: dict = None, include: list = None) -> dict:
+        """Dishes by ID and/or where-clause, in index order for where-only calls.
+        Returns:
+            Chroma-shaped dict: ids, documents, metadatas
+        """
+        index = self._current()
+        if ids is not None:
+            rows = index.rows_for(list(ids))
+            if where:
+                mask = index.mask(where)
+                rows = [r for r in rows if mask[r]]
+        elif where:
+            rows = np.flatnonzero(index.mask(where)).tolist()
+        else:
+            rows = range(len(index))
+        return {
+            "ids": [index.ids[r].decode() for r in rows],
+            "documents": [index.text(r) for r in rows],
+            "metadatas": [index.metadata(r) for r in rows],
+        }
+
+    # LangChain VectorStore API subset
+
+    def similarity_search(self, query: str, k: int = 4, filter: dict = None) -> list:
+        """Nearest dishes to a text query as Documents (with dish IDs)"""
+        results = self.query([self.embeddings.embed_query(query)], n_results=k, where=filter)
+        return [
+            Document(id=key, page_content=text, metadata=metadata)
+            for key, text, metadata in zip(results["ids"][0], results["documents"][0], results["metadatas"][0])
+        ]
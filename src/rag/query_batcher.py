@@ -0,0 +1,118 @@
+"""Query Batcher - Micro-batches query embeddings across concurrent requests.
+Each request embeds its own query, and a forward pass over one short text
+leaves most of the CPU's matrix throughput unused while threads contend
+on torch. Callers instead enqueue their text and block on a future; one
+worker thread collects requests for up to QUERY_EMBED_WAIT_MS or
+QUERY_EMBED_BATCH_SIZE texts, whichever comes first, embeds them in a
+single batched call and hands each caller its vector.
+
+Sits behind the query cache, so only cache misses are queued.
+
+The worker starts on first use. A process forked after that (e.g. gunicorn
+--preload with a warmed model) inherits the batcher but not its thread,
+so the child resets the queue and worker at fork and starts its own.
+"""
+
+import functools
+import os
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from langchain_core.embeddings import Embeddings
+from src.config.settings import QUERY_EMBED_BATCH_SIZE, QUERY_EMBED_WAIT_MS
+from src.utils.metrics import (
+    EMBED_SECONDS, QUERY_BATCH_SIZE, QUERY_BATCH_WAIT_SECONDS, QUERY_BATCH_FLUSHES, timed,
+)
+
+
+def _reset_after_fork(batcher_ref) -> None:
+    batcher = batcher_ref()
+    if batcher is not None:
+        batcher._reset()
+
+
+class QueryBatcher(Embeddings):
+    """Embeddings wrapper that batches embed_query calls on a worker thread.
+    Batches go through the model's embed_documents, which for
+    HuggingFaceEmbeddings without query_encode_kwargs is the same
+    computation as embed_query.
+    """
+
+    def __init__(self, underlying: Embeddings, max_batch: int = QUERY_EMBED_BATCH_SIZE,
+                 wait_ms: float = QUERY_EMBED_WAIT_MS):
+        """
+        Args:
+            underlying: Embedding model
+            max_batch: Most texts embedded in one call
+            wait_ms: Longest time the first text in a batch waits for company
+        """
+        self.underlying = underlying
+        self.max_batch = max_batch
+        self.wait = wait_ms / 1000
+        self._reset()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=functools.partial(_reset_after_fork, weakref.ref(self)))
+
+    def _reset(self) -> None:
+        """Fresh queue, lock and no worker (at creation and in forked children)"""
+        self._queue = queue.SimpleQueue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+    def embed_documents(self, texts: list) -> list:
+        """Document batches are already batched; passed straight through"""
+        return self.underlying.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list:
+        """Queues the text for the next batch and waits for its vector"""
+        if self._worker is None:
+            self._start()
+        future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future.result()
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="query-embedder", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> tuple:
+        """Blocks for the first request, then gathers more until the batch is
+        full or the wait window closes.
+        Returns:
+            (requests, flush reason)
+        """
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return batch, "timeout"
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                return batch, "timeout"
+        return batch, "full"
+
+    def _run(self) -> None:
+        while True:
+            batch, reason = self._collect()
+            started = time.perf_counter()
+            QUERY_BATCH_SIZE.observe(len(batch))
+            QUERY_BATCH_FLUSHES.inc(reason=reason)
+            for _, _, enqueued in batch:
+                QUERY_BATCH_WAIT_SECONDS.observe(started - enqueued)
+
+            try:
+                with timed(EMBED_SECONDS, kind="query_batch"):
+                    vectors = self.underlying.embed_documents([text for text, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future, _), vector in zip(batch, vectors):
+                future.set_result(vector)
+
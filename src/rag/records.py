@@ -0,0 +1,120 @@
+"""Records - Immutable restaurant and dish records shared across requests.
+Workflow state only carries IDs: restaurant IDs index the restaurant
+catalog and dish IDs are the deterministic dish keys written at ingest.
+The records below are what those IDs resolve to. They are frozen and
+slotted, so one instance per restaurant or dish is shared by every
+request instead of being copied into each state.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from src.config.settings import DISH_RECORD_CACHE_SIZE
+from src.rag.schema import extract_description
+
+
+@dataclass(frozen=True, slots=True)
+class Restaurant:
+    """One row of the restaurant catalog"""
+    id: int
+    name: str
+    cuisine: str
+    location: str
+    price_range: float
+    rating: float
+    has_vegan: bool
+    has_vegetarian: bool
+    has_gluten_free: bool
+
+    def to_dict(self) -> dict:
+        """Plain dict in the shape the API and CLI return"""
+        return {
+            "name": self.name,
+            "cuisine": self.cuisine,
+            "location": self.location,
+            "price_range": self.price_range,
+            "rating": self.rating,
+            "has_vegan": self.has_vegan,
+            "has_vegetarian": self.has_vegetarian,
+            "has_gluten_free": self.has_gluten_free,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class Dish:
+    """One menu item"""
+    id: str
+    restaurant_name: str
+    name: str
+    price: float
+    category: str
+    description: str
+
+    @classmethod
+    def from_document(cls, document) -> "Dish":
+        """Builds a record from a menu Document (dish store or Chroma)"""
+        metadata = document.metadata
+        return cls(
+            id=document.id,
+            restaurant_name=metadata["restaurant_name"],
+            name=metadata["dish_name"],
+            price=metadata["price"],
+            category=metadata["category"],
+            description=extract_description(document.page_content),
+        )
+
+    def to_dict(self) -> dict:
+        """Plain dict in the shape the API and CLI return"""
+        return {"name": self.name, "price": self.price, "category": self.category, "description": self.description}
+
+
+class DishRegistry:
+    """Bounded LRU of Dish records keyed by dish ID.
+    Agents register the dishes they fetch; later stages and the response
+    builders resolve IDs here, reloading evicted ones from the menu store.
+    """
+
+    def __init__(self, max_entries: int = DISH_RECORD_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._dishes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, documents: list) -> list:
+        """Stores records for menu Documents.
+        Returns:
+            Dish records in the order of documents
+        """
+        dishes = [Dish.from_document(d) for d in documents]
+        with self._lock:
+            for dish in dishes:
+                self._dishes[dish.id] = dish
+                self._dishes.move_to_end(dish.id)
+            while len(self._dishes) > self.max_entries:
+                self._dishes.popitem(last=False)
+        return dishes
+
+    def get(self, dish_ids: list) -> list:
+        """Resolves dish IDs to records; unknown IDs are skipped"""
+        found, missing = {}, []
+        with self._lock:
+            for dish_id in dish_ids:
+                dish = self._dishes.get(dish_id)
+                if dish is None:
+                    missing.append(dish_id)
+                else:
+                    self._dishes.move_to_end(dish_id)
+                    found[dish_id] = dish
+
+        if missing:
+            from src.rag.menu_vectorstore import get_dishes_by_id
+            for dish in self.register(get_dishes_by_id(missing)):
+                found[dish.id] = dish
+        return [found[d] for d in dish_ids if d in found]
+
+
+_registry = DishRegistry()
+
+
+def get_dish_registry() -> DishRegistry:
+    """Returns the process-wide dish registry"""
+    return _registry
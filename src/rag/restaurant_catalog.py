@@ -0,0 +1,277 @@
+"""Restaurant Catalog - Indexed, array-backed restaurant lookup.
+Built at ingest time from the dish store and loaded once per process.
+Restaurants are stored column-wise (NumPy arrays), with inverted indexes
+from normalized location and cuisine tokens to sorted restaurant IDs and
+sorted price/rating columns for range queries. A search is an
+intersection of posting lists followed by vectorized column filters.
+"""
+
+import re
+import threading
+from pathlib import Path
+import numpy as np
+from src.config.settings import CATALOG_PATH, DISH_STORE_PATH
+from src.rag.data_version import data_version
+from src.rag.records import Restaurant
+
+FLAG_VEGAN = 1
+FLAG_VEGETARIAN = 2
+FLAG_GLUTEN_FREE = 4
+
+# Dietary requirement (normalize_tag form) -> catalog flag, for requirements
+# the catalog can prefilter on
+DIETARY_FLAGS = {
+    "vegan": FLAG_VEGAN,
+    "vegetarian": FLAG_VEGETARIAN,
+    "gluten-free": FLAG_GLUTEN_FREE,
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list:
+    """Splits text into lowercase alphanumeric tokens"""
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def _build_postings(values: list) -> dict:
+    """Builds token -> sorted int32 ID array from one text column"""
+    postings = {}
+    for id_, value in enumerate(values):
+        for token in set(tokenize(value)):
+            postings.setdefault(token, []).append(id_)
+    return {token: np.asarray(ids, dtype=np.int32) for token, ids in postings.items()}
+
+
+def _pack_postings(postings: dict):
+    """Packs a postings dict into (keys, offsets, ids) arrays (CSR layout)"""
+    keys = sorted(postings)
+    offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+    for i, key in enumerate(keys):
+        offsets[i + 1] = offsets[i] + len(postings[key])
+    ids = np.concatenate([postings[k] for k in keys]) if keys else np.zeros(0, dtype=np.int32)
+    return np.asarray(keys, dtype=np.str_), offsets, ids
+
+
+def _unpack_postings(keys, offsets, ids) -> dict:
+    return {str(key): ids[offsets[i]:offsets[i + 1]] for i, key in enumerate(keys)}
+
+
+class RestaurantCatalog:
+    """Columnar restaurant table with inverted and sorted indexes"""
+
+    def __init__(self, names, locations, cuisines, prices, ratings, flags):
+        """
+        Args:
+            names, locations, cuisines: String columns
+            prices, ratings: Numeric columns (price per person, rating)
+            flags: Bitmask column of FLAG_* dietary flags
+        """
+        self.names = np.asarray(names, dtype=np.str_)
+        self.locations = np.asarray(locations, dtype=np.str_)
+        self.cuisines = np.asarray(cuisines, dtype=np.str_)
+        self.prices = np.asarray(prices, dtype=np.float32)
+        self.ratings = np.asarray(ratings, dtype=np.float32)
+        self.flags = np.asarray(flags, dtype=np.uint8)
+        self.location_index = _build_postings(list(self.locations))
+        self.cuisine_index = _build_postings(list(self.cuisines))
+        self.price_order = np.argsort(self.prices, kind="stable").astype(np.int32)
+        self.rating_order = np.argsort(self.ratings, kind="stable").astype(np.int32)
+        self.ids_by_name = {str(name): i for i, name in enumerate(self.names)}
+        self._records = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_records(cls, restaurants: list) -> "RestaurantCatalog":
+        """Builds a catalog from restaurant dicts (name, cuisine, location,
+        price_range, rating, has_vegan/has_vegetarian/has_gluten_free)"""
+        return cls(
+            names=[r["name"] for r in restaurants],
+            locations=[r["location"] for r in restaurants],
+            cuisines=[r["cuisine"] for r in restaurants],
+            prices=[r["price_range"] for r in restaurants],
+            ratings=[r.get("rating") or 0.0 for r in restaurants],
+            flags=[
+                FLAG_VEGAN * bool(r.get("has_vegan"))
+                | FLAG_VEGETARIAN * bool(r.get("has_vegetarian"))
+                | FLAG_GLUTEN_FREE * bool(r.get("has_gluten_free"))
+                for r in restaurants
+            ],
+        )
+
+    @classmethod
+    def from_dish_store(cls, path: Path = DISH_STORE_PATH) -> "RestaurantCatalog":
+        """Builds a catalog from the restaurant rows of the dish store"""
+        from src.rag.dish_store import query_restaurants
+        rows = query_restaurants(path)
+        return cls(
+            names=[r[0] for r in rows],
+            locations=[r[1] or "" for r in rows],
+            cuisines=[r[2] or "" for r in rows],
+            prices=[r[3] or 0.0 for r in rows],
+            ratings=[r[4] or 0.0 for r in rows],
+            flags=[
+                FLAG_VEGAN * ("vegan" in tags)
+                | FLAG_VEGETARIAN * ("vegetarian" in tags or "vegan" in tags)
+                | FLAG_GLUTEN_FREE * ("gluten-free" in tags)
+                for *_, tags in rows
+            ],
+        )
+
+    def save(self, path: Path = CATALOG_PATH) -> None:
+        """Writes the catalog (columns and packed indexes) to an .npz file"""
+        loc_keys, loc_offsets, loc_ids = _pack_postings(self.location_index)
+        cui_keys, cui_offsets, cui_ids = _pack_postings(self.cuisine_index)
+        tmp_path = Path(path).with_suffix(".tmp.npz")
+        np.savez(
+            tmp_path, names=self.names, locations=self.locations, cuisines=self.cuisines,
+            prices=self.prices, ratings=self.ratings, flags=self.flags,
+            price_order=self.price_order, rating_order=self.rating_order,
+            loc_keys=loc_keys, loc_offsets=loc_offsets, loc_ids=loc_ids,
+            cui_keys=cui_keys, cui_offsets=cui_offsets, cui_ids=cui_ids,
+        )
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path = CATALOG_PATH) -> "RestaurantCatalog":
+        """Loads a catalog written by save() without rebuilding indexes"""
+        data = np.load(path)
+        catalog = cls.__new__(cls)
+        catalog.names = data["names"]
+        catalog.locations = data["locations"]
+        catalog.cuisines = data["cuisines"]
+        catalog.prices = data["prices"]
+        catalog.ratings = data["ratings"]
+        catalog.flags = data["flags"]
+        catalog.price_order = data["price_order"]
+        catalog.rating_order = data["rating_order"]
+        catalog.location_index = _unpack_postings(data["loc_keys"], data["loc_offsets"], data["loc_ids"])
+        catalog.cuisine_index = _unpack_postings(data["cui_keys"], data["cui_offsets"], data["cui_ids"])
+        catalog.ids_by_name = {str(name): i for i, name in enumerate(catalog.names)}
+        catalog._records = {}
+        return catalog
+
+    def _token_ids(self, index: dict, text: str):
+        """IDs whose column contains every token of text (None = no filter)"""
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+        postings = sorted((index.get(t, np.zeros(0, dtype=np.int32)) for t in set(tokens)), key=len)
+        ids = postings[0]
+        for posting in postings[1:]:
+            if not len(ids):
+                break
+            ids = np.intersect1d(ids, posting, assume_unique=True)
+        return ids
+
+    def ids_in_price_range(self, min_price: float = None, max_price: float = None) -> np.ndarray:
+        """Sorted IDs with min_price <= price <= max_price (binary search)"""
+        sorted_prices = self.prices[self.price_order]
+        lo = 0 if min_price is None else np.searchsorted(sorted_prices, min_price, side="left")
+        hi = len(sorted_prices) if max_price is None else np.searchsorted(sorted_prices, max_price, side="right")
+        return np.sort(self.price_order[lo:hi])
+
+    def ids_with_min_rating(self, min_rating: float) -> np.ndarray:
+        """Sorted IDs with rating >= min_rating (binary search)"""
+        sorted_ratings = self.ratings[self.rating_order]
+        lo = np.searchsorted(sorted_ratings, min_rating, side="left")
+        return np.sort(self.rating_order[lo:])
+
+    def search(self, location: str = None, cuisine: str = None, max_price: float = None,
+               min_rating: float = None, required_flags: int = 0) -> np.ndarray:
+        """Finds restaurants matching every given filter.
+        Args:
+            location: Location text; every token must appear in the restaurant location
+            cuisine: Cuisine text; every token must appear in the restaurant cuisine
+            max_price: Optional maximum price per person
+            min_rating: Optional minimum rating
+            required_flags: Bitmask of FLAG_* values the restaurant must have
+        Returns:
+            Sorted int32 array of restaurant IDs
+        """
+        posting_sets = [
+            ids for ids in (
+                self._token_ids(self.location_index, location),
+                self._token_ids(self.cuisine_index, cuisine),
+            ) if ids is not None
+        ]
+
+        if posting_sets:
+            ids = min(posting_sets, key=len)
+            for other in posting_sets:
+                if other is not ids:
+                    ids = np.intersect1d(ids, other, assume_unique=True)
+            # Column filters are cheaper than range scans once the set is small
+            mask = np.ones(len(ids), dtype=bool)
+            if max_price is not None:
+                mask &= self.prices[ids] <= max_price
+            if min_rating is not None:
+                mask &= self.ratings[ids] >= min_rating
+            if required_flags:
+                mask &= (self.flags[ids] & required_flags) == required_flags
+            return ids[mask]
+
+        ids = self.ids_in_price_range(max_price=max_price) if max_price is not None else np.arange(len(self), dtype=np.int32)
+        if min_rating is not None:
+            ids = np.intersect1d(ids, self.ids_with_min_rating(min_rating), assume_unique=True)
+        if required_flags:
+            ids = ids[(self.flags[ids] & required_flags) == required_flags]
+        return ids
+
+    def restaurant(self, id_: int) -> Restaurant:
+        """Returns the shared record for a restaurant ID (built on first use)"""
+        record = self._records.get(id_)
+        if record is None:
+            flags = int(self.flags[id_])
+            record = self._records.setdefault(id_, Restaurant(
+                id=int(id_),
+                name=str(self.names[id_]),
+                cuisine=str(self.cuisines[id_]),
+                location=str(self.locations[id_]),
+                price_range=float(self.prices[id_]),
+                rating=float(self.ratings[id_]),
+                has_vegan=bool(flags & FLAG_VEGAN),
+                has_vegetarian=bool(flags & FLAG_VEGETARIAN),
+                has_gluten_free=bool(flags & FLAG_GLUTEN_FREE),
+            ))
+        return record
+
+    def record(self, id_: int) -> dict:
+        """Materializes one restaurant as a plain dict"""
+        return self.restaurant(id_).to_dict()
+
+
+_catalog = None
+_catalog_version = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> RestaurantCatalog:
+    """Returns the process-wide catalog, loading it on first call and
+    again whenever an ingest (in any process) bumps the data version.
+    Falls back to the built-in mock restaurants when nothing was ingested.
+    """
+    global _catalog, _catalog_version
+    version = data_version()
+    if _catalog is None or _catalog_version != version:
+        with _catalog_lock:
+            if _catalog is None or _catalog_version != version:
+                if Path(CATALOG_PATH).exists():
+                    _catalog = RestaurantCatalog.load(CATALOG_PATH)
+                else:
+                    from src.agents.restaurant_search_agent import MOCK_RESTAURANTS
+                    _catalog = RestaurantCatalog.from_records(MOCK_RESTAURANTS)
+                _catalog_version = version
+    return _catalog
+
+
+def build_catalog(path: Path = CATALOG_PATH) -> RestaurantCatalog:
+    """Rebuilds the catalog from the dish store and saves it (ingest step)"""
+    global _catalog
+    catalog = RestaurantCatalog.from_dish_store()
+    catalog.save(path)
+    with _catalog_lock:
+        _catalog = catalog
+    return catalog
@@ -0,0 +1,48 @@
+"""Metadata Schema - Shared helpers for the menu document metadata layout.
+Used by ingestion and by the query side so both agree on key names.
+"""
+
+import re
+
+
+def normalize_tag(tag: str) -> str:
+    """Canonical form of a dietary tag or allergen, used wherever tags are
+    stored or matched, so spelling variants meet.
+    Args:
+        tag: Raw tag (e.g., " Gluten-Free ", "gluten free")
+    Returns:
+        Lowercase alphanumeric words joined by "-" (e.g., "gluten-free")
+    """
+    return re.sub(r"[^a-z0-9]+", "-", tag.lower()).strip("-")
+
+
+def dietary_flag_key(tag: str) -> str:
+    """Builds the boolean metadata key used to filter dishes by dietary tag.
+    Chroma cannot match inside comma-joined strings, so each tag is also
+    stored as its own flag (e.g., "vegan" -> "diet_vegan": True).
+
+    Args:
+        tag: Dietary tag (e.g., vegan, gluten-free)
+    Returns:
+        Metadata key for the tag
+    """
+    return "diet_" + normalize_tag(tag).replace("-", "_")
+
+
+def allergen_flag_key(allergen: str) -> str:
+    """Builds the boolean metadata key marking a dish as containing an allergen.
+    Lets allergen exclusion run inside Chroma as {key: {"$ne": True}}.
+
+    Args:
+        allergen: Allergen name (e.g., nuts, dairy)
+    Returns:
+        Metadata key for the allergen
+    """
+    return "allergen_" + normalize_tag(allergen).replace("-", "_")
+
+
+def extract_description(document: str) -> str:
+    """Returns the "Description:" line of a dish document ("" if absent)"""
+    if "Description: " not in document:
+        return ""
+    return document.split("Description: ")[1].split("\n")[0]
@@ -0,0 +1,269 @@
+"""Menu Store Sidecar - One process owns the embedding model and vector store.
+With several uvicorn/gunicorn workers, each worker would otherwise load
+its own torch, MiniLM and Chroma client. In sidecar mode
+(MENU_STORE_MODE=sidecar) the menu store functions in menu_vectorstore
+become thin clients that forward each call over a Unix socket to this
+process, which runs them in-process. Concurrent query embeddings from
+all workers then also share one micro-batching queue.
+
+Wire format (all integers big-endian):
+
+    frame     u32 payload length, payload
+    request   u8 operation, JSON keyword arguments (UTF-8)
+    response  u8 status, body
+              OK_DOCUMENTS  u32 count, then per document
+                            u32 x3 lengths + dish ID, page content, metadata JSON
+              OK_GROUPED    as OK_DOCUMENTS with a leading group key per document
+              OK_NONE       empty body
+              ERROR         UTF-8 message
+
+Usage:
+    python -m src.rag.sidecar [--socket PATH]
+"""
+
+import argparse
+import inspect
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+from pathlib import Path
+from langchain_core.documents import Document
+from src.config.settings import MENU_SIDECAR_SOCKET, MENU_SIDECAR_TIMEOUT_SECONDS
+from src.utils.metrics import VECTOR_SECONDS, timed, log_event
+
+# Operation codes; the names are menu_vectorstore functions
+OPERATIONS = {
+    1: "search_menus",
+    2: "get_restaurant_dishes",
+    3: "get_dishes_for_restaurants",
+    4: "get_dishes_by_id",
+    5: "warmup",
+}
+OPERATION_CODES = {name: code for code, name in OPERATIONS.items()}
+
+OK_DOCUMENTS, OK_GROUPED, OK_NONE, ERROR = 0, 1, 2, 255
+
+_FRAME = struct.Struct(">I")
+_LENGTHS = struct.Struct(">III")
+_GROUPED_LENGTHS = struct.Struct(">IIII")
+
+
+class SidecarError(RuntimeError):
+    """The sidecar ran the call and it raised"""
+
+
+# Codec
+
+def _encode_documents(documents: list, groups: list = None) -> bytes:
+    parts = [_FRAME.pack(len(documents))]
+    for i, document in enumerate(documents):
+        fields = [
+            (document.id or "").encode("utf-8"),
+            document.page_content.encode("utf-8"),
+            json.dumps(document.metadata, separators=(",", ":")).encode("utf-8"),
+        ]
+        if groups is not None:
+            fields.insert(0, groups[i].encode("utf-8"))
+            parts.append(_GROUPED_LENGTHS.pack(*map(len, fields)))
+        else:
+            parts.append(_LENGTHS.pack(*map(len, fields)))
+        parts.extend(fields)
+    return b"".join(parts)
+
+
+def _decode_documents(body: memoryview, grouped: bool) -> list:
+    """Returns Documents, or (group key, Document) pairs when grouped"""
+    header = _GROUPED_LENGTHS if grouped else _LENGTHS
+    (count,) = _FRAME.unpack_from(body, 0)
+    offset = _FRAME.size
+    items = []
+    for _ in range(count):
+        lengths = header.unpack_from(body, offset)
+        offset += header.size
+        fields = []
+        for length in lengths:
+            fields.append(bytes(body[offset:offset + length]).decode("utf-8"))
+            offset += length
+        *group, id_, text, metadata = fields
+        document = Document(id=id_ or None, page_content=text, metadata=json.loads(metadata))
+        items.append((group[0], document) if grouped else document)
+    return items
+
+
+def encode_result(result) -> bytes:
+    """Response payload for a menu store function's return value"""
+    if result is None:
+        return bytes([OK_NONE])
+    if isinstance(result, dict):
+        groups = [key for key, documents in result.items() for _ in documents]
+        documents = [d for documents in result.values() for d in documents]
+        return bytes([OK_GROUPED]) + _encode_documents(documents, groups)
+    return bytes([OK_DOCUMENTS]) + _encode_documents(result)
+
+
+def decode_result(payload: bytes):
+    """Inverse of encode_result"""
+    status, body = payload[0], memoryview(payload)[1:]
+    if status == OK_NONE:
+        return None
+    if status == OK_DOCUMENTS:
+        return _decode_documents(body, grouped=False)
+    if status == OK_GROUPED:
+        grouped = {}
+        for key, document in _decode_documents(body, grouped=True):
+            grouped.setdefault(key, []).append(document)
+        return grouped
+    raise SidecarError(bytes(body).decode("utf-8"))
+
+
+def _send_frame(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(_FRAME.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError("menu sidecar closed the connection")
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+def _recv_frame(sock: socket.socket) -> bytes:
+    (length,) = _FRAME.unpack(_recv_exact(sock, _FRAME.size))
+    return _recv_exact(sock, length)
+
+
+# Client
+
+class SidecarClient:
+    """Forwards menu store calls to the sidecar over pooled connections"""
+
+    def __init__(self, path: Path = MENU_SIDECAR_SOCKET, timeout: float = MENU_SIDECAR_TIMEOUT_SECONDS):
+        """
+        Args:
+            path: Sidecar Unix socket
+            timeout: Seconds to wait for a reply
+        """
+        self.path = str(path)
+        self.timeout = timeout
+        self._idle = queue.SimpleQueue()
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Connect in blocking mode: with a timeout set, a full accept backlog fails with EAGAIN
+        sock.connect(self.path)
+        sock.settimeout(self.timeout)
+        return sock
+
+    def _round_trip(self, sock: socket.socket, request: bytes) -> bytes:
+        _send_frame(sock, request)
+        return _recv_frame(sock)
+
+    def call(self, operation: str, arguments: dict):
+        """Runs a menu store function in the sidecar.
+        Args:
+            operation: Function name (a key of OPERATION_CODES)
+            arguments: Keyword arguments (JSON-serializable)
+        Returns:
+            The function's return value
+        """
+        request = bytes([OPERATION_CODES[operation]]) + json.dumps(arguments).encode("utf-8")
+        with timed(VECTOR_SECONDS, backend="sidecar", operation=operation):
+            try:
+                sock, pooled = self._idle.get_nowait(), True
+            except queue.Empty:
+                sock, pooled = self._connect(), False
+            try:
+                reply = self._round_trip(sock, request)
+            except ConnectionError:
+                sock.close()
+                if not pooled:
+                    raise
+                # The sidecar restarted since this connection was pooled
+                sock = self._connect()
+                try:
+                    reply = self._round_trip(sock, request)
+                except BaseException:
+                    sock.close()
+                    raise
+            except BaseException:
+                sock.close()
+                raise
+        self._idle.put(sock)
+        return decode_result(reply)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> SidecarClient:
+    """Returns the process-wide sidecar client"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = SidecarClient()
+    return _client
+
+
+# Server
+
+class _Handler(socketserver.BaseRequestHandler):
+    """Serves requests on one connection until the client disconnects"""
+
+    def handle(self) -> None:
+        while True:
+            try:
+                request = _recv_frame(self.request)
+            except ConnectionError:
+                return
+            name = OPERATIONS.get(request[0])
+            try:
+                if name is None:
+                    raise ValueError(f"unknown operation {request[0]}")
+                arguments = json.loads(request[1:]) if len(request) > 1 else {}
+                reply = encode_result(self.server.functions[name](**arguments))
+            except Exception as e:
+                log_event("sidecar_call_failed", operation=name, error=repr(e))
+                reply = bytes([ERROR]) + repr(e).encode("utf-8")
+            _send_frame(self.request, reply)
+
+
+class SidecarServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    # Every worker thread of every client process may connect at once
+    request_queue_size = 256
+
+    def __init__(self, path: Path = MENU_SIDECAR_SOCKET):
+        from src.rag import menu_vectorstore
+        # The module-level functions route to the sidecar in this mode; run the originals
+        self.functions = {name: inspect.unwrap(getattr(menu_vectorstore, name)) for name in OPERATIONS.values()}
+        Path(path).unlink(missing_ok=True)
+        super().__init__(str(path), _Handler)
+        os.chmod(path, 0o600)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve menu search over a Unix socket")
+    parser.add_argument("--socket", type=Path, default=MENU_SIDECAR_SOCKET)
+    args = parser.parse_args()
+
+    server = SidecarServer(args.socket)
+    server.functions["warmup"]()
+    print(f"Menu store sidecar listening on {args.socket}", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        args.socket.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
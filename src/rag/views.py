@@ -0,0 +1,52 @@
+"""Views - Turns the IDs carried in workflow state into response dicts.
+Only called at the edges (API responses, streamed events, CLI output),
+so restaurant and dish data is materialized once per response rather
+than copied through every stage.
+"""
+
+from src.rag.records import get_dish_registry
+from src.rag.restaurant_catalog import get_catalog
+
+
+def restaurant_view(restaurant_id: int, dish_match=None, score: float = None, available_time: str = None) -> dict:
+    """Builds the response dict for one restaurant.
+    Args:
+        restaurant_id: Catalog ID
+        dish_match: Optional (matching dish count, top dish IDs) from dish_matches
+        score: Optional ranking score
+        available_time: Optional nearest free start time from available_times
+    Returns:
+        Restaurant fields, plus matching_dishes / matching_dish_count /
+        score / available_time when given
+    """
+    view = get_catalog().restaurant(restaurant_id).to_dict()
+    if dish_match is not None:
+        count, dish_ids = dish_match
+        view["matching_dishes"] = [d.to_dict() for d in get_dish_registry().get(list(dish_ids))]
+        view["matching_dish_count"] = count
+    if score is not None:
+        view["score"] = score
+    if available_time is not None:
+        view["available_time"] = available_time
+    return view
+
+
+def candidate_views(restaurant_ids: list) -> list:
+    """Response dicts for a list of candidate IDs"""
+    return [restaurant_view(i) for i in restaurant_ids]
+
+
+def recommendation_views(state: dict) -> list:
+    """Response dicts for final_recommendations, best first"""
+    dish_matches = state.get("dish_matches") or {}
+    available_times = state.get("available_times") or {}
+    return [
+        restaurant_view(restaurant_id, dish_matches.get(restaurant_id), score, available_times.get(restaurant_id))
+        for restaurant_id, score in state.get("final_recommendations") or []
+    ]
+
+
+def restaurant_names(restaurant_ids: list) -> list:
+    """Restaurant names for a list of IDs"""
+    catalog = get_catalog()
+    return [catalog.restaurant(i).name for i in restaurant_ids]
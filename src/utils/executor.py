@@ -0,0 +1,30 @@
+"""Blocking Call Executor - Runs blocking work off the event loop.
+Chroma, SQLite and embedding calls are synchronous; async agents hand them
+to a bounded thread pool so a burst of requests cannot spawn unbounded
+threads or stall the event loop.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from src.config.settings import BLOCKING_POOL_SIZE
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    """Returns the shared pool for blocking calls, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=BLOCKING_POOL_SIZE, thread_name_prefix="blocking")
+    return _executor
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Awaits fn(*args, **kwargs) executed on the bounded blocking pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_blocking_executor(), partial(fn, *args, **kwargs))
@@ -0,0 +1,297 @@
+"""Metrics and Tracing - Low-overhead instrumentation for the workflow.
+Counters and histograms live in one in-process registry and are exported
+in the Prometheus text format (GET /metrics on the HTTP service).
+Structured logs are JSON lines on the "booking" logger, written to
+stderr at LOG_LEVEL. Console progress output goes through debug(), which
+is a no-op unless DEBUG_OUTPUT=1.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import math
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from src.config.settings import DEBUG_OUTPUT, LOG_LEVEL
+
+# Seconds: sub-millisecond index lookups up to multi-second LLM calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Candidate and result counts
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000, 10000)
+
+
+def _label_text(label_names: tuple, label_values: tuple, extra: str = "") -> str:
+    """Formats a Prometheus label set such as {node="ranking",le="0.5"}"""
+    pairs = [f'{name}="{value}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(str(labels.get(n, "")) for n in self.label_names)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_label_text(self.label_names, key)} {value}" for key, value in items]
+
+
+class Histogram:
+    """Fixed-bucket histogram with optional labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.label_names)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self, **labels) -> dict:
+        """Returns {"count": n, "sum": s} for one label set"""
+        key = tuple(str(labels.get(n, "")) for n in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            return {"count": series[2], "sum": series[1]} if series else {"count": 0, "sum": 0.0}
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._series.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                labels = _label_text(self.label_names, key, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.label_names, key)} {total}")
+            lines.append(f"{self.name}_count{_label_text(self.label_names, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric and renders them in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, label_names: tuple = ()) -> Counter:
+        return self._register(Counter(name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: tuple = (),
+                  buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+NODE_SECONDS = REGISTRY.histogram(
+    "booking_node_duration_seconds", "Wall time of each workflow node", ("node",))
+NODE_ERRORS = REGISTRY.counter(
+    "booking_node_errors_total", "Workflow node runs that raised", ("node",))
+STAGE_CANDIDATES = REGISTRY.histogram(
+    "booking_stage_candidates", "Restaurants entering and leaving each stage",
+    ("stage", "direction"), COUNT_BUCKETS)
+LLM_SECONDS = REGISTRY.histogram(
+    "booking_llm_request_duration_seconds", "LLM call latency", ("model", "mode"))
+LLM_TOKENS = REGISTRY.counter(
+    "booking_llm_tokens_total", "LLM tokens reported by the provider", ("model", "kind"))
+EMBED_SECONDS = REGISTRY.histogram(
+    "booking_embedding_duration_seconds", "Embedding model latency (cache misses only)", ("kind",))
+EMBED_TEXTS = REGISTRY.counter(
+    "booking_embedding_texts_total", "Texts embedded or served from cache", ("kind", "cache"))
+QUERY_BATCH_SIZE = REGISTRY.histogram(
+    "booking_query_embedding_batch_size", "Query texts per batched embedding call", (), COUNT_BUCKETS)
+QUERY_BATCH_WAIT_SECONDS = REGISTRY.histogram(
+    "booking_query_embedding_queue_seconds", "Time a query waited in the embedding batch queue")
+QUERY_BATCH_FLUSHES = REGISTRY.counter(
+    "booking_query_embedding_batches_total", "Query embedding batches by flush reason (full, timeout)", ("reason",))
+STAGE_CACHE_LOOKUPS = REGISTRY.counter(
+    "booking_stage_cache_lookups_total", "Workflow stage cache lookups by result (hit, miss)", ("stage", "result"))
+BOOKING_OPERATIONS = REGISTRY.counter(
+    "booking_reservation_operations_total", "Reservation operations (hold, book, confirm, cancel, expire) by result",
+    ("operation", "result"))
+VECTOR_SECONDS = REGISTRY.histogram(
+    "booking_vector_query_duration_seconds", "Menu store query latency", ("backend", "operation"))
+VECTOR_RESULTS = REGISTRY.histogram(
+    "booking_vector_query_results", "Documents returned per menu store query",
+    ("backend", "operation"), COUNT_BUCKETS)
+
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile (q in [0, 100]); the one definition batch
+    summaries and benchmarks share, so their p50/p95 compare"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+def render_prometheus() -> str:
+    """Returns all metrics in the Prometheus text exposition format"""
+    return REGISTRY.render()
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels):
+    """Observes the wall time of the with-block in a histogram"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - started, **labels)
+
+
+def record_llm_usage(response, model: str) -> None:
+    """Counts the token usage reported on an LLM response, if any"""
+    usage = getattr(response, "usage_metadata", None) or {}
+    for kind in ("input_tokens", "output_tokens"):
+        if usage.get(kind):
+            LLM_TOKENS.inc(usage[kind], model=model, kind=kind.replace("_tokens", ""))
+
+
+class _JsonFormatter(logging.Formatter):
+    """Formats log records carrying a "fields" dict as one JSON object"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {"ts": round(record.created, 6), "level": record.levelname, "event": record.getMessage()}
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, default=str)
+
+
+logger = logging.getLogger("booking")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(_JsonFormatter())
+    logger.addHandler(_handler)
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+
+
+def log_event(event: str, level: int = logging.INFO, **fields) -> None:
+    """Writes one structured log line when the level is enabled"""
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
+
+
+def debug(message) -> None:
+    """Prints console progress output when DEBUG_OUTPUT=1.
+    Args:
+        message: Text, or a function returning it, so per-candidate
+            listings are only built when they are printed
+    """
+    if DEBUG_OUTPUT:
+        print(message() if callable(message) else message)
+
+
+def trace_node(node: str, func, candidates_in: str = None, candidates_out: str = None):
+    """Wraps a workflow node to record its wall time and candidate counts.
+
+    Args:
+        node: Node name used as the metric label
+        func: Sync or async node function taking the state
+        candidates_in: State key (or function of the state) whose value's
+            length is the stage's input count
+        candidates_out: State key whose length is the stage's output count
+    Returns:
+        Wrapped function of the same kind (sync or async)
+    """
+    def finish(started, count_in, result):
+        elapsed = time.perf_counter() - started
+        NODE_SECONDS.observe(elapsed, node=node)
+        fields = {}
+        if count_in is not None:
+            STAGE_CANDIDATES.observe(count_in, stage=node, direction="in")
+            fields["candidates_in"] = count_in
+        if candidates_out is not None and result and candidates_out in result:
+            count_out = len(result.get(candidates_out) or [])
+            STAGE_CANDIDATES.observe(count_out, stage=node, direction="out")
+            fields["candidates_out"] = count_out
+        log_event("node_completed", node=node, duration_ms=round(elapsed * 1000, 3), **fields)
+
+    def fail(started, error):
+        NODE_ERRORS.inc(node=node)
+        log_event("node_failed", logging.ERROR, node=node,
+                  duration_ms=round((time.perf_counter() - started) * 1000, 3), error=repr(error))
+
+    def count(state):
+        if callable(candidates_in):
+            return len(candidates_in(state) or [])
+        return len(state.get(candidates_in) or []) if candidates_in else None
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def traced_async(state):
+            count_in, started = count(state), time.perf_counter()
+            try:
+                result = await func(state)
+            except Exception as e:
+                fail(started, e)
+                raise
+            finish(started, count_in, result)
+            return result
+        return traced_async
+
+    @functools.wraps(func)
+    def traced(state):
+        count_in, started = count(state), time.perf_counter()
+        try:
+            result = func(state)
+        except Exception as e:
+            fail(started, e)
+            raise
+        finish(started, count_in, result)
+        return result
+    return traced
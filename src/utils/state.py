@@ -1,17 +1,26 @@
 """State Management for the Restaurant Booking Assistant.
-Defines the shared state strucutre passed between agents
+Defines the shared state strucutre passed between agents.
+Restaurants and dishes are referenced by ID; the records live in the
+shared catalog and dish registry (src/rag/records.py). Nodes return only
+the keys they change, and new log lines in "messages".
 """
 
-from ast import operator
 from typing import TypedDict, Annotated, Optional
 import operator
 
 
+def merge_dicts(left: dict, right: dict) -> dict:
+    """Reducer for dict channels updated one key at a time"""
+    return {**(left or {}), **(right or {})}
+
+
 class AgentState(TypedDict):
     """Shared state passed between all agents in the workflow"""
 
     # User Input
     user_query: str
+    # Refinement text of a session's follow-up turn; the input parser consumes it
+    follow_up: Optional[str]
 
     # Parsed Requirements
     persons_count: Optional[int]
@@ -22,12 +31,22 @@ class AgentState(TypedDict):
     location: Optional[str]
     cuisine_preference: Optional[str]
 
-    # Agent Outputs
+    # Stage order chosen by the query planner
+    execution_plan: list
+
+    # Agent Outputs (restaurant catalog IDs)
     restaurant_candidates: list
     dietary_matches: list
+    # Restaurant ID -> (matching dish count, IDs of the top matching dishes)
+    dish_matches: dict
+    # Restaurant ID -> nearest free start time ("HH:MM") when a time was requested
+    available_times: dict
+    # (restaurant ID, score) pairs, best first
     final_recommendations: list
 
-    # Workflow Log
+    # Filter stage -> record of its last run (src/graph/sessions.py), so a
+    # later turn of the same session reruns only stages whose inputs changed
+    stage_runs: Annotated[dict, merge_dicts]
+
+    # Workflow Log: nodes return only their new lines
     messages: Annotated[list, operator.add]
-   
-    
\ No newline at end of file
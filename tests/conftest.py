@@ -0,0 +1,18 @@
+"""Shared fixtures: synthetic menus ingested offline (stub LLM, fake embeddings)"""
+
+import pytest
+from benchmarks.suite import configure_environment, ensure_ingested
+from benchmarks.synthetic import generate_menus
+
+
+@pytest.fixture(scope="session")
+def ingested(tmp_path_factory):
+    """Work directory with 100 synthetic menus ingested into the NumPy backend.
+    Settings are read once at import, so tests import src modules only
+    after requesting this fixture.
+    """
+    workdir = tmp_path_factory.mktemp("booking")
+    generate_menus(workdir / "menus", 100, seed=7)
+    configure_environment(workdir, 0.0, "numpy")
+    ensure_ingested()
+    return workdir
@@ -0,0 +1,68 @@
+"""Availability filter: live table inventory as a workflow pre-filter"""
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def app(ingested):
+    from src.graph import build_workflow
+    return build_workflow()
+
+
+def run(app, query: str) -> dict:
+    from src.main import create_initial_state
+    return app.invoke(create_initial_state(query))
+
+
+def test_available_restaurants_get_a_time(app):
+    result = run(app, "vegan food in Seattle tomorrow at 7pm for 4")
+    assert "availability_filter" in result["execution_plan"]
+    assert result["restaurant_candidates"]
+    assert set(result["available_times"]) == set(result["restaurant_candidates"])
+    assert set(result["available_times"].values()) == {"19:00"}
+
+
+def test_party_larger_than_any_table_keeps_candidates(app):
+    from src.booking import get_availability_engine
+    party = get_availability_engine().max_party + 2
+    result = run(app, f"vegan food in Seattle tomorrow at 7pm for {party} people")
+    assert result["persons_count"] == party
+    assert result["restaurant_candidates"]
+    assert result["available_times"] == {}
+    assert any("No table size seats" in message for message in result["messages"])
+
+
+def test_engine_rejects_past_and_far_future_dates(ingested):
+    from datetime import date, timedelta
+    from src.booking import AvailabilityEngine, BookingError
+    engine = AvailabilityEngine(horizon_days=30)
+    for day in (date(2020, 1, 1), date.today() - timedelta(days=1), date.today() + timedelta(days=31)):
+        with pytest.raises(BookingError):
+            engine.book("X", day, 19 * 60, 2)
+    assert engine._days == {}
+    engine.book("X", date.today() + timedelta(days=30), 19 * 60, 2)
+
+
+def test_past_days_are_dropped(ingested):
+    from datetime import date, timedelta
+    from src.booking import AvailabilityEngine
+    engine = AvailabilityEngine()
+    tomorrow = date.today() + timedelta(days=1)
+    held = engine.hold("X", tomorrow, 19 * 60, 2)
+    booked = engine.book("X", tomorrow + timedelta(days=1), 19 * 60, 2)
+    assert engine.drop_past_days(tomorrow + timedelta(days=1)) == 1
+    assert list(engine._days) == [booked.day]
+    assert engine.get(held.id) is None and engine.get(booked.id) == booked
+
+
+def test_api_rejects_unbookable_dates(ingested):
+    from fastapi.testclient import TestClient
+    from src.api import app
+    from src.rag.restaurant_catalog import get_catalog
+    restaurant = str(get_catalog().names[0])
+    with TestClient(app) as client:
+        for day in ("2020-01-01", "2999-01-01"):
+            response = client.post("/reservations", json={"restaurant": restaurant, "date": day, "time": "7pm"})
+            assert response.status_code == 400
+        response = client.post("/reservations", json={"restaurant": restaurant, "date": "tomorrow", "time": "7pm"})
+        assert response.status_code == 200
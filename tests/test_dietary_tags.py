@@ -0,0 +1,35 @@
+"""Dietary tags and allergens match across spelling variants in every store"""
+
+import pytest
+
+
+@pytest.mark.parametrize("raw", ["gluten-free", "Gluten Free", " gluten_free ", "GLUTEN-FREE!"])
+def test_tag_variants_share_one_form(ingested, raw):
+    from src.rag.schema import normalize_tag, dietary_flag_key, allergen_flag_key
+    assert normalize_tag(raw) == "gluten-free"
+    assert dietary_flag_key(raw) == "diet_gluten_free"
+    assert allergen_flag_key(raw) == "allergen_gluten_free"
+
+
+def test_dish_store_filter_accepts_spelling_variants(ingested):
+    from src.rag.dish_store import query_dishes
+    from src.rag.menu_vectorstore import _menu_where
+    hyphenated = query_dishes(dietary_filter="gluten-free")
+    assert hyphenated
+    assert query_dishes(dietary_filter="gluten free") == hyphenated
+    assert _menu_where("gluten free") == _menu_where("gluten-free")
+
+
+def test_vector_store_fallback_excludes_allergens(ingested, monkeypatch):
+    import src.rag.menu_vectorstore as menu_vectorstore
+    from src.rag.restaurant_catalog import get_catalog
+    names = [str(name) for name in get_catalog().names[:20]]
+    kwargs = {"dietary_filter": "vegetarian", "exclude_allergens": ["dairy"]}
+    from_dish_store = menu_vectorstore.get_dishes_for_restaurants(names, **kwargs)
+    monkeypatch.setattr(menu_vectorstore, "dish_store_exists", lambda: False)
+    from_vectors = menu_vectorstore.get_dishes_for_restaurants(names, **kwargs)
+
+    def dish_ids(by_restaurant):
+        return {name: sorted(d.id for d in dishes) for name, dishes in by_restaurant.items()}
+    assert dish_ids(from_vectors) == dish_ids(from_dish_store)
+    assert all("dairy" not in d.metadata.get("allergens", "") for dishes in from_vectors.values() for d in dishes)
@@ -0,0 +1,12 @@
+"""Query planner: stages without a requirement stay out of the plan"""
+
+
+def test_request_without_dietary_needs_skips_the_dietary_stage(ingested):
+    from src.graph import build_workflow
+    from src.main import create_initial_state
+    result = build_workflow().invoke(create_initial_state("Table for 4 in Seattle under $60 per person"))
+    assert not result["dietary_requirements"]
+    assert "dietary_analyzer" not in result["execution_plan"]
+    assert result["restaurant_candidates"]
+    ranked = {restaurant for restaurant, _ in result["final_recommendations"]}
+    assert ranked and ranked <= set(result["restaurant_candidates"])
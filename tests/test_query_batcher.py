@@ -0,0 +1,37 @@
+"""Query batcher: batched query embeddings keep working across fork"""
+
+import multiprocessing
+import pytest
+
+
+class CountingEmbeddings:
+    """Embeds a text as [len(text)]"""
+
+    def embed_documents(self, texts):
+        return [[float(len(text))] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text))]
+
+
+def _embed_in_child(batcher, results):
+    results.put(batcher.embed_query("forked"))
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+# Forking while the worker thread runs is the case under test
+@pytest.mark.filterwarnings("ignore:This process .* is multi-threaded:DeprecationWarning")
+def test_forked_child_starts_its_own_worker(ingested):
+    from src.rag.query_batcher import QueryBatcher
+    batcher = QueryBatcher(CountingEmbeddings(), max_batch=4, wait_ms=1)
+    assert batcher.embed_query("parent") == [6.0]
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    child = context.Process(target=_embed_in_child, args=(batcher, results))
+    child.start()
+    child.join(timeout=10)
+    if child.is_alive():
+        child.kill()
+        pytest.fail("embed_query blocked in the forked child")
+    assert results.get(timeout=1) == [6.0]
@@ -0,0 +1,61 @@
+"""Multi-turn sessions: a follow-up returns what the equivalent fresh query would"""
+
+import itertools
+import json
+import pytest
+
+_sessions = itertools.count()
+
+FIRST_TURN = "Table for 4, vegan options, Seattle, under $60 per person"
+
+
+@pytest.fixture(scope="module")
+def apps(ingested):
+    from src.graph import build_workflow
+    from src.graph.sessions import get_checkpointer
+    return build_workflow(get_checkpointer()), build_workflow()
+
+
+def run_session(app, *queries) -> dict:
+    from src.graph.sessions import run_turn
+    session_id = f"test-{next(_sessions)}"
+    for query in queries:
+        result = run_turn(app, session_id, query)
+    return result
+
+
+def outputs(result: dict) -> str:
+    """Stage outputs as JSON: checkpoints store tuples as lists"""
+    return json.dumps([
+        result["restaurant_candidates"], result["dietary_matches"],
+        result["dish_matches"], result["final_recommendations"],
+    ], sort_keys=True)
+
+
+def test_follow_up_matches_fresh_query(apps):
+    from src.main import create_initial_state
+    session_app, app = apps
+    result = run_session(session_app, FIRST_TURN, "actually make it under $30")
+    fresh = app.invoke(create_initial_state("Table for 4, vegan options, Seattle, under $30 per person"))
+    assert result["budget_per_person"] == 30
+    assert outputs(result) == outputs(fresh)
+
+
+def test_follow_up_without_candidates_clears_previous_results(apps):
+    session_app, _ = apps
+    first = run_session(session_app, FIRST_TURN)
+    assert first["final_recommendations"]
+
+    result = run_session(session_app, FIRST_TURN, "actually make it under $1")
+    assert result["budget_per_person"] == 1
+    assert result["restaurant_candidates"] == []
+    assert result["dietary_matches"] == []
+    assert result["dish_matches"] == {}
+    assert result["final_recommendations"] == []
+
+
+def test_session_recovers_after_empty_turn(apps):
+    session_app, _ = apps
+    first = run_session(session_app, FIRST_TURN)
+    result = run_session(session_app, FIRST_TURN, "actually make it under $1", "actually make it under $60")
+    assert outputs(result) == outputs(first)
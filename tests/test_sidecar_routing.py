@@ -0,0 +1,18 @@
+"""Sidecar routing: forwarded calls accept the same inputs as in-process ones"""
+
+import json
+
+
+def test_list_arguments_are_forwarded_as_lists(ingested, monkeypatch):
+    from src.rag import menu_vectorstore, sidecar
+    calls = []
+
+    class Client:
+        def call(self, operation, arguments):
+            calls.append((operation, json.loads(json.dumps(arguments))))
+
+    monkeypatch.setattr(menu_vectorstore, "MENU_STORE_MODE", "sidecar")
+    monkeypatch.setattr(sidecar, "get_client", lambda: Client())
+    forward = menu_vectorstore._sidecar_routed(menu_vectorstore.get_dishes_for_restaurants)
+    forward({"Restaurant A"}, exclude_allergens=("nuts",))
+    assert calls == [("get_dishes_for_restaurants", {"restaurant_names": ["Restaurant A"], "exclude_allergens": ["nuts"]})]